@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'adinvoice.settings')
 
 application = get_asgi_application()
+
+# Register every tenant database once per worker instead of lazily per request
+from tenants.registry import tenant_registry  # noqa: E402
+
+tenant_registry.preload()
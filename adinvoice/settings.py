@@ -16,6 +16,7 @@ from pathlib import Path
 import pymysql
 pymysql.install_as_MySQLdb()
 import os
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -59,6 +60,9 @@ CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",
 ]
 
+# Keyset pagination headers on list endpoints (see common.pagination)
+CORS_EXPOSE_HEADERS = ["Link", "X-Next-Cursor"]
+
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -66,6 +70,7 @@ MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'tenants.middleware.TenantMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -91,10 +96,68 @@ WSGI_APPLICATION = 'adinvoice.wsgi.application'
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        # request.user from the token claims, full row loaded lazily (users.authentication)
+        "users.authentication.CachedJWTAuthentication",
     ),
 }
 
+# Cache of full User rows behind CachedJWTAuthentication. Saves invalidate it
+# (and mark disabled users) in this cache, so it must be shared by every
+# web and Celery worker.
+USER_CACHE_ALIAS = "users"
+USER_CACHE_TTL = 60  # seconds
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    # OTP codes and their rate-limit counters must be shared by every worker
+    "otp": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+        "KEY_PREFIX": "adinvoice",
+    },
+    # User rows and disabled-user markers of the token authentication
+    "users": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+        "KEY_PREFIX": "adinvoice-users",
+    },
+    # Cross-tenant reports, built by Celery beat and read by every web worker
+    "reports": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": "redis://localhost:6379/1",
+        "KEY_PREFIX": "adinvoice-reports",
+    },
+}
+
+# One-time codes for email/phone verification (see users.otp)
+OTP_CACHE_ALIAS = "otp"
+OTP_LENGTH = 6
+OTP_TTL = 600  # seconds a code stays valid
+OTP_MAX_ATTEMPTS = 5  # wrong tries before a code is burnt
+OTP_MAX_SENDS = 5  # codes sent to one email/phone per OTP_SEND_WINDOW
+OTP_SEND_WINDOW = 3600  # seconds
+
+# List endpoints (see common.pagination.KeysetPaginator)
+PAGINATION_PAGE_SIZE = 50
+PAGINATION_MAX_PAGE_SIZE = 500
+PAGINATION_COUNT_CACHE_TTL = 60  # seconds a list total may be approximate
+EXPORT_CHUNK_SIZE = 2000  # rows fetched per query by CSV/XLSX exports (common.exports)
+
+# CSV bulk imports (see common.imports)
+IMPORT_BATCH_SIZE = 500  # rows validated and inserted per batch
+IMPORT_MAX_ERRORS = 1000  # row errors kept in an import report
+IMPORT_SYNC_MAX_BYTES = 256 * 1024  # bigger uploads are imported by a Celery job
+
+# Super-admin reports across all tenant DBs (see tenants.reporting)
+REPORT_CACHE_ALIAS = "reports"
+REPORT_CACHE_TTL = 900  # seconds; outlives REPORT_REFRESH_INTERVAL so a late refresh isn't a cold cache
+REPORT_REFRESH_INTERVAL = 300  # seconds between Celery beat refreshes
+REPORT_MAX_WORKERS = 8  # tenant DBs queried at the same time
+REPORT_TENANT_TIMEOUT = 5  # seconds a tenant's queries may run (enforced by MySQL)
+REPORT_TIMEOUT = 30  # seconds before the remaining tenants are reported as timed out
+
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
@@ -103,6 +166,18 @@ REST_FRAMEWORK = {
 CELERY_BROKER_URL = 'redis://localhost:6379/0'
 CELERY_RESULT_BACKEND = 'redis://localhost:6379/0'
 
+CELERY_BEAT_SCHEDULE = {
+    # Recurring invoices are billed early in the day of their billing date
+    "generate-recurring-invoices": {
+        "task": "invoices.tasks.generate_all_recurring_invoices",
+        "schedule": crontab(hour=0, minute=15),
+    },
+    "refresh-platform-report": {
+        "task": "tenants.tasks.refresh_platform_report",
+        "schedule": REPORT_REFRESH_INTERVAL,
+    },
+}
+
 
 
 DATABASES = {
@@ -119,6 +194,53 @@ DATABASES = {
 
 DATABASE_ROUTERS = ["tenants.db_router.TenantRouter"]
 
+# Apps whose tables live in the per-tenant databases. TenantRouter sends their
+# queries to the current tenant DB (see tenants.context).
+TENANT_APPS = ["clients", "productservices", "invoices"]
+
+# Tenant resolution (see tenants.middleware.TenantMiddleware)
+TENANT_JWT_CLAIM = "tenant_id"
+TENANT_HEADER = "HTTP_X_TENANT_ID"
+TENANT_URL_KWARG = "tenant"
+TENANT_CACHE_TTL = 300  # seconds a cached Tenant row stays valid
+TENANT_CACHE_MAXSIZE = 1024
+TENANT_REGISTRY_POLL_INTERVAL = 5  # seconds between checks for tenant changes in other workers
+
+# Tenant database connections (see tenants.db_utils / tenants.pool)
+TENANT_DB_ENGINE = "tenants.backends.mysql"  # pooled MySQL backend
+TENANT_DB_CONN_MAX_AGE = 0  # 0 = return the connection to the pool after each request
+TENANT_DB_POOL = {
+    "POOL_SIZE": 5,  # max open connections per tenant database (per process)
+    "MAX_CONNECTIONS": 100,  # max open connections across all tenants (per process)
+    "IDLE_TIMEOUT": 300,  # close pooled connections idle for this many seconds
+    "TIMEOUT": 10,  # seconds to wait for a free connection before failing
+    "PING_AFTER": 30,  # ping reused connections idle for longer than this
+}
+
+# Tenant provisioning (see tenants.provisioning). "clone" copies the schema of
+# the golden template DB (kept current by `manage.py sync_tenant_template`),
+# "migrate" runs the whole migration graph for every new tenant.
+TENANT_PROVISIONING_STRATEGY = "clone"
+TENANT_TEMPLATE_DB = "adinvoice_tenant_template"
+TENANT_TEMPLATE_DATA_TABLES = ["django_migrations", "django_content_type", "auth_permission"]
+
+# Invoice numbering (see invoices.sequences). "block" reserves
+# INVOICE_NUMBER_BLOCK_SIZE numbers per worker process at a time, so invoice
+# writes don't queue on the counter row; numbers left in a block when a worker
+# exits (or an invoice fails) are skipped. "strict" takes the next number inside
+# the invoice transaction: gap-free, but one invoice write at a time per tenant.
+INVOICE_NUMBER_MODE = "block"
+INVOICE_NUMBER_BLOCK_SIZE = 20
+INVOICE_NUMBER_FORMAT = "INV-{number:06d}"
+
+# Invoice PDFs (invoices.rendering), stored content-addressed under MEDIA_ROOT
+INVOICE_PDF_WORKERS = 4  # render processes for large batches
+INVOICE_PDF_POOL_THRESHOLD = 50  # smaller batches render in-process (~2ms per invoice)
+INVOICE_PDF_BATCH_SIZE = 200  # invoices per Celery render job
+INVOICE_PDF_TEMPLATE_TTL = 300  # seconds a compiled tenant template is reused
+RECURRING_INVOICE_BATCH_SIZE = 500  # schedules billed per transaction (invoices.recurring)
+RECONCILIATION_MAX_PAYMENTS = 2000  # statement lines per reconciliation request (one transaction)
+
 
 
 # Password validation
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'adinvoice.settings')
 
 application = get_wsgi_application()
+
+# Register every tenant database once per worker instead of lazily per request
+from tenants.registry import tenant_registry  # noqa: E402
+
+tenant_registry.preload()
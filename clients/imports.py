@@ -0,0 +1,25 @@
+from rest_framework import serializers
+
+from common.imports import BulkImporter
+from .models import ClientCompany
+
+
+class ClientCompanyImportSerializer(serializers.ModelSerializer):
+    """A CSV row of a client import (no logo upload)."""
+    class Meta:
+        model = ClientCompany
+        exclude = ["id", "logo", "created_at", "updated_at"]
+
+
+class ClientCompanyImporter(BulkImporter):
+    model = ClientCompany
+    serializer_class = ClientCompanyImportSerializer
+    duplicate_field = "name"
+    duplicate_error = "Client company with this name already exists"
+
+    def existing_keys(self):
+        names = ClientCompany.objects.using(self.db_alias).values_list("name", flat=True)
+        return {name.lower() for name in names.iterator()}
+
+    def keys(self, data):
+        return [data["name"].lower()]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0008_alter_clientcompany_logo'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientcompany',
+            index=models.Index(fields=['created_at', 'id'], name='client_created_id_idx'),
+        ),
+    ]
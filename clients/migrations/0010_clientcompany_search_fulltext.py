@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def add_search_index(apps, schema_editor):
+    # FULLTEXT is MySQL-only; other databases use the icontains fallback of common.search
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(
+        "CREATE FULLTEXT INDEX client_search_ft ON clients_clientcompany (name, email, tax_id, city)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute("DROP INDEX client_search_ft ON clients_clientcompany")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0009_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_index, drop_search_index),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0010_clientcompany_search_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='clientcompany',
+            index=models.Index(fields=['name'], name='client_name_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:44
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+def rename_duplicate_names(apps, schema_editor):
+    # Existing case-insensitive duplicates would block the unique constraint:
+    # keep the oldest client's name and number the others.
+    ClientCompany = apps.get_model("clients", "ClientCompany")
+    clients = ClientCompany.objects.using(schema_editor.connection.alias)
+    names = {name.lower() for name in clients.values_list("name", flat=True)}
+    seen = set()
+    for client in clients.order_by("created_at", "id").only("id", "name"):
+        key = client.name.lower()
+        if key not in seen:
+            seen.add(key)
+            continue
+        number = 2
+        while f"{client.name} ({number})".lower() in names:
+            number += 1
+        new_name = f"{client.name} ({number})"
+        names.add(new_name.lower())
+        seen.add(new_name.lower())
+        clients.filter(id=client.id).update(name=new_name)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0011_clientcompany_client_name_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='clientcompany',
+            name='client_name_idx',
+        ),
+        migrations.RunPython(rename_duplicate_names, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='clientcompany',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='client_name_ci_unique'),
+        ),
+    ]
@@ -1,7 +1,11 @@
 from django.db import models
+from django.db.models.functions import Lower
 import uuid
 
 class ClientCompany(models.Model):
+    # Covered by the FULLTEXT index client_search_ft (MySQL), see common.search
+    SEARCH_FIELDS = ["name", "email", "tax_id", "city"]
+
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     
     # Basic Info
@@ -40,6 +44,14 @@ class ClientCompany(models.Model):
     class Meta:
         verbose_name = "Client Company"
         verbose_name_plural = "Client Companies"
+        indexes = [
+            # Keyset pagination order (common.pagination)
+            models.Index(fields=["created_at", "id"], name="client_created_id_idx"),
+        ]
+        constraints = [
+            # One client per name, ignoring case; enforced by the INSERT itself
+            models.UniqueConstraint(Lower("name"), name="client_name_ci_unique"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.tenant.name})"
@@ -8,7 +8,7 @@ class ClientCompanySerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def create(self, validated_data):
-        # Get tenant DB alias from serializer context
-        db_alias = self.context.get("db_alias", "default")
+        # Get tenant DB alias from serializer context (None lets TenantRouter decide)
+        db_alias = self.context.get("db_alias")
         # Use .using(db_alias) for multi-tenant save
         return ClientCompany.objects.using(db_alias).create(**validated_data)
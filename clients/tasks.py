@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from common.imports import import_stored_file
+from tenants.cache import get_cached_tenant
+from tenants.db_utils import get_tenant_db
+from .imports import ClientCompanyImporter
+
+
+@shared_task
+def import_client_companies(tenant_id, path):
+    """Bulk import a stored client CSV into the tenant DB."""
+    db_alias = get_tenant_db(get_cached_tenant(tenant_id))
+    report = import_stored_file(ClientCompanyImporter(db_alias), path)
+    report["tenant_id"] = tenant_id
+    return report
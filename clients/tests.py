@@ -1,3 +1,26 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models.functions import Lower
 from django.test import TestCase
 
-# Create your tests here.
+from common.testing import IndexUsageMixin
+from .models import ClientCompany
+
+
+@skipUnless(connection.vendor == "mysql", "EXPLAIN plans are checked on MySQL only")
+class ClientCompanyIndexTests(IndexUsageMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        ClientCompany.objects.bulk_create(
+            [ClientCompany(name=f"Client {i}", city="Berlin") for i in range(300)]
+        )
+
+    def test_name_lookup_uses_unique_name_index(self):
+        queryset = ClientCompany.objects.alias(lower_name=Lower("name")).filter(lower_name="client 42")
+        self.assertUsesIndex(queryset, "client_name_ci_unique")
+
+    def test_list_page_uses_created_at_index(self):
+        queryset = ClientCompany.objects.order_by("-created_at", "-id")[:51]
+        self.assertUsesIndex(queryset, "client_created_id_idx")
@@ -3,6 +3,10 @@ from . import views
 
 urlpatterns = [
     path("list/<int:tenant>/", views.list_client_companies, name="list_clients"),
+    path("search/", views.search_client_companies, name="search_clients"),
+    path("export/", views.export_client_companies, name="export_clients"),
+    path("import/", views.import_client_companies_csv, name="import_clients"),
+    path("import/<str:task_id>/", views.client_import_status, name="import_clients_status"),
     path("create/", views.create_client_company, name="create_client"),
     path("update/<str:client_id>/", views.update_client_company, name="update_client"),
     path("delete/<str:client_id>/", views.delete_client_company, name="delete_client"),
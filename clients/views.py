@@ -1,12 +1,20 @@
 from django.shortcuts import render
-from tenants.db_utils import get_tenant_db
+from django.conf import settings
+from common.exports import EXPORT_FORMATS, export_response
+from common.imports import import_job_status, queue_import, read_csv
+from common.pagination import InvalidCursor, KeysetPaginator
+from common.search import paginate_hits, search
+from tenants.cache import get_cached_tenant
+from tenants.db_utils import get_tenant_db, resolve_tenant
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from tenants.models import Tenant
+from .imports import ClientCompanyImporter
 from .models import ClientCompany
 from .serializers import ClientCompanySerializer
+from .tasks import import_client_companies
 from django.db import IntegrityError
 
 
@@ -17,24 +25,23 @@ from django.db import IntegrityError
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def create_client_company(request):
-    tenant_id = request.data.get("tenant")
-    if not tenant_id:
-        return Response({"error": "Tenant ID is required"}, status=400)
-
     try:
-        tenant = Tenant.objects.get(id=tenant_id)
+        tenant = resolve_tenant(request)
     except Tenant.DoesNotExist:
         return Response({"error": "Tenant not found"}, status=404)
+    if tenant is None:
+        return Response({"error": "Tenant ID is required"}, status=400)
 
-    db_alias = get_tenant_db(tenant)
-
-    client_name = request.data.get("name")
-    if ClientCompany.objects.using(db_alias).filter(name__iexact=client_name).exists():
-        return Response({"error": "Client company with this name already exists"}, status=400)
+    db_alias = request.db_alias
 
     serializer = ClientCompanySerializer(data=request.data)
     if serializer.is_valid():
-        company = ClientCompany.objects.using(db_alias).create(**serializer.validated_data)
+        # Names are unique case-insensitively (client_name_ci_unique), so a
+        # duplicate is rejected by the INSERT itself
+        try:
+            company = ClientCompany.objects.using(db_alias).create(**serializer.validated_data)
+        except IntegrityError:
+            return Response({"error": "Client company with this name already exists"}, status=400)
         return Response({"success": "Client company created", "data": {"id": company.id, "name": company.name}}, status=201)
     
     print(serializer.errors)
@@ -51,20 +58,137 @@ def list_client_companies(request, tenant):
         return Response({"error": "Tenant ID is required"}, status=400)
 
     try:
-        tenant = Tenant.objects.get(id=tenant)
+        tenant = get_cached_tenant(tenant)
     except Tenant.DoesNotExist:
         return Response({"error": "Tenant/Database not found"}, status=404)
 
     db_alias = get_tenant_db(tenant)
 
-    clients = ClientCompany.objects.using(db_alias).all()
+    # 🔹 One page at a time; the next page is advertised in the Link header
+    paginator = KeysetPaginator(request)
+    try:
+        clients = paginator.paginate(ClientCompany.objects.using(db_alias).all())
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
     if not clients:
         return Response({"error":"Clients not founded"})
 
     serializer = ClientCompanySerializer(clients, many=True)
-    return Response(serializer.data, status=status.HTTP_200_OK)
+    return paginator.add_headers(Response(serializer.data, status=status.HTTP_200_OK))
+
+
+
+
+
+# Endpoint: Search Clients (name, email, tax ID, city)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def search_client_companies(request):
+    try:
+        tenant = resolve_tenant(request)
+    except Tenant.DoesNotExist:
+        return Response({"error": "Tenant not found"}, status=404)
+    if tenant is None:
+        return Response({"error": "Tenant ID is required"}, status=400)
 
+    query = request.query_params.get("q", "").strip()
+    if not query:
+        return Response({"error": "Search query (q) is required"}, status=400)
+
+    db_alias = request.db_alias
+    hits, page = paginate_hits(
+        request, search(ClientCompany.objects.using(db_alias), ClientCompany.SEARCH_FIELDS, query)
+    )
+    results = [
+        {**ClientCompanySerializer(client).data, "score": float(client.relevance)}
+        for client in hits
+    ]
+    return Response({"results": results, "pagination": page}, status=status.HTTP_200_OK)
+
+
+
+
+# Endpoint: Export Clients as CSV/XLSX (streamed)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def export_client_companies(request):
+    try:
+        tenant = resolve_tenant(request)
+    except Tenant.DoesNotExist:
+        return Response({"error": "Tenant not found"}, status=404)
+    if tenant is None:
+        return Response({"error": "Tenant ID is required"}, status=400)
+
+    export_format = request.query_params.get("file_format", "csv")
+    if export_format not in EXPORT_FORMATS:
+        return Response({"error": "file_format must be csv or xlsx"}, status=400)
+
+    db_alias = request.db_alias
+    columns = [
+        ("Name", "name"),
+        ("Industry", "industry"),
+        ("Website", "website"),
+        ("Registration Number", "registration_number"),
+        ("Tax ID", "tax_id"),
+        ("Address Line 1", "address_line1"),
+        ("Address Line 2", "address_line2"),
+        ("City", "city"),
+        ("State", "state"),
+        ("Country", "country"),
+        ("Postal Code", "postal_code"),
+        ("Phone", "phone"),
+        ("Email", "email"),
+        ("Support Email", "support_email"),
+        ("Active", "is_active"),
+        ("Created At", "created_at"),
+    ]
+    return export_response(ClientCompany.objects.using(db_alias), columns, "clients", export_format)
+
+
+
+
+# Endpoint: Bulk Import Clients from CSV
+# Small files are imported right away; bigger ones run as a Celery job
+# whose report is polled from import/<task_id>/.
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def import_client_companies_csv(request):
+    try:
+        tenant = resolve_tenant(request)
+    except Tenant.DoesNotExist:
+        return Response({"error": "Tenant not found"}, status=404)
+    if tenant is None:
+        return Response({"error": "Tenant ID is required"}, status=400)
+
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "A CSV file is required"}, status=400)
+
+    if upload.size <= settings.IMPORT_SYNC_MAX_BYTES:
+        db_alias = request.db_alias
+        report = ClientCompanyImporter(db_alias).run(read_csv(upload))
+        return Response({"success": "Clients imported", "report": report}, status=status.HTTP_200_OK)
+
+    task_id = queue_import(import_client_companies, request.tenant_id, upload)
+    return Response({"success": "Import queued", "task_id": task_id}, status=status.HTTP_202_ACCEPTED)
+
+
+# Endpoint: Bulk Import Status
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def client_import_status(request, task_id):
+    try:
+        tenant = resolve_tenant(request)
+    except Tenant.DoesNotExist:
+        return Response({"error": "Tenant not found"}, status=404)
+    if tenant is None:
+        return Response({"error": "Tenant ID is required"}, status=400)
+
+    job = import_job_status(task_id, request.tenant_id)
+    if job is None:
+        return Response({"error": "Import not found"}, status=404)
+    return Response(job, status=status.HTTP_200_OK)
 
 
 
@@ -73,18 +197,15 @@ def list_client_companies(request, tenant):
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 def update_client_company(request, client_id):
-    tenant_id = request.data.get("tenant")
-
-    if not tenant_id:
-        return Response({"error": "Tenant not found"}, status=status.HTTP_400_BAD_REQUEST)
-    
     try:
-        tenant_obj = Tenant.objects.get(id=tenant_id)
+        tenant_obj = resolve_tenant(request)
     except Tenant.DoesNotExist:
         return Response({"error": "Tenant/Database not found"}, status=status.HTTP_404_NOT_FOUND)
+    if tenant_obj is None:
+        return Response({"error": "Tenant not found"}, status=status.HTTP_400_BAD_REQUEST)
 
     # Get tenant DB alias
-    db_alias = get_tenant_db(tenant_obj)
+    db_alias = request.db_alias
 
     try:
         client = ClientCompany.objects.using(db_alias).get(id=client_id)
@@ -94,8 +215,14 @@ def update_client_company(request, client_id):
     serializer = ClientCompanySerializer(client, data=request.data, partial=True, context={"using": db_alias})
     if serializer.is_valid():
         # Force save on the correct DB
-        client = serializer.save()
-        client.save(using=db_alias)
+        try:
+            client = serializer.save()
+            client.save(using=db_alias)
+        except IntegrityError:
+            return Response(
+                {"error": "Client company with this name already exists"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         return Response(
             {"success": "Client company updated", "data": serializer.data},
             status=status.HTTP_200_OK,
@@ -109,18 +236,15 @@ def update_client_company(request, client_id):
 @api_view(["DELETE"])
 @permission_classes([IsAuthenticated])
 def delete_client_company(request, client_id):
-    tenant_id = request.data.get("tenant")
-
-    if not tenant_id:
-        return Response({"error": "Tenant not found"}, status=status.HTTP_400_BAD_REQUEST)
-
     try:
-        tenant_obj = Tenant.objects.get(id=tenant_id)
+        tenant_obj = resolve_tenant(request)
     except Tenant.DoesNotExist:
         return Response({"error": "Tenant/Database not found"}, status=status.HTTP_404_NOT_FOUND)
+    if tenant_obj is None:
+        return Response({"error": "Tenant not found"}, status=status.HTTP_400_BAD_REQUEST)
 
     # Get tenant DB alias
-    db_alias = get_tenant_db(tenant_obj)
+    db_alias = request.db_alias
 
     try:
         client = ClientCompany.objects.using(db_alias).get(id=client_id)
@@ -137,18 +261,15 @@ def delete_client_company(request, client_id):
 @api_view(["PATCH"])
 @permission_classes([IsAuthenticated])
 def toggle_client_status(request, client_id):
-    tenant_id = request.data.get("tenant")
-
-    if not tenant_id:
-        return Response({"error": "Tenant not found"}, status=status.HTTP_400_BAD_REQUEST)
-
     try:
-        tenant_obj = Tenant.objects.get(id=tenant_id)
+        tenant_obj = resolve_tenant(request)
     except Tenant.DoesNotExist:
         return Response({"error": "Tenant/Database not found"}, status=status.HTTP_404_NOT_FOUND)
+    if tenant_obj is None:
+        return Response({"error": "Tenant not found"}, status=status.HTTP_400_BAD_REQUEST)
 
     # Get tenant DB alias
-    db_alias = get_tenant_db(tenant_obj)
+    db_alias = request.db_alias
 
     try:
         client = ClientCompany.objects.using(db_alias).get(id=client_id)
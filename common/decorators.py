@@ -2,6 +2,20 @@ from functools import wraps
 from rest_framework.response import Response
 from rest_framework import status
 
+
+def request_role(request):
+    """
+    Role of the authenticated user, read from the ``role`` claim of the
+    verified token when there is one so no User row has to be loaded.
+    """
+    token = getattr(request, "auth", None)
+    role = token.get("role") if hasattr(token, "get") else None
+    if role is None:
+        # Session auth or a token issued before the role claim existed
+        role = request.user.role
+    return role
+
+
 def role_required(allowed_roles):
     """
     allowed_roles = ["admin", "staff"]
@@ -14,7 +28,7 @@ def role_required(allowed_roles):
                 if not user.is_authenticated:
                     return Response({"error": "Authentication required"}, status=status.HTTP_401_UNAUTHORIZED)
 
-                if user.role not in allowed_roles:
+                if request_role(request) not in allowed_roles:
                     return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
 
                 return func(request, *args, **kwargs)
@@ -0,0 +1,163 @@
+import csv
+import io
+import uuid
+
+from celery.result import AsyncResult
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+
+
+def read_csv(fileobj):
+    """
+    Yield ``(line_number, row)`` for every data row of an uploaded CSV file,
+    decoding it incrementally. Header names are normalized to lower case and
+    empty cells are dropped so model defaults apply.
+    """
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    reader = csv.DictReader(text)
+    if reader.fieldnames:
+        reader.fieldnames = [(name or "").strip().lower() for name in reader.fieldnames]
+    for row in reader:
+        yield reader.line_num, {
+            key: value.strip() for key, value in row.items()
+            if key and value is not None and value.strip() != ""
+        }
+
+
+def save_upload(upload):
+    """Store an upload for a background import and return its storage path."""
+    return default_storage.save(f"imports/{uuid.uuid4().hex}.csv", upload)
+
+
+def import_stored_file(importer, path):
+    """Run ``importer`` over a file stored by save_upload, then delete it."""
+    try:
+        with default_storage.open(path, "rb") as fileobj:
+            return importer.run(read_csv(fileobj))
+    finally:
+        default_storage.delete(path)
+
+
+def import_task_id(tenant_id):
+    """Celery task id of a new import; it names the tenant that queued it."""
+    return f"import-{tenant_id}-{uuid.uuid4().hex}"
+
+
+def queue_import(task, tenant_id, upload):
+    """Store ``upload`` and run ``task(tenant_id, path)`` in the background; returns the task id."""
+    task_id = import_task_id(tenant_id)
+    task.apply_async((tenant_id, save_upload(upload)), task_id=task_id)
+    return task_id
+
+
+def import_job_status(task_id, tenant_id):
+    """
+    State of a background import task, or None when the task belongs to
+    another tenant (checked before any state or error is looked up).
+    """
+    if not task_id.startswith(f"import-{tenant_id}-"):
+        return None
+    result = AsyncResult(task_id)
+    if result.failed():
+        return {"status": "failed", "error": str(result.result)}
+    if not result.successful():
+        return {"status": result.state.lower()}
+    report = result.result
+    if report.get("tenant_id") != tenant_id:
+        return None
+    return {"status": "done", "report": report}
+
+
+class BulkImporter:
+    """
+    Validate CSV rows and insert them with ``bulk_create`` on a tenant DB.
+
+    Rows are handled ``batch_size`` at a time: each row is validated with
+    ``serializer_class`` (which must not hit the database per row), checked
+    against the dedupe keys preloaded by ``existing_keys()`` plus the keys
+    seen earlier in the file, and the valid rows of the batch are written
+    with one bulk INSERT. Subclasses provide the model specifics.
+    """
+
+    model = None
+    serializer_class = None
+    duplicate_field = "non_field_errors"
+    duplicate_error = "Duplicate row"
+
+    def __init__(self, db_alias, batch_size=None):
+        self.db_alias = db_alias
+        self.batch_size = batch_size or getattr(settings, "IMPORT_BATCH_SIZE", 500)
+        self.max_errors = getattr(settings, "IMPORT_MAX_ERRORS", 1000)
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        self.seen = set()
+
+    def existing_keys(self):
+        """Dedupe keys already present in the tenant DB."""
+        return set()
+
+    def keys(self, data):
+        """Dedupe keys of a validated row (empty if it can't clash)."""
+        return []
+
+    def build(self, data):
+        """Unsaved model instance for a validated row."""
+        return self.model(**data)
+
+    def run(self, rows):
+        self.seen = self.existing_keys()
+        batch = []
+        total = 0
+        for line, row in rows:
+            total += 1
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                self.import_batch(batch)
+                batch = []
+        if batch:
+            self.import_batch(batch)
+        return {
+            "total": total,
+            "created": self.created,
+            "failed": self.error_count,
+            "errors": sorted(self.errors, key=lambda error: error["row"]),
+        }
+
+    def import_batch(self, batch):
+        pending = []
+        for line, row in batch:
+            serializer = self.serializer_class(data=row)
+            if not serializer.is_valid():
+                self.add_error(line, serializer.errors)
+                continue
+            keys = self.keys(serializer.validated_data)
+            if any(key in self.seen for key in keys):
+                self.add_error(line, {self.duplicate_field: [self.duplicate_error]})
+                continue
+            self.seen.update(keys)
+            pending.append((line, self.build(serializer.validated_data)))
+
+        if not pending:
+            return
+        try:
+            with transaction.atomic(using=self.db_alias):
+                self.model.objects.using(self.db_alias).bulk_create([obj for _, obj in pending])
+            self.created += len(pending)
+        except IntegrityError:
+            # Something changed under us (e.g. a concurrent insert):
+            # save the batch row by row to find the offending rows.
+            for line, obj in pending:
+                try:
+                    with transaction.atomic(using=self.db_alias):
+                        obj.save(using=self.db_alias, force_insert=True)
+                    self.created += 1
+                except IntegrityError as e:
+                    self.add_error(line, {"non_field_errors": [str(e)]})
+
+    def add_error(self, line, errors):
+        self.error_count += 1
+        # Keep the report bounded on badly broken files
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": line, "errors": errors})
@@ -0,0 +1,170 @@
+import base64
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+
+
+class InvalidCursor(ValueError):
+    """The ``cursor`` query parameter could not be decoded."""
+
+
+class KeysetPaginator:
+    """
+    Keyset (cursor) pagination for the list endpoints.
+
+    Rows are ordered by ``ordering`` (``created_at`` then the primary key by
+    default) and the next page is selected with a WHERE on the last row's
+    values instead of an OFFSET, so every page costs the same index range
+    scan however deep the client pages. Works with any primary key type,
+    including the UUID keys of ClientCompany. Nullable ordering fields sort
+    their NULLs last in both directions.
+
+    Clients pass ``?page_size=`` (capped at PAGINATION_MAX_PAGE_SIZE) and the
+    opaque ``?cursor=`` returned as ``next`` by the previous page.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+
+    def __init__(self, request, ordering=("-created_at", "-id")):
+        self.request = request
+        self.ordering = ordering
+        self.next_cursor = None
+
+    def paginate(self, queryset):
+        """Return the rows of the requested page as a list."""
+        self.page_size = self.get_page_size()
+        queryset = queryset.order_by(*self.order_by(queryset.model))
+
+        self.cursor = self.request.query_params.get(self.cursor_query_param)
+        if self.cursor:
+            queryset = queryset.filter(self.after(queryset.model, self.decode(self.cursor)))
+
+        # One extra row tells whether there is a next page without a COUNT(*)
+        rows = list(queryset[:self.page_size + 1])
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            self.next_cursor = self.encode(rows[-1])
+        self.rows_on_page = len(rows)
+        return rows
+
+    def get_count(self, queryset, cache_key, ttl=None):
+        """
+        Total rows of ``queryset`` (unordered, unpaginated), and whether the
+        number is exact.
+
+        When the first page holds every row its length is the count and no
+        query runs. Otherwise a COUNT(*) is cached under ``cache_key`` for
+        ``ttl`` seconds, so large listings pay for it once per TTL and get
+        an approximate total in between.
+        """
+        if not self.cursor and self.next_cursor is None:
+            return self.rows_on_page, True
+        ttl = ttl if ttl is not None else getattr(settings, "PAGINATION_COUNT_CACHE_TTL", 60)
+        key = "pagination-count:" + hashlib.sha1(cache_key.encode()).hexdigest()
+        count = cache.get(key)
+        if count is None:
+            count = queryset.order_by().count()
+            cache.set(key, count, ttl)
+            return count, True
+        return count, False
+
+    def get_page_size(self):
+        default = getattr(settings, "PAGINATION_PAGE_SIZE", 50)
+        maximum = getattr(settings, "PAGINATION_MAX_PAGE_SIZE", 500)
+        try:
+            size = int(self.request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            size = default
+        return max(1, min(size, maximum))
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        params = self.request.query_params.copy()
+        params[self.cursor_query_param] = self.next_cursor
+        return f"{url.split('?', 1)[0]}?{params.urlencode()}"
+
+    def get_pagination(self):
+        """Pagination block to embed in a response body."""
+        return {"next": self.get_next_link(), "next_cursor": self.next_cursor, "page_size": self.page_size}
+
+    def add_headers(self, response):
+        """Expose the next page on responses whose body is a bare list."""
+        link = self.get_next_link()
+        if link:
+            response["Link"] = f'<{link}>; rel="next"'
+            response["X-Next-Cursor"] = self.next_cursor
+        return response
+
+    # Cursor encoding
+
+    def fields(self):
+        return [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+
+    @staticmethod
+    def model_field(model, name):
+        return model._meta.pk if name == "id" else model._meta.get_field(name)
+
+    def order_by(self, model):
+        expressions = []
+        for name, descending in self.fields():
+            if self.model_field(model, name).null:
+                expression = F(name).desc(nulls_last=True) if descending else F(name).asc(nulls_last=True)
+                expressions.append(expression)
+            else:
+                expressions.append(f"-{name}" if descending else name)
+        return expressions
+
+    def encode(self, row):
+        values = []
+        for name, _ in self.fields():
+            value = getattr(row, "pk" if name == "id" else name)
+            if value is not None:
+                value = value.isoformat() if hasattr(value, "isoformat") else str(value)
+            values.append(value)
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+    def decode(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise InvalidCursor("Invalid cursor")
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise InvalidCursor("Invalid cursor")
+        return values
+
+    def after(self, model, values):
+        """
+        WHERE clause selecting the rows after ``values``:
+        (a < x) OR (a = x AND b < y) OR ... for descending fields, where a
+        NULL sorts after every value.
+        """
+        fields = self.fields()
+        parsed = []
+        for (name, _), value in zip(fields, values):
+            field = self.model_field(model, name)
+            if value is None and not field.null:
+                raise InvalidCursor("Invalid cursor")
+            try:
+                parsed.append(None if value is None else field.to_python(value))
+            except Exception:
+                raise InvalidCursor("Invalid cursor")
+
+        condition = Q()
+        for i, (name, descending) in enumerate(fields):
+            value = parsed[i]
+            if value is None:
+                continue  # nothing sorts after NULL on this field
+            term = Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            if self.model_field(model, name).null:
+                term |= Q(**{f"{name}__isnull": True})
+            for (prev_name, _), prev_value in zip(fields[:i], parsed[:i]):
+                term &= Q(**{f"{prev_name}__isnull": True} if prev_value is None else {prev_name: prev_value})
+            condition |= term
+        return condition
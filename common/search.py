@@ -0,0 +1,78 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+# Characters with a meaning in MySQL boolean full-text queries
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]+')
+
+
+def search_terms(query):
+    return _BOOLEAN_OPERATORS.sub(" ", query).split()
+
+
+def search(queryset, fields, query):
+    """
+    Rank the rows of ``queryset`` matching ``query`` on ``fields``, best
+    first, annotated with ``relevance``.
+
+    On MySQL this is a MATCH ... AGAINST on the FULLTEXT index over exactly
+    ``fields`` (every word required, prefix matches allowed, so it works
+    for search-as-you-type). Other databases fall back to an icontains
+    scan ranked by where the words match.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset.none()
+
+    connection = connections[queryset.db]
+    if connection.vendor == "mysql":
+        table = connection.ops.quote_name(queryset.model._meta.db_table)
+        columns = ", ".join(
+            f"{table}.{connection.ops.quote_name(queryset.model._meta.get_field(name).column)}"
+            for name in fields
+        )
+        against = " ".join(f"+{term}*" for term in terms)
+        relevance = RawSQL(f"MATCH ({columns}) AGAINST (%s IN BOOLEAN MODE)", [against])
+        return (
+            queryset.annotate(relevance=relevance)
+            .filter(relevance__gt=0)
+            .order_by("-relevance", "pk")
+        )
+
+    condition = Q()
+    for term in terms:
+        term_condition = Q()
+        for name in fields:
+            term_condition |= Q(**{f"{name}__icontains": term})
+        condition &= term_condition
+    first = fields[0]
+    relevance = Case(
+        When(**{f"{first}__iexact": query}, then=Value(3)),
+        When(**{f"{first}__istartswith": terms[0]}, then=Value(2)),
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    return queryset.filter(condition).annotate(relevance=relevance).order_by("-relevance", "pk")
+
+
+def paginate_hits(request, queryset):
+    """
+    One page of ranked hits (``?page=``, ``?page_size=``) plus whether more
+    follow. Hits are ordered by relevance, so pages use LIMIT/OFFSET; one
+    extra row is fetched instead of counting every match.
+    """
+    default = getattr(settings, "PAGINATION_PAGE_SIZE", 50)
+    maximum = getattr(settings, "PAGINATION_MAX_PAGE_SIZE", 500)
+    try:
+        page = max(1, int(request.query_params.get("page", 1)))
+        page_size = max(1, min(int(request.query_params.get("page_size", default)), maximum))
+    except (TypeError, ValueError):
+        page, page_size = 1, default
+
+    start = (page - 1) * page_size
+    hits = list(queryset[start:start + page_size + 1])
+    has_next = len(hits) > page_size
+    return hits[:page_size], {"page": page, "page_size": page_size, "has_next": has_next}
@@ -0,0 +1,43 @@
+import json
+
+from django.db import connections
+
+
+class IndexUsageMixin:
+    """
+    EXPLAIN-based assertions for TestCases guarding the index set of the hot
+    queries. The plans are read from MySQL's EXPLAIN FORMAT=JSON, so tests
+    using this mixin should be skipped on other databases.
+    """
+
+    def explain(self, queryset):
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(f"ANALYZE TABLE {queryset.model._meta.db_table}")
+        return json.loads(queryset.explain(format="json"))
+
+    def plan_tables(self, plan):
+        """Every ``table`` access in a JSON plan, however deeply nested."""
+        if isinstance(plan, dict):
+            for key, value in plan.items():
+                if key == "table" and isinstance(value, dict):
+                    yield value
+                yield from self.plan_tables(value)
+        elif isinstance(plan, list):
+            for item in plan:
+                yield from self.plan_tables(item)
+
+    def assertUsesIndex(self, queryset, index_name=None):
+        """
+        Assert the query reads its table through ``index_name`` (or any index
+        when not given) instead of a full table scan.
+        """
+        table_name = queryset.model._meta.db_table
+        plan = self.explain(queryset)
+        accesses = [table for table in self.plan_tables(plan) if table.get("table_name") == table_name]
+        self.assertTrue(accesses, f"{table_name} is not in the plan: {plan}")
+        for access in accesses:
+            self.assertNotEqual(access.get("access_type"), "ALL", f"Full scan of {table_name}: {access}")
+            if index_name:
+                self.assertEqual(access.get("key"), index_name, f"{table_name} not read through {index_name}: {access}")
+            else:
+                self.assertTrue(access.get("key"), f"{table_name} not read through an index: {access}")
@@ -0,0 +1,94 @@
+import datetime
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+
+from invoices.models import Invoice
+from invoices.sequences import SequenceAllocator
+from invoices.services import create_invoice
+from tenants.db_utils import configure_db, unregister_tenant_db
+from tenants.pool import tenant_pools
+from tenants.provisioning import create_database, migrate_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Create invoices from parallel workers in a throwaway tenant database "
+        "and report throughput, latency and sequence gaps for the strict and "
+        "block invoice numbering modes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8, help="Concurrent invoice writers")
+        parser.add_argument("--invoices", type=int, default=500, help="Invoices to create per mode")
+        parser.add_argument("--block-size", type=int, default=None, help="Numbers reserved per block")
+
+    def handle(self, *args, **options):
+        workers = options["workers"]
+        db_name = f"bench_invoices_{uuid.uuid4().hex[:8]}"
+        pool_size = tenant_pools.pool_size
+        # Let every writer thread hold a pooled connection at the same time
+        tenant_pools.pool_size = max(pool_size, workers)
+        try:
+            create_database(db_name)
+            db_alias = configure_db(db_name)
+            migrate_database(db_alias)
+
+            results = {}
+            for mode in ("strict", "block"):
+                with override_settings(INVOICE_NUMBER_MODE=mode):
+                    results[mode] = self.run(db_alias, mode, workers, options["invoices"], options["block_size"])
+        finally:
+            tenant_pools.pool_size = pool_size
+            unregister_tenant_db(db_name)
+            with connections["default"].cursor() as cursor:
+                cursor.execute(f"DROP DATABASE IF EXISTS `{db_name}`")
+
+        speedup = results["block"] / results["strict"]
+        self.stdout.write(self.style.SUCCESS(f"block is {speedup:.1f}x the throughput of strict"))
+
+    def run(self, db_alias, mode, workers, total, block_size):
+        Invoice.objects.using(db_alias).all().delete()
+        today = datetime.date.today()
+        data = {
+            "client_name": "Benchmark client",
+            "issue_date": today,
+            "due_date": today + datetime.timedelta(days=30),
+            "line_items": [{"description": "Benchmark", "quantity": Decimal("1"), "unit_price": Decimal("100.00")}],
+        }
+        local = threading.local()
+
+        def create_one(_):
+            # One allocator per thread, like one per worker process in production
+            if not hasattr(local, "allocator"):
+                local.allocator = SequenceAllocator(name=f"bench_{mode}", block_size=block_size)
+            started = time.perf_counter()
+            try:
+                create_invoice(db_alias, data, allocator=local.allocator)
+            finally:
+                # Hand the connection back to the pool, as at the end of a request
+                connections[db_alias].close()
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(create_one, range(total)))
+        elapsed = time.perf_counter() - started
+
+        numbers = list(Invoice.objects.using(db_alias).values_list("number", flat=True))
+        duplicates = len(numbers) - len(set(numbers))
+        gaps = max(numbers) - min(numbers) + 1 - len(set(numbers))
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+        throughput = total / elapsed
+        self.stdout.write(
+            f"{mode:>6}: {throughput:.0f} invoices/s  p95 {p95:.1f}ms  "
+            f"({total} invoices, {workers} workers, {duplicates} duplicates, {gaps} gaps)"
+        )
+        return throughput
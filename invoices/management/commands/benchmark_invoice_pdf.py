@@ -0,0 +1,110 @@
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+
+from invoices.pdf import compile_template, render_invoice
+from invoices.rendering import content_hash, store_pdf
+
+BRANDING = {
+    "name": "Benchmark Traders Pvt Ltd",
+    "address": ["12 Market Road", "Suite 4", "Kochi, Kerala, 682001", "India"],
+    "footer": "billing@example.com | +91 90000 00000 | https://example.com",
+}
+
+
+def timed_render(template, payloads):
+    """Render a chunk in a worker process; returns the seconds each invoice took."""
+    latencies = []
+    for payload in payloads:
+        started = time.perf_counter()
+        render_invoice(template, payload)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def payload(number, lines):
+    return {
+        "number": f"INV-{number:06d}",
+        "client_name": f"Client {number}",
+        "issue_date": "2025-01-01",
+        "due_date": "2025-01-31",
+        "status": "Unpaid",
+        "notes": "Payment within 30 days. Thank you for your business!",
+        "line_items": [
+            {
+                "description": f"Consulting services, milestone {line}",
+                "quantity": "2",
+                "unit_price": "1,250.00",
+                "tax_rate": "18",
+                "total": "2,950.00",
+            }
+            for line in range(lines)
+        ],
+        "subtotal": "1,000.00",
+        "tax_amount": "180.00",
+        "amount": "1,180.00",
+        "amount_paid": "0.00",
+        "balance": "1,180.00",
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Render synthetic invoices to PDF and report template compile cost, "
+        "throughput and p95 latency in-process, in a process pool and when "
+        "the content-addressed PDFs are already stored."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--invoices", type=int, default=500, help="Invoices to render per run")
+        parser.add_argument("--lines", type=int, default=15, help="Line items per invoice")
+        parser.add_argument("--workers", type=int, default=4, help="Render processes")
+
+    def handle(self, *args, **options):
+        total, workers = options["invoices"], options["workers"]
+        payloads = [payload(number, options["lines"]) for number in range(1, total + 1)]
+
+        started = time.perf_counter()
+        for _ in range(100):
+            template = compile_template(BRANDING)
+        compile_ms = (time.perf_counter() - started) * 10
+        self.stdout.write(f"template compile: {compile_ms:.2f}ms (paid once per tenant per INVOICE_PDF_TEMPLATE_TTL)")
+
+        latencies = []
+        started = time.perf_counter()
+        for item in payloads:
+            began = time.perf_counter()
+            render_invoice(template, item)
+            latencies.append(time.perf_counter() - began)
+        self.report("in-process", total, time.perf_counter() - started, latencies)
+
+        chunk_size = max(1, total // (workers * 4))
+        chunks = [payloads[i:i + chunk_size] for i in range(0, total, chunk_size)]
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            latencies = [
+                latency
+                for chunk in executor.map(timed_render, [template] * len(chunks), chunks)
+                for latency in chunk
+            ]
+        self.report(f"{workers} processes", total, time.perf_counter() - started, latencies)
+
+        with tempfile.TemporaryDirectory() as location:
+            storage = FileSystemStorage(location=location)
+            for item in payloads:
+                store_pdf(f"{content_hash(template, item)}.pdf", render_invoice(template, item), storage)
+            latencies = []
+            started = time.perf_counter()
+            for item in payloads:
+                began = time.perf_counter()
+                storage.exists(f"{content_hash(template, item)}.pdf")
+                latencies.append(time.perf_counter() - began)
+            self.report("already stored", total, time.perf_counter() - started, latencies)
+
+    def report(self, label, total, elapsed, latencies):
+        p95 = statistics.quantiles(latencies, n=20)[-1] * 1000
+        self.stdout.write(f"{label:>14}: {total / elapsed:.0f} invoices/s  p95 {p95:.2f}ms  ({total} invoices)")
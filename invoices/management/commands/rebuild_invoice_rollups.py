@@ -0,0 +1,50 @@
+import datetime
+
+from django.core.management.base import BaseCommand, CommandError
+
+from invoices.rollups import rebuild_rollups, repair_rollups
+from tenants.models import Tenant
+from tenants.registry import tenant_registry
+
+
+def parse_day(value):
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise CommandError(f"Invalid date {value!r}, expected YYYY-MM-DD")
+
+
+class Command(BaseCommand):
+    help = (
+        "Repair the dashboard rollup tables of tenant databases: compare them "
+        "with the invoices and receipts and rewrite only the days that drifted. "
+        "With --full, rebuild them from scratch instead (backfill)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--tenant", action="append", dest="tenants", default=[],
+            help="Only this tenant database (repeatable)",
+        )
+        parser.add_argument("--since", type=parse_day, help="First day to compare (YYYY-MM-DD)")
+        parser.add_argument("--until", type=parse_day, help="Last day to compare (YYYY-MM-DD)")
+        parser.add_argument(
+            "--full", action="store_true",
+            help="Delete and rebuild every rollup row; locks the rollups while it runs",
+        )
+
+    def handle(self, *args, **options):
+        if options["full"] and (options["since"] or options["until"]):
+            raise CommandError("--full rebuilds every day; drop --since/--until")
+
+        db_names = Tenant.objects.filter(status="ready", db_name__isnull=False).values_list("db_name", flat=True)
+        if options["tenants"]:
+            db_names = db_names.filter(db_name__in=options["tenants"])
+
+        for db_name in db_names:
+            db_alias = tenant_registry.get(db_name)
+            if options["full"]:
+                report = rebuild_rollups(db_alias)
+            else:
+                report = repair_rollups(db_alias, options["since"], options["until"])
+            self.stdout.write(f"{db_name}: {report}")
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0008_alter_clientcompany_logo'),
+        ('invoices', '0002_initial'),
+        ('productservices', '0005_remove_productservice_entrepreneur_id'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='invoice',
+            name='tenant',
+        ),
+        migrations.RemoveField(
+            model_name='proposal',
+            name='tenant',
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='client',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='clients.clientcompany'),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='notes',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='tax_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AlterField(
+            model_name='invoice',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.CreateModel(
+            name='InvoiceLineItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('description', models.CharField(max_length=255)),
+                ('quantity', models.DecimalField(decimal_places=3, max_digits=12)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('tax_rate', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('subtotal', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('tax_amount', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=14)),
+                ('invoice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='line_items', to='invoices.invoice')),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoice_lines', to='productservices.productservice')),
+            ],
+            options={
+                'ordering': ['invoice', 'position'],
+            },
+        ),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:50
+
+import uuid
+from django.db import migrations, models
+from django.db.models import F
+
+
+def settle_paid_invoices(apps, schema_editor):
+    # Invoices marked paid before receipts were recorded count as fully paid.
+    # The rollup tables are filled by invoices.tasks.rebuild_invoice_rollups.
+    Invoice = apps.get_model("invoices", "Invoice")
+    Invoice.objects.using(schema_editor.connection.alias).filter(status="paid").update(amount_paid=F("amount"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0006_invoice_invoice_status_due_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='amount_paid',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.RunPython(settle_paid_invoices, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='invoice',
+            name='status',
+            field=models.CharField(choices=[('unpaid', 'Unpaid'), ('partially_paid', 'Partially paid'), ('paid', 'Paid')], max_length=50),
+        ),
+        migrations.CreateModel(
+            name='InvoiceDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status', models.CharField(max_length=50)),
+                ('client_id', models.UUIDField(default=uuid.UUID('00000000-0000-0000-0000-000000000000'))),
+                ('invoice_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('amount_paid', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', 'day'], name='invoice_rollup_status_day_idx')],
+                'constraints': [models.UniqueConstraint(fields=('day', 'status', 'client_id'), name='invoice_rollup_key')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ReceiptDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('client_id', models.UUIDField(default=uuid.UUID('00000000-0000-0000-0000-000000000000'))),
+                ('receipt_count', models.IntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'client_id'), name='receipt_rollup_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('clients', '0012_clientcompany_name_ci_unique'),
+        ('invoices', '0007_invoice_rollups'),
+        ('productservices', '0008_productservice_search_fulltext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='billing_period',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='RecurringInvoiceSchedule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequency', models.CharField(choices=[('monthly', 'Monthly'), ('quarterly', 'Quarterly'), ('yearly', 'Yearly')], default='monthly', max_length=20)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField(blank=True, null=True)),
+                ('next_run_date', models.DateField()),
+                ('payment_terms_days', models.PositiveIntegerField(default=30)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recurring_schedules', to='clients.clientcompany')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RecurringInvoiceLine',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('description', models.CharField(max_length=255)),
+                ('quantity', models.DecimalField(decimal_places=3, max_digits=12)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('tax_rate', models.DecimalField(decimal_places=2, default=0, max_digits=5)),
+                ('product', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='recurring_lines', to='productservices.productservice')),
+                ('schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lines', to='invoices.recurringinvoiceschedule')),
+            ],
+            options={
+                'ordering': ['schedule', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='schedule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='invoices', to='invoices.recurringinvoiceschedule'),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('schedule', 'billing_period'), name='invoice_schedule_period_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringinvoiceschedule',
+            index=models.Index(fields=['is_active', 'next_run_date'], name='schedule_active_next_run_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='recurringinvoiceschedule',
+            index=models.Index(fields=['created_at', 'id'], name='schedule_created_id_idx'),
+        ),
+    ]
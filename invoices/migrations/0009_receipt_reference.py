@@ -0,0 +1,22 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0008_recurring_invoice_schedules'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='receipt',
+            name='reference',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='receipt',
+            index=models.Index(fields=['reference', 'payment_date'], name='receipt_reference_idx'),
+        ),
+    ]
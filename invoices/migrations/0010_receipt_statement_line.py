@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('invoices', '0009_receipt_reference'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='receipt',
+            name='receipt_reference_idx',
+        ),
+        migrations.AddField(
+            model_name='receipt',
+            name='statement_line',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='receipt',
+            constraint=models.UniqueConstraint(fields=('statement_line', 'invoice'), name='receipt_statement_line_uniq'),
+        ),
+    ]
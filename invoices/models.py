@@ -1,26 +1,225 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
-from tenants.models import Tenant
-from users.models import User
+from clients.models import ClientCompany
+from productservices.models import ProductService
+
+# Invoices live in the tenant databases (see settings.TENANT_APPS), so they
+# don't reference the shared Tenant table.
+
 
 class Proposal(models.Model):
-    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
     client_name = models.CharField(max_length=255)
     details = models.TextField()
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     status = models.CharField(max_length=50, choices=[("draft", "Draft"), ("sent", "Sent"), ("accepted", "Accepted")])
     created_at = models.DateTimeField(auto_now_add=True)
 
+class RecurringInvoiceSchedule(models.Model):
+    """
+    Bills a client the same line items every ``frequency``; due invoices
+    are generated in batches by invoices.recurring (Celery beat).
+    """
+    FREQUENCY_MONTHS = {"monthly": 1, "quarterly": 3, "yearly": 12}
+
+    client = models.ForeignKey(ClientCompany, on_delete=models.CASCADE, related_name="recurring_schedules")
+    frequency = models.CharField(
+        max_length=20,
+        choices=[("monthly", "Monthly"), ("quarterly", "Quarterly"), ("yearly", "Yearly")],
+        default="monthly"
+    )
+    start_date = models.DateField()  # first billing date; its day of month is kept
+    end_date = models.DateField(null=True, blank=True)  # no invoices for periods after this
+    next_run_date = models.DateField()  # billing date of the next invoice to generate
+    payment_terms_days = models.PositiveIntegerField(default=30)
+    notes = models.TextField(blank=True, null=True)
+    is_active = models.BooleanField(default=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Due schedules of a generation run
+            models.Index(fields=["is_active", "next_run_date"], name="schedule_active_next_run_idx"),
+            # Keyset pagination order (common.pagination)
+            models.Index(fields=["created_at", "id"], name="schedule_created_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.client_id} {self.frequency} from {self.start_date}"
+
+class RecurringInvoiceLine(models.Model):
+    schedule = models.ForeignKey(RecurringInvoiceSchedule, on_delete=models.CASCADE, related_name="lines")
+    product = models.ForeignKey(
+        ProductService,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="recurring_lines"
+    )
+    position = models.PositiveIntegerField(default=0)
+    description = models.CharField(max_length=255)
+    quantity = models.DecimalField(max_digits=12, decimal_places=3)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    tax_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)  # percent
+
+    class Meta:
+        ordering = ["schedule", "position"]
+
+    def __str__(self):
+        return f"{self.description} x {self.quantity}"
+
 class Invoice(models.Model):
-    tenant = models.ForeignKey(Tenant, on_delete=models.CASCADE)
+    client = models.ForeignKey(
+        ClientCompany,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="invoices"
+    )
+    # Set on invoices generated from a recurring schedule, one per billing period
+    schedule = models.ForeignKey(
+        RecurringInvoiceSchedule,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="invoices"
+    )
+    billing_period = models.DateField(null=True, blank=True)
+    # Sequential per-tenant number handed out by invoices.sequences
+    number = models.PositiveBigIntegerField(unique=True, null=True, blank=True, editable=False)
     client_name = models.CharField(max_length=255)
     issue_date = models.DateField()
     due_date = models.DateField()
-    amount = models.DecimalField(max_digits=10, decimal_places=2)
-    status = models.CharField(max_length=50, choices=[("unpaid", "Unpaid"), ("paid", "Paid")])
+
+    # Totals are computed server-side from the line items (invoices.services)
+    subtotal = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    tax_amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # grand total
+
+    amount_paid = models.DecimalField(max_digits=14, decimal_places=2, default=0)  # sum of its receipts
+
+    status = models.CharField(
+        max_length=50,
+        choices=[("unpaid", "Unpaid"), ("partially_paid", "Partially paid"), ("paid", "Paid")]
+    )
+    notes = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order (common.pagination)
+            models.Index(fields=["created_at", "id"], name="invoice_created_id_idx"),
+            # Unpaid / overdue invoice lookups
+            models.Index(fields=["status", "due_date"], name="invoice_status_due_idx"),
+        ]
+        constraints = [
+            # A recurring schedule bills each period once, however often generation runs
+            models.UniqueConstraint(fields=["schedule", "billing_period"], name="invoice_schedule_period_unique"),
+        ]
+
+    def __str__(self):
+        return f"Invoice {self.invoice_number or self.id} - {self.client_name}"
+
+    @property
+    def invoice_number(self):
+        if self.number is None:
+            return None
+        return settings.INVOICE_NUMBER_FORMAT.format(number=self.number)
+
+class InvoiceSequence(models.Model):
+    """Next free value of a numbering sequence in this tenant database."""
+    name = models.CharField(max_length=50, unique=True)
+    next_value = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.name}: {self.next_value}"
+
+class InvoiceLineItem(models.Model):
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name="line_items")
+    product = models.ForeignKey(
+        ProductService,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="invoice_lines"
+    )
+    position = models.PositiveIntegerField(default=0)
+    description = models.CharField(max_length=255)
+    quantity = models.DecimalField(max_digits=12, decimal_places=3)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    tax_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0)  # percent
+    subtotal = models.DecimalField(max_digits=14, decimal_places=2)
+    tax_amount = models.DecimalField(max_digits=14, decimal_places=2)
+    total = models.DecimalField(max_digits=14, decimal_places=2)
+
+    class Meta:
+        ordering = ["invoice", "position"]
+
+    def __str__(self):
+        return f"{self.description} x {self.quantity}"
 
 class Receipt(models.Model):
     invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE)
     payment_date = models.DateField()
     payment_method = models.CharField(max_length=50)
     amount_paid = models.DecimalField(max_digits=10, decimal_places=2)
+    # Bank reference of the payment (invoices.reconciliation), blank for manual receipts
+    reference = models.CharField(max_length=255, blank=True, default="")
+    # Fingerprint of the statement line the receipt was reconciled from
+    # (reconciliation.statement_lines); a line is recorded once per invoice
+    statement_line = models.CharField(max_length=64, null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["statement_line", "invoice"], name="receipt_statement_line_uniq"),
+        ]
+
+
+# Client key of rollup rows for invoices without a client. The key columns
+# are NOT NULL so that the unique constraints also cover those rows.
+NO_CLIENT = uuid.UUID(int=0)
+
+
+class InvoiceDailyRollup(models.Model):
+    """
+    Invoice totals per (due date, status, client), kept up to date by
+    invoices.rollups on every invoice/receipt write. Dashboards aggregate
+    these rows instead of scanning the invoices.
+    """
+    day = models.DateField()  # due date of the invoices
+    status = models.CharField(max_length=50)
+    client_id = models.UUIDField(default=NO_CLIENT)
+    invoice_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    amount_paid = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "status", "client_id"], name="invoice_rollup_key"),
+        ]
+        indexes = [
+            # Outstanding / overdue totals
+            models.Index(fields=["status", "day"], name="invoice_rollup_status_day_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status}: {self.amount}"
+
+
+class ReceiptDailyRollup(models.Model):
+    """Payments received per (payment date, client), see InvoiceDailyRollup."""
+    day = models.DateField()  # payment date
+    client_id = models.UUIDField(default=NO_CLIENT)
+    receipt_count = models.IntegerField(default=0)
+    amount = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["day", "client_id"], name="receipt_rollup_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.day}: {self.amount}"
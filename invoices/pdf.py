@@ -0,0 +1,254 @@
+"""
+Dependency-free invoice PDF rendering.
+
+Nothing in here touches Django, so the functions can run in worker
+processes (see invoices.rendering). ``compile_template`` turns a tenant's
+branding into pre-encoded page fragments once; ``render_invoice`` then
+only lays out the invoice-specific rows and writes the PDF.
+"""
+import hashlib
+import json
+import zlib
+
+# Bump when the layout changes so stored PDFs are rendered again
+RENDERER_VERSION = 1
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 50
+ROW_HEIGHT = 14
+TABLE_BOTTOM = 110  # rows below this continue on the next page
+
+REGULAR, BOLD = "F1", "F2"
+
+# Advance widths (1/1000 em) of ASCII 32..126 in the standard 14 fonts
+_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+_HELVETICA_BOLD = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+]
+_WIDTHS = {REGULAR: _HELVETICA, BOLD: _HELVETICA_BOLD}
+
+# Right edges of the numeric columns of the line item table
+COLUMNS = {"quantity": 370, "unit_price": 445, "tax_rate": 490, "total": PAGE_WIDTH - MARGIN}
+DESCRIPTION_WIDTH = 250
+
+
+def text_width(text, font=REGULAR, size=10):
+    widths = _WIDTHS[font]
+    units = sum(widths[ord(char) - 32] if 32 <= ord(char) <= 126 else 556 for char in text)
+    return units * size / 1000
+
+
+def fit(text, width, font=REGULAR, size=10):
+    """``text`` cut down (with an ellipsis) to fit in ``width`` points."""
+    if text_width(text, font, size) <= width:
+        return text
+    while text and text_width(text + "...", font, size) > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def wrap(text, width, font=REGULAR, size=10):
+    lines = []
+    for paragraph in text.splitlines() or [""]:
+        line = ""
+        for word in paragraph.split():
+            candidate = f"{line} {word}" if line else word
+            if line and text_width(candidate, font, size) > width:
+                lines.append(line)
+                line = word
+            else:
+                line = candidate
+        lines.append(fit(line, width, font, size))
+    return lines
+
+
+def _literal(text):
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def text_op(x, y, text, font=REGULAR, size=10, align="left"):
+    if align == "right":
+        x -= text_width(text, font, size)
+    elif align == "center":
+        x -= text_width(text, font, size) / 2
+    return b"BT /%s %d Tf %.2f %.2f Td %s Tj ET\n" % (font.encode(), size, x, y, _literal(text))
+
+
+def rule_op(y, x1=MARGIN, x2=PAGE_WIDTH - MARGIN, width=0.5):
+    return b"%.2f w %.2f %.2f m %.2f %.2f l S\n" % (width, x1, y, x2, y)
+
+
+def write_pdf(pages):
+    """A complete PDF file from the content streams (bytes) of its pages."""
+    # 1 catalog, 2 page tree, 3-4 fonts, then a page + content object per page
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+    ]
+    kids = []
+    for content in pages:
+        page_id = len(objects) + 1
+        kids.append(b"%d 0 R" % page_id)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> /Contents %d 0 R >>"
+            % (PAGE_WIDTH, PAGE_HEIGHT, page_id + 1)
+        )
+        stream = zlib.compress(content)
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(kids), len(kids))
+
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+class CompiledTemplate:
+    """
+    The parts of an invoice page that only depend on the tenant, encoded
+    once: the letterhead, the line item table header and the footer.
+    Instances are plain data, so they pickle cheaply to worker processes.
+    """
+
+    def __init__(self, branding):
+        self.fingerprint = hashlib.sha256(
+            json.dumps({"branding": branding, "version": RENDERER_VERSION}, sort_keys=True).encode()
+        ).hexdigest()
+
+        right = PAGE_WIDTH - MARGIN
+        y = PAGE_HEIGHT - MARGIN - 10
+        header = [
+            text_op(MARGIN, y, fit(branding.get("name") or "", 300, BOLD, 18), BOLD, 18),
+            text_op(right, y, "INVOICE", BOLD, 20, align="right"),
+        ]
+        for line in branding.get("address") or []:
+            y -= 12
+            header.append(text_op(MARGIN, y, fit(line, 300, REGULAR, 9), REGULAR, 9))
+        self.header = b"".join(header)
+        self.header_bottom = y - 20
+
+        self.table_header = b"".join([
+            text_op(MARGIN, 0, "Description", BOLD, 9),
+            text_op(COLUMNS["quantity"], 0, "Qty", BOLD, 9, align="right"),
+            text_op(COLUMNS["unit_price"], 0, "Unit price", BOLD, 9, align="right"),
+            text_op(COLUMNS["tax_rate"], 0, "Tax %", BOLD, 9, align="right"),
+            text_op(COLUMNS["total"], 0, "Amount", BOLD, 9, align="right"),
+        ])
+
+        footer = branding.get("footer") or ""
+        self.footer = text_op(PAGE_WIDTH / 2, MARGIN - 20, fit(footer, PAGE_WIDTH - 2 * MARGIN, REGULAR, 8), REGULAR, 8, align="center")
+
+    def table_header_at(self, y):
+        """The table header (compiled at y=0) moved to ``y``, with its rules."""
+        return b"q 1 0 0 1 0 %.2f cm\n%sQ\n" % (y, self.table_header) + rule_op(y + 12) + rule_op(y - 5)
+
+
+def compile_template(branding):
+    """
+    ``branding``: ``name``, ``address`` (list of lines) and ``footer`` of
+    the tenant's company.
+    """
+    return CompiledTemplate(branding)
+
+
+def render_invoice(template, invoice):
+    """
+    PDF bytes of ``invoice``, a dict of display strings (see
+    invoices.rendering.invoice_payload), laid out with ``template``.
+    """
+    right = PAGE_WIDTH - MARGIN
+    pages = []
+
+    # First page: letterhead, invoice details and bill-to block
+    ops = [template.header]
+    y = template.header_bottom
+    details = [
+        ("Invoice", invoice["number"]),
+        ("Issue date", invoice["issue_date"]),
+        ("Due date", invoice["due_date"]),
+        ("Status", invoice["status"]),
+    ]
+    ops.append(text_op(MARGIN, y, "Bill to", BOLD, 10))
+    ops.append(text_op(MARGIN, y - 14, fit(invoice["client_name"], 280), REGULAR, 10))
+    for label, value in details:
+        ops.append(text_op(right - 110, y, label, BOLD, 9, align="right"))
+        ops.append(text_op(right, y, value, REGULAR, 9, align="right"))
+        y -= 13
+    y -= 20
+
+    ops.append(template.table_header_at(y))
+    y -= 20
+    for item in invoice["line_items"]:
+        if y < TABLE_BOTTOM:
+            pages.append(ops)
+            y = PAGE_HEIGHT - MARGIN - 10
+            ops = [template.table_header_at(y)]
+            y -= 20
+        ops.append(text_op(MARGIN, y, fit(item["description"], DESCRIPTION_WIDTH)))
+        for column, x in COLUMNS.items():
+            ops.append(text_op(x, y, item[column], align="right"))
+        y -= ROW_HEIGHT
+
+    # Totals (and notes) need their own space at the bottom
+    notes = wrap(invoice["notes"], PAGE_WIDTH - 2 * MARGIN, REGULAR, 9) if invoice["notes"] else []
+    needed = 5 * ROW_HEIGHT + 30 + (len(notes) * 12 + 20 if notes else 0)
+    if y - needed < TABLE_BOTTOM - 60:
+        pages.append(ops)
+        y = PAGE_HEIGHT - MARGIN - 10
+        ops = []
+    ops.append(rule_op(y + 8))
+    y -= 6
+    totals = [
+        ("Subtotal", invoice["subtotal"], REGULAR),
+        ("Tax", invoice["tax_amount"], REGULAR),
+        ("Total", invoice["amount"], BOLD),
+        ("Paid", invoice["amount_paid"], REGULAR),
+        ("Balance due", invoice["balance"], BOLD),
+    ]
+    for label, value, font in totals:
+        ops.append(text_op(COLUMNS["tax_rate"], y, label, font, 10, align="right"))
+        ops.append(text_op(right, y, value, font, 10, align="right"))
+        y -= ROW_HEIGHT
+    if notes:
+        y -= 16
+        ops.append(text_op(MARGIN, y, "Notes", BOLD, 9))
+        for line in notes:
+            y -= 12
+            ops.append(text_op(MARGIN, y, line, REGULAR, 9))
+    pages.append(ops)
+
+    count = len(pages)
+    streams = []
+    for number, page_ops in enumerate(pages, start=1):
+        page_ops.append(template.footer)
+        page_ops.append(text_op(right, MARGIN - 20, f"Page {number} of {count}", REGULAR, 8, align="right"))
+        streams.append(b"".join(page_ops))
+    return write_pdf(streams)
+
+
+def render_batch(template, invoices):
+    """Render several invoices; the unit of work of a pool worker."""
+    return [render_invoice(template, invoice) for invoice in invoices]
@@ -0,0 +1,269 @@
+"""
+Receipt reconciliation: match a batch of incoming payments (the lines of a
+bank statement) to the open invoices of a tenant and apply them.
+
+The open invoices a batch can touch are loaded (and locked, unless it is a
+dry run) with one query,
+then hashed per batch (PaymentIndex) so every payment is matched with dict
+lookups. Receipts, invoice balances/statuses and the dashboard rollups are
+written with bulk queries in the same transaction.
+"""
+import hashlib
+import re
+from collections import Counter, defaultdict, deque
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Q
+from django.utils import timezone
+
+from . import rollups
+from .models import Invoice, Receipt
+from .services import payment_status, to_money
+
+
+def reference_pattern():
+    """Regex finding invoice numbers (INVOICE_NUMBER_FORMAT) in free-text payment references."""
+    prefix, _, rest = settings.INVOICE_NUMBER_FORMAT.partition("{number")
+    suffix = rest.partition("}")[2]
+    return re.compile(r"(?<!\w)" + re.escape(prefix) + r"(\d+)" + re.escape(suffix) + r"(?!\d)", re.IGNORECASE)
+
+
+def balance(invoice):
+    return invoice.amount - invoice.amount_paid
+
+
+class PaymentIndex:
+    """
+    Hash indexes over the open invoices of a batch (oldest due first):
+    by id, by number, by (client, balance), by balance and by client.
+
+    Balances change while the batch is applied; invoices are re-indexed
+    under their new balance and stale entries are dropped on lookup.
+    """
+
+    def __init__(self, invoices):
+        self.by_id = {}
+        self.by_number = {}
+        self.by_client_balance = defaultdict(deque)
+        self.by_balance = defaultdict(deque)
+        self.by_client = defaultdict(deque)
+        for invoice in invoices:
+            self.by_id[invoice.id] = invoice
+            if invoice.number is not None:
+                self.by_number[invoice.number] = invoice
+            if invoice.client_id is not None:
+                self.by_client[invoice.client_id].append(invoice)
+            self.index_balance(invoice)
+
+    def index_balance(self, invoice):
+        amount = balance(invoice)
+        if amount > 0:
+            self.by_balance[amount].append(invoice)
+            if invoice.client_id is not None:
+                self.by_client_balance[(invoice.client_id, amount)].append(invoice)
+
+    def with_balance(self, amount, client_id=None):
+        """Open invoices whose balance is exactly ``amount`` (of ``client_id`` if given)."""
+        if client_id is not None:
+            bucket = self.by_client_balance.get((client_id, amount))
+        else:
+            bucket = self.by_balance.get(amount)
+        if not bucket:
+            return []
+        live = [invoice for invoice in bucket if balance(invoice) == amount]
+        if len(live) != len(bucket):
+            bucket.clear()
+            bucket.extend(live)
+        return live
+
+    def open_for_client(self, client_id):
+        invoices = self.by_client.get(client_id)
+        if not invoices:
+            return []
+        # Settled invoices stay settled for the rest of the batch
+        while invoices and balance(invoices[0]) <= 0:
+            invoices.popleft()
+        return [invoice for invoice in invoices if balance(invoice) > 0]
+
+    def apply(self, invoice, amount):
+        invoice.amount_paid += amount
+        invoice.status = payment_status(invoice.amount, invoice.amount_paid)
+        self.index_balance(invoice)
+
+
+def match(payment, index, pattern):
+    """
+    (method, candidate invoices) of a payment, tried in order: the invoice
+    it names, invoice numbers in its reference, its client's invoice with
+    exactly its amount, its client's open invoices oldest first, and the
+    only open invoice with exactly its amount.
+    """
+    amount, client_id = payment["amount"], payment.get("client")
+    if payment.get("invoice"):
+        invoice = index.by_id.get(payment["invoice"])
+        return ("invoice", [invoice]) if invoice is not None and balance(invoice) > 0 else (None, [])
+
+    referenced = []
+    for number in pattern.findall(payment.get("reference") or ""):
+        invoice = index.by_number.get(int(number))
+        if invoice is not None and balance(invoice) > 0 and invoice not in referenced:
+            referenced.append(invoice)
+    if referenced:
+        return "reference", referenced
+
+    if client_id is not None:
+        exact = index.with_balance(amount, client_id)
+        if exact:
+            return "client_amount", exact[:1]
+        invoices = index.open_for_client(client_id)
+        if invoices:
+            return "client", invoices
+        return None, []
+
+    exact = index.with_balance(amount)
+    if len(exact) == 1:
+        return "amount", exact
+    return None, []
+
+
+def load_open_invoices(db_alias, payments, pattern, lock=True):
+    """The open invoices any of ``payments`` could match, oldest due first; locked if ``lock``."""
+    ids, numbers, clients, amounts = set(), set(), set(), set()
+    for payment in payments:
+        if payment.get("invoice"):
+            ids.add(payment["invoice"])
+        numbers.update(int(number) for number in pattern.findall(payment.get("reference") or ""))
+        if payment.get("client") is not None:
+            clients.add(payment["client"])
+        else:
+            amounts.add(payment["amount"])
+
+    lookup = Q(pk__in=[])
+    for condition, values in (("id__in", ids), ("number__in", numbers), ("client_id__in", clients), ("balance__in", amounts)):
+        if values:
+            lookup |= Q(**{condition: values})
+    invoices = Invoice.objects.using(db_alias)
+    if lock:
+        invoices = invoices.select_for_update()
+    return list(
+        invoices
+        .annotate(balance=ExpressionWrapper(F("amount") - F("amount_paid"), output_field=DecimalField()))
+        .filter(lookup, status__in=rollups.OPEN_STATUSES)
+        .only("id", "number", "client_id", "due_date", "amount", "amount_paid", "status")
+        .order_by("due_date", "id")
+    )
+
+
+def statement_lines(payments):
+    """
+    Fingerprint of each payment (None without a reference): a hash of its
+    reference, date, amount, client and how many identical lines precede
+    it in the batch, so repeated lines of one statement stay distinct while
+    the same statement uploaded again yields the same fingerprints.
+    """
+    occurrences = Counter()
+    fingerprints = []
+    for payment in payments:
+        if not payment.get("reference"):
+            fingerprints.append(None)
+            continue
+        key = (payment["reference"], payment["payment_date"].isoformat(), str(payment["amount"]), str(payment.get("client") or ""))
+        occurrences[key] += 1
+        fingerprints.append(hashlib.sha256("\x1f".join((*key, str(occurrences[key]))).encode()).hexdigest())
+    return fingerprints
+
+
+def reconcile_payments(db_alias, payments, dry_run=False):
+    """
+    Match ``payments`` (validated ReconciliationSerializer lines) to open
+    invoices and, unless ``dry_run``, record a receipt per invoice paid.
+
+    A payment may be split over several invoices (oldest first) and may
+    pay an invoice partially; whatever exceeds the matched balances is
+    reported as unapplied. Every receipt stores the fingerprint of its
+    statement line (statement_lines) and lines whose fingerprint was
+    already recorded are skipped as duplicates, so re-uploading a statement
+    is harmless; the unique (statement_line, invoice) constraint stops
+    concurrent uploads from recording a line twice. Lines without a
+    reference cannot be told apart and are never treated as duplicates.
+    The whole batch is applied in one transaction; a dry run takes no locks.
+    """
+    pattern = reference_pattern()
+    payments = [{**payment, "amount": to_money(payment["amount"])} for payment in payments]
+
+    with transaction.atomic(using=db_alias):
+        index = PaymentIndex(load_open_invoices(db_alias, payments, pattern, lock=not dry_run))
+        fingerprints = statement_lines(payments)
+        recorded = set(
+            Receipt.objects.using(db_alias)
+            .filter(statement_line__in=[fingerprint for fingerprint in fingerprints if fingerprint])
+            .values_list("statement_line", flat=True)
+        ) if any(fingerprints) else set()
+
+        results, receipts, before = [], [], {}
+        for line, (payment, fingerprint) in enumerate(zip(payments, fingerprints), start=1):
+            result = {"line": line, "amount": payment["amount"], "method": None, "allocations": []}
+            results.append(result)
+            if fingerprint in recorded:
+                result.update(status="duplicate", unapplied=payment["amount"])
+                continue
+
+            method, invoices = match(payment, index, pattern)
+            remaining = payment["amount"]
+            for invoice in invoices:
+                applied = min(remaining, balance(invoice))
+                if applied <= 0:
+                    continue
+                before.setdefault(invoice.id, rollups.invoice_snapshot(invoice))
+                index.apply(invoice, applied)
+                remaining -= applied
+                receipts.append((Receipt(
+                    invoice_id=invoice.id,
+                    payment_date=payment["payment_date"],
+                    payment_method=payment["payment_method"],
+                    amount_paid=applied,
+                    reference=payment.get("reference") or "",
+                    statement_line=fingerprint,
+                ), invoice.client_id))
+                result["allocations"].append({
+                    "invoice": invoice.id,
+                    "invoice_number": invoice.invoice_number,
+                    "amount": applied,
+                    "status": invoice.status,
+                })
+                if not remaining:
+                    break
+
+            result["method"] = method if result["allocations"] else None
+            result["unapplied"] = remaining
+            if not result["allocations"]:
+                result["status"] = "unmatched"
+            else:
+                result["status"] = "partially_applied" if remaining else "applied"
+
+        changed = [index.by_id[invoice_id] for invoice_id in before]
+        if changed and not dry_run:
+            now = timezone.now()
+            Receipt.objects.using(db_alias).bulk_create([receipt for receipt, _ in receipts], batch_size=1000)
+            # Most invoices end up settled: one UPDATE for all of them, bulk_update for the rest
+            settled = [invoice.id for invoice in changed if invoice.status == "paid"]
+            partial = [invoice for invoice in changed if invoice.status != "paid"]
+            if settled:
+                Invoice.objects.using(db_alias).filter(id__in=settled).update(
+                    amount_paid=F("amount"), status="paid", updated_at=now,
+                )
+            for invoice in partial:
+                invoice.updated_at = now
+            Invoice.objects.using(db_alias).bulk_update(partial, ["amount_paid", "status", "updated_at"], batch_size=1000)
+            rollups.invoices_changed(db_alias, [(invoice, before[invoice.id]) for invoice in changed])
+            rollups.receipts_added(db_alias, receipts)
+
+    return {
+        "dry_run": dry_run,
+        "applied": sum((allocation["amount"] for result in results for allocation in result["allocations"]), to_money(0)),
+        "receipts": len(receipts),
+        "invoices": len(changed),
+        "unmatched": sum(1 for result in results if result["status"] == "unmatched"),
+        "results": results,
+    }
@@ -0,0 +1,158 @@
+import calendar
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import rollups
+from .models import Invoice, InvoiceLineItem, RecurringInvoiceSchedule
+from .sequences import invoice_numbers
+from .services import line_amounts
+
+
+def add_months(day, months, anchor_day):
+    """``day`` moved by ``months``, on ``anchor_day`` or the last day of shorter months."""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return day.replace(year=year, month=month, day=min(anchor_day, calendar.monthrange(year, month)[1]))
+
+
+def due_periods(schedule, today):
+    """
+    Billing dates of ``schedule`` due by ``today`` (missed periods included,
+    oldest first) and the billing date that follows them.
+    """
+    months = RecurringInvoiceSchedule.FREQUENCY_MONTHS[schedule.frequency]
+    periods = []
+    day = schedule.next_run_date
+    while day <= today and (schedule.end_date is None or day <= schedule.end_date):
+        periods.append(day)
+        day = add_months(day, months, schedule.start_date.day)
+    return periods, day
+
+
+def generate_batch(db_alias, schedules, today, allocator):
+    """
+    Create the due invoices of ``schedules`` (locked by the caller's
+    transaction) with bulk INSERTs and move the schedules to their next
+    billing date. Returns the number of invoices created.
+
+    The invoices are numbered last: in strict mode reserving the numbers
+    locks the tenant's sequence row until the batch commits, and
+    create_invoice should only wait for that final UPDATE, not the batch.
+    """
+    due = {schedule.id: due_periods(schedule, today) for schedule in schedules}
+    dates = {day for periods, _ in due.values() for day in periods}
+    # Periods billed by an earlier (interrupted) run are skipped. The
+    # schedules are locked, so no other run can bill them meanwhile.
+    existing = set(
+        Invoice.objects.using(db_alias)
+        .filter(schedule_id__in=list(due), billing_period__in=dates)
+        .values_list("schedule_id", "billing_period")
+    ) if dates else set()
+
+    invoices, schedule_lines = [], {}
+    for schedule in schedules:
+        periods, next_run = due[schedule.id]
+        lines = [(line, line_amounts(line.quantity, line.unit_price, line.tax_rate)) for line in schedule.lines.all()]
+        schedule_lines[schedule.id] = lines
+        subtotal = sum((amounts[0] for _, amounts in lines), Decimal("0"))
+        tax_amount = sum((amounts[1] for _, amounts in lines), Decimal("0"))
+        for day in periods:
+            if (schedule.id, day) in existing:
+                continue
+            invoices.append(Invoice(
+                schedule=schedule,
+                billing_period=day,
+                client_id=schedule.client_id,
+                client_name=schedule.client.name,
+                issue_date=day,
+                due_date=day + timedelta(days=schedule.payment_terms_days),
+                subtotal=subtotal,
+                tax_amount=tax_amount,
+                amount=subtotal + tax_amount,
+                status="unpaid",
+                notes=schedule.notes,
+            ))
+        schedule.next_run_date = next_run
+        if schedule.end_date and next_run > schedule.end_date:
+            schedule.is_active = False
+
+    if invoices:
+        # Any IntegrityError (e.g. a period or number billed twice) rolls
+        # the whole batch back rather than dropping invoices
+        Invoice.objects.using(db_alias).bulk_create(invoices, batch_size=1000)
+
+        # MySQL doesn't return the ids of bulk inserted rows; (schedule,
+        # billing period) is unique and identifies the rows inserted above
+        ids = {
+            (schedule_id, day): invoice_id
+            for invoice_id, schedule_id, day in Invoice.objects.using(db_alias)
+            .filter(schedule_id__in=list(due), billing_period__in=dates)
+            .values_list("id", "schedule_id", "billing_period")
+        }
+        items = []
+        for invoice in invoices:
+            invoice.id = ids[(invoice.schedule_id, invoice.billing_period)]
+            for position, (line, (subtotal, tax_amount, total)) in enumerate(schedule_lines[invoice.schedule_id], start=1):
+                items.append(InvoiceLineItem(
+                    invoice_id=invoice.id,
+                    product_id=line.product_id,
+                    position=position,
+                    description=line.description,
+                    quantity=line.quantity,
+                    unit_price=line.unit_price,
+                    tax_rate=line.tax_rate,
+                    subtotal=subtotal,
+                    tax_amount=tax_amount,
+                    total=total,
+                ))
+        InvoiceLineItem.objects.using(db_alias).bulk_create(items, batch_size=1000)
+        rollups.invoices_added(db_alias, invoices)
+
+    RecurringInvoiceSchedule.objects.using(db_alias).bulk_update(
+        schedules, ["next_run_date", "is_active"], batch_size=1000
+    )
+
+    if invoices:
+        start, end = allocator.reserve(db_alias, len(invoices))
+        for number, invoice in zip(range(start, end), invoices):
+            invoice.number = number
+        Invoice.objects.using(db_alias).bulk_update(invoices, ["number"], batch_size=1000)
+    return len(invoices)
+
+
+def generate_recurring_invoices(db_alias, today=None, batch_size=None, allocator=None):
+    """
+    Generate every invoice due by ``today`` from the recurring schedules of
+    a tenant, RECURRING_INVOICE_BATCH_SIZE schedules per transaction.
+
+    Schedules are locked with SKIP LOCKED, so concurrent runs on the same
+    tenant share the work instead of waiting on each other, and each
+    period is billed once (unique schedule + billing_period).
+    """
+    today = today or timezone.localdate()
+    batch_size = batch_size or getattr(settings, "RECURRING_INVOICE_BATCH_SIZE", 500)
+    allocator = allocator or invoice_numbers
+    report = {"invoices": 0, "schedules": 0, "batches": 0}
+
+    last_id = 0
+    while True:
+        with transaction.atomic(using=db_alias):
+            schedules = list(
+                RecurringInvoiceSchedule.objects.using(db_alias)
+                .select_for_update(skip_locked=True, of=("self",))
+                .select_related("client")
+                .prefetch_related("lines")
+                .filter(is_active=True, next_run_date__lte=today, id__gt=last_id)
+                .order_by("id")[:batch_size]
+            )
+            if not schedules:
+                break
+            last_id = schedules[-1].id
+            report["invoices"] += generate_batch(db_alias, schedules, today, allocator)
+        report["schedules"] += len(schedules)
+        report["batches"] += 1
+    return report
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+
+from .models import Invoice
+from .pdf import compile_template, render_batch, render_invoice
+
+# tenant id -> (CompiledTemplate, expires at)
+_template_cache = {}
+_template_cache_lock = threading.Lock()
+
+
+def tenant_branding(tenant):
+    """Letterhead of a tenant's invoices, from its owner's company profile."""
+    owner = tenant.owner
+    address = [
+        owner.address_line1,
+        owner.address_line2,
+        ", ".join(part for part in (owner.city, owner.state, owner.pincode) if part),
+        owner.country,
+    ]
+    contact = " | ".join(part for part in (owner.email, owner.phone, owner.website) if part)
+    return {
+        "name": owner.company_name or tenant.name,
+        "address": [line for line in address if line],
+        "footer": contact,
+    }
+
+
+def get_compiled_template(tenant):
+    """
+    The compiled invoice template of ``tenant``, cached in-process for
+    INVOICE_PDF_TEMPLATE_TTL seconds so branding changes show up after
+    at most that long.
+    """
+    now = time.monotonic()
+    entry = _template_cache.get(tenant.id)
+    if entry is not None and entry[1] > now:
+        return entry[0]
+    template = compile_template(tenant_branding(tenant))
+    with _template_cache_lock:
+        _template_cache[tenant.id] = (template, now + getattr(settings, "INVOICE_PDF_TEMPLATE_TTL", 300))
+    return template
+
+
+def money(value):
+    return f"{value:,.2f}"
+
+
+def invoice_payload(invoice):
+    """The display values of an invoice (with prefetched line_items) that go into its PDF."""
+    return {
+        "number": invoice.invoice_number or str(invoice.id),
+        "client_name": invoice.client_name,
+        "issue_date": invoice.issue_date.isoformat(),
+        "due_date": invoice.due_date.isoformat(),
+        "status": invoice.get_status_display(),
+        "notes": invoice.notes or "",
+        "line_items": [
+            {
+                "description": item.description,
+                "quantity": f"{item.quantity.normalize():f}",
+                "unit_price": money(item.unit_price),
+                "tax_rate": f"{item.tax_rate.normalize():f}",
+                "total": money(item.total),
+            }
+            for item in invoice.line_items.all()
+        ],
+        "subtotal": money(invoice.subtotal),
+        "tax_amount": money(invoice.tax_amount),
+        "amount": money(invoice.amount),
+        "amount_paid": money(invoice.amount_paid),
+        "balance": money(invoice.amount - invoice.amount_paid),
+    }
+
+
+def content_hash(template, payload):
+    """Address of a rendered PDF: the same template and invoice data give the same file."""
+    data = json.dumps({"template": template.fingerprint, "invoice": payload}, sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+def pdf_path(db_alias, digest):
+    return f"invoices/pdf/{db_alias}/{digest[:2]}/{digest}.pdf"
+
+
+def store_pdf(path, data, storage=None):
+    storage = storage or default_storage
+    name = storage.save(path, ContentFile(data))
+    if name != path:
+        # Another worker stored the same PDF first; both are identical
+        storage.delete(name)
+    return path
+
+
+def render_invoices(db_alias, tenant, invoice_ids, workers=None, storage=None):
+    """
+    Make sure a PDF of each invoice is stored; returns invoice id -> storage path.
+
+    Invoices whose content hash is already in storage are not rendered
+    again. The others are rendered in a pool of INVOICE_PDF_WORKERS
+    processes once there are INVOICE_PDF_POOL_THRESHOLD of them; a render
+    takes a few milliseconds, so smaller batches (and ``workers=1``, e.g.
+    in Celery workers, which may not start child processes) are rendered
+    in-process rather than paying for the pool start-up.
+    """
+    storage = storage or default_storage
+    workers = workers or getattr(settings, "INVOICE_PDF_WORKERS", 4)
+    template = get_compiled_template(tenant)
+    invoices = Invoice.objects.using(db_alias).filter(id__in=invoice_ids).prefetch_related("line_items")
+
+    paths, missing = {}, []
+    for invoice in invoices:
+        payload = invoice_payload(invoice)
+        path = pdf_path(db_alias, content_hash(template, payload))
+        paths[invoice.id] = path
+        if not storage.exists(path):
+            missing.append((path, payload))
+
+    if workers <= 1 or len(missing) < getattr(settings, "INVOICE_PDF_POOL_THRESHOLD", 50):
+        rendered = [render_invoice(template, payload) for _, payload in missing]
+    else:
+        chunk_size = max(1, len(missing) // (workers * 4))
+        chunks = [[payload for _, payload in missing[i:i + chunk_size]] for i in range(0, len(missing), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            rendered = [pdf for batch in executor.map(render_batch, [template] * len(chunks), chunks) for pdf in batch]
+
+    for (path, _), data in zip(missing, rendered):
+        store_pdf(path, data, storage)
+    return paths
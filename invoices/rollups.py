@@ -0,0 +1,303 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Count, F, Q, Sum
+from django.utils import timezone
+
+from .models import NO_CLIENT, Invoice, InvoiceDailyRollup, Receipt, ReceiptDailyRollup
+
+OPEN_STATUSES = ("unpaid", "partially_paid")
+ZERO = Decimal("0")
+
+
+def bump(model, db_alias, key, deltas):
+    """
+    Add ``deltas`` to the rollup row identified by ``key``, creating it on
+    first use. Runs inside the caller's transaction, so the rollup changes
+    commit (or roll back) together with the invoice/receipt write.
+    """
+    rows = model.objects.using(db_alias).filter(**key)
+    increments = {field: F(field) + delta for field, delta in deltas.items()}
+    if rows.update(**increments):
+        return
+    try:
+        with transaction.atomic(using=db_alias):
+            model.objects.using(db_alias).create(**key, **deltas)
+    except IntegrityError:
+        # Another transaction created the row first
+        rows.update(**increments)
+
+
+def bump_many(model, db_alias, deltas_by_key):
+    """
+    bump() for many rollup rows at once: ``deltas_by_key`` maps a key
+    (tuple of sorted (field, value) pairs) to its deltas. The existing rows
+    are locked and read with one query, then written back with one upsert
+    (cheaper than bulk_update's CASE per row) and one bulk INSERT.
+    """
+    if not deltas_by_key:
+        return
+    keys = [dict(key) for key in deltas_by_key]
+    lookup = {f"{field}__in": {key[field] for key in keys} for field in keys[0]}
+    rows = {
+        tuple(sorted((field, getattr(row, field)) for field in keys[0])): row
+        for row in model.objects.using(db_alias).select_for_update().filter(**lookup)
+    }
+
+    changed, missing = [], {}
+    for key, deltas in deltas_by_key.items():
+        row = rows.get(key)
+        if row is None:
+            missing[key] = deltas
+            continue
+        for field, delta in deltas.items():
+            setattr(row, field, getattr(row, field) + delta)
+        changed.append(row)
+    fields = list(next(iter(deltas_by_key.values())))
+    if changed:
+        # MySQL upserts on any unique key and takes no conflict target
+        target = list(keys[0]) if connections[db_alias].features.supports_update_conflicts_with_target else None
+        model.objects.using(db_alias).bulk_create(
+            changed, batch_size=1000, update_conflicts=True, unique_fields=target, update_fields=fields
+        )
+
+    try:
+        with transaction.atomic(using=db_alias):
+            model.objects.using(db_alias).bulk_create(
+                [model(**dict(key), **deltas) for key, deltas in missing.items()], batch_size=1000
+            )
+    except IntegrityError:
+        # Another transaction created some of the rows first
+        for key, deltas in missing.items():
+            bump(model, db_alias, dict(key), deltas)
+
+
+def invoice_key(invoice):
+    return {"day": invoice.due_date, "status": invoice.status, "client_id": invoice.client_id or NO_CLIENT}
+
+
+def invoice_snapshot(invoice):
+    """What ``invoice`` currently contributes to InvoiceDailyRollup."""
+    return invoice_key(invoice), {"amount": invoice.amount, "amount_paid": invoice.amount_paid}
+
+
+def invoice_changed(db_alias, invoice, before=None):
+    """
+    Move the contribution of ``invoice`` in the rollups from ``before`` (its
+    invoice_snapshot prior to the change, None for a new invoice) to its
+    current values.
+    """
+    key, values = invoice_snapshot(invoice)
+    if before is not None:
+        old_key, old_values = before
+        if old_key == key:
+            deltas = {field: values[field] - old_values[field] for field in values}
+            bump(InvoiceDailyRollup, db_alias, key, deltas)
+            return
+        bump(InvoiceDailyRollup, db_alias, old_key, {
+            "invoice_count": -1, **{field: -value for field, value in old_values.items()},
+        })
+    bump(InvoiceDailyRollup, db_alias, key, {"invoice_count": 1, **values})
+
+
+def invoices_changed(db_alias, changes):
+    """
+    invoice_changed for a batch: ``changes`` are (invoice, before) pairs,
+    summed per rollup row and written with bump_many.
+    """
+    totals = defaultdict(lambda: {"invoice_count": 0, "amount": ZERO, "amount_paid": ZERO})
+    for invoice, before in changes:
+        if before is not None:
+            old_key, old_values = before
+            row = totals[tuple(sorted(old_key.items()))]
+            row["invoice_count"] -= 1
+            row["amount"] -= old_values["amount"]
+            row["amount_paid"] -= old_values["amount_paid"]
+        key, values = invoice_snapshot(invoice)
+        row = totals[tuple(sorted(key.items()))]
+        row["invoice_count"] += 1
+        row["amount"] += values["amount"]
+        row["amount_paid"] += values["amount_paid"]
+    bump_many(InvoiceDailyRollup, db_alias, {key: deltas for key, deltas in totals.items() if any(deltas.values())})
+
+
+def invoices_added(db_alias, invoices):
+    invoices_changed(db_alias, [(invoice, None) for invoice in invoices])
+
+
+def receipt_added(db_alias, receipt, client_id):
+    key = {"day": receipt.payment_date, "client_id": client_id or NO_CLIENT}
+    bump(ReceiptDailyRollup, db_alias, key, {"receipt_count": 1, "amount": receipt.amount_paid})
+
+
+def receipts_added(db_alias, receipts):
+    """receipt_added for a batch of (receipt, client_id) pairs."""
+    totals = defaultdict(lambda: {"receipt_count": 0, "amount": ZERO})
+    for receipt, client_id in receipts:
+        row = totals[(("client_id", client_id or NO_CLIENT), ("day", receipt.payment_date))]
+        row["receipt_count"] += 1
+        row["amount"] += receipt.amount_paid
+    bump_many(ReceiptDailyRollup, db_alias, totals)
+
+
+def expected_invoice_rows(db_alias, **day_filter):
+    """
+    InvoiceDailyRollup rows computed from the invoices, as
+    {(day, status, client_id): values}; ``day_filter`` are lookups on ``day``.
+    """
+    lookups = {key.replace("day", "due_date", 1): value for key, value in day_filter.items()}
+    rows = Invoice.objects.using(db_alias).filter(**lookups).values("due_date", "status", "client_id").annotate(
+        invoice_count=Count("id"), total=Sum("amount"), paid=Sum("amount_paid"),
+    ).order_by()
+    return {
+        (row["due_date"], row["status"], row["client_id"] or NO_CLIENT): {
+            "invoice_count": row["invoice_count"],
+            "amount": row["total"] or ZERO,
+            "amount_paid": row["paid"] or ZERO,
+        }
+        for row in rows
+    }
+
+
+def expected_receipt_rows(db_alias, **day_filter):
+    """ReceiptDailyRollup rows computed from the receipts, as {(day, client_id): values}."""
+    lookups = {key.replace("day", "payment_date", 1): value for key, value in day_filter.items()}
+    rows = Receipt.objects.using(db_alias).filter(**lookups).values("payment_date", "invoice__client_id").annotate(
+        receipt_count=Count("id"), total=Sum("amount_paid"),
+    ).order_by()
+    return {
+        (row["payment_date"], row["invoice__client_id"] or NO_CLIENT): {
+            "receipt_count": row["receipt_count"],
+            "amount": row["total"] or ZERO,
+        }
+        for row in rows
+    }
+
+
+# model -> (key fields, value fields, function computing its expected rows)
+ROLLUPS = {
+    InvoiceDailyRollup: (("day", "status", "client_id"), ("invoice_count", "amount", "amount_paid"), expected_invoice_rows),
+    ReceiptDailyRollup: (("day", "client_id"), ("receipt_count", "amount"), expected_receipt_rows),
+}
+
+
+def rebuild_rollups(db_alias):
+    """
+    Recompute both rollup tables of a tenant from its invoices and receipts.
+    This reads the whole ledger and locks every rollup row, so it is meant
+    for backfills (``manage.py rebuild_invoice_rollups --full``); use
+    repair_rollups to fix drift.
+    """
+    with transaction.atomic(using=db_alias):
+        for model, (key_fields, _, expected_rows) in ROLLUPS.items():
+            model.objects.using(db_alias).all().delete()
+            model.objects.using(db_alias).bulk_create([
+                model(**dict(zip(key_fields, key)), **values) for key, values in expected_rows(db_alias).items()
+            ], batch_size=1000)
+
+    return {
+        "invoice_rows": InvoiceDailyRollup.objects.using(db_alias).count(),
+        "receipt_rows": ReceiptDailyRollup.objects.using(db_alias).count(),
+    }
+
+
+def stored_rows(model, key_fields, db_alias, lock=False, **day_filter):
+    rows = model.objects.using(db_alias).filter(**day_filter)
+    if lock:
+        rows = rows.select_for_update()
+    return {tuple(getattr(row, field) for field in key_fields): row for row in rows}
+
+
+def row_values(row, fields):
+    return {field: getattr(row, field) for field in fields}
+
+
+def repair_rollups(db_alias, start=None, end=None):
+    """
+    Compare the rollups of days ``start``..``end`` (all days by default)
+    with the invoices and receipts and rewrite only the days that differ.
+    Matching days are only read, so incremental writes (bump) keep going;
+    the rollup rows of drifted days are locked while they are rewritten.
+    Returns the number of drifted days per table.
+    """
+    day_filter = {}
+    if start:
+        day_filter["day__gte"] = start
+    if end:
+        day_filter["day__lte"] = end
+
+    report = {}
+    for model, (key_fields, fields, expected_rows) in ROLLUPS.items():
+        expected = expected_rows(db_alias, **day_filter)
+        stored = {}
+        for key, row in stored_rows(model, key_fields, db_alias, **day_filter).items():
+            values = row_values(row, fields)
+            # Rows emptied by status changes stay behind with zero values
+            if any(values.values()):
+                stored[key] = values
+        drifted = {key[0] for key in expected.keys() | stored.keys() if expected.get(key) != stored.get(key)}
+        report[model._meta.model_name] = len(drifted)
+        if not drifted:
+            continue
+
+        with transaction.atomic(using=db_alias):
+            # Lock first, then recount: writes committed meanwhile are included
+            rows = stored_rows(model, key_fields, db_alias, lock=True, day__in=drifted)
+            expected = expected_rows(db_alias, day__in=drifted)
+            zero = dict.fromkeys(fields, 0)
+            changed = []
+            for key, row in rows.items():
+                values = expected.pop(key, zero)
+                if row_values(row, fields) != values:
+                    for field, value in values.items():
+                        setattr(row, field, value)
+                    changed.append(row)
+            model.objects.using(db_alias).bulk_update(changed, list(fields), batch_size=1000)
+            model.objects.using(db_alias).bulk_create([
+                model(**dict(zip(key_fields, key)), **values) for key, values in expected.items()
+            ], batch_size=1000)
+    return report
+
+
+def dashboard_summary(db_alias, start=None, end=None, today=None):
+    """
+    Revenue, outstanding and overdue totals of a tenant, read from the
+    rollup tables. Revenue (payments received) covers ``start``..``end``;
+    outstanding and overdue are as of ``today``.
+    """
+    today = today or timezone.localdate()
+    open_invoices = InvoiceDailyRollup.objects.using(db_alias).filter(status__in=OPEN_STATUSES)
+    totals = open_invoices.aggregate(
+        outstanding=Sum(F("amount") - F("amount_paid")),
+        outstanding_count=Sum("invoice_count"),
+        overdue=Sum(F("amount") - F("amount_paid"), filter=Q(day__lt=today)),
+        overdue_count=Sum("invoice_count", filter=Q(day__lt=today)),
+    )
+
+    by_status = {
+        row["status"]: {"count": row["count"], "amount": row["amount"], "amount_paid": row["amount_paid"]}
+        for row in InvoiceDailyRollup.objects.using(db_alias).values("status").annotate(
+            count=Sum("invoice_count"), amount=Sum("amount"), amount_paid=Sum("amount_paid"),
+        ).order_by()
+    }
+
+    receipts = ReceiptDailyRollup.objects.using(db_alias)
+    if start:
+        receipts = receipts.filter(day__gte=start)
+    if end:
+        receipts = receipts.filter(day__lte=end)
+    revenue_by_day = list(
+        receipts.values("day").annotate(amount=Sum("amount"), count=Sum("receipt_count")).order_by("day")
+    )
+
+    return {
+        "revenue": sum((row["amount"] for row in revenue_by_day), ZERO),
+        "revenue_by_day": revenue_by_day,
+        "outstanding": totals["outstanding"] or ZERO,
+        "outstanding_count": totals["outstanding_count"] or 0,
+        "overdue": totals["overdue"] or ZERO,
+        "overdue_count": totals["overdue_count"] or 0,
+        "by_status": by_status,
+        "as_of": today,
+    }
@@ -0,0 +1,79 @@
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F, Max
+
+from .models import Invoice, InvoiceSequence
+
+INVOICE_SEQUENCE = "invoice"
+
+
+class SequenceAllocator:
+    """
+    Hands out invoice numbers from the per-tenant ``InvoiceSequence`` row.
+
+    In "block" mode a worker reserves ``block_size`` numbers with one short
+    transaction of its own and then serves them from memory, so concurrent
+    invoice writes only touch the counter row once per block. Numbers are
+    unique per tenant but interleave between workers, and whatever is left
+    of a block when the process exits is never used.
+
+    In "strict" mode every number is taken inside the caller's invoice
+    transaction: the counter row stays locked until that transaction ends
+    and a rollback gives the number back, so the sequence has no gaps.
+    """
+
+    def __init__(self, name=INVOICE_SEQUENCE, block_size=None):
+        self.name = name
+        self.block_size = block_size or settings.INVOICE_NUMBER_BLOCK_SIZE
+        self._blocks = {}  # db alias -> [next, end)
+        self._lock = threading.Lock()
+
+    def next(self, db_alias):
+        """Next number from this worker's block for ``db_alias``."""
+        with self._lock:
+            block = self._blocks.get(db_alias)
+            if block is None or block[0] >= block[1]:
+                block = self._blocks[db_alias] = list(self.reserve(db_alias, self.block_size))
+            number = block[0]
+            block[0] += 1
+            return number
+
+    def next_strict(self, db_alias):
+        """Next number, reserved in the transaction that is open on ``db_alias``."""
+        if not connections[db_alias].in_atomic_block:
+            raise RuntimeError("Strict invoice numbers must be allocated inside the invoice transaction")
+        start, _ = self.reserve(db_alias, 1)
+        return start
+
+    def reserve(self, db_alias, count):
+        """Move the counter forward by ``count`` and return the reserved [start, end)."""
+        sequences = InvoiceSequence.objects.using(db_alias)
+        with transaction.atomic(using=db_alias):
+            # The UPDATE takes the row lock, so the read below can't race
+            if not sequences.filter(name=self.name).update(next_value=F("next_value") + count):
+                self.create_sequence(db_alias)
+                sequences.filter(name=self.name).update(next_value=F("next_value") + count)
+            end = sequences.filter(name=self.name).values_list("next_value", flat=True).get()
+        return end - count, end
+
+    def create_sequence(self, db_alias):
+        # First use on this tenant: continue after any number already issued
+        last = Invoice.objects.using(db_alias).aggregate(last=Max("number"))["last"] or 0
+        try:
+            with transaction.atomic(using=db_alias):
+                InvoiceSequence.objects.using(db_alias).create(name=self.name, next_value=last + 1)
+        except IntegrityError:
+            pass  # another worker created it first
+
+    def discard(self, db_alias=None):
+        """Forget the cached block(s); their remaining numbers are skipped."""
+        with self._lock:
+            if db_alias is None:
+                self._blocks.clear()
+            else:
+                self._blocks.pop(db_alias, None)
+
+
+invoice_numbers = SequenceAllocator()
@@ -0,0 +1,125 @@
+from decimal import Decimal
+
+from django.conf import settings
+from rest_framework import serializers
+from .models import Invoice, InvoiceLineItem, Receipt, RecurringInvoiceLine, RecurringInvoiceSchedule
+
+
+class InvoiceLineItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = InvoiceLineItem
+        fields = [
+            "id", "product", "position", "description", "quantity", "unit_price",
+            "tax_rate", "subtotal", "tax_amount", "total"
+        ]
+
+
+class InvoiceSerializer(serializers.ModelSerializer):
+    line_items = InvoiceLineItemSerializer(many=True, read_only=True)
+    invoice_number = serializers.CharField(read_only=True)
+
+    class Meta:
+        model = Invoice
+        fields = [
+            "id", "number", "invoice_number", "client", "client_name", "issue_date", "due_date", "subtotal",
+            "tax_amount", "amount", "amount_paid", "status", "notes", "schedule", "billing_period",
+            "created_at", "updated_at",
+            "line_items"
+        ]
+
+
+class InvoiceLineInputSerializer(serializers.Serializer):
+    """A line item as sent by the client; amounts are computed server-side."""
+    product = serializers.IntegerField(required=False, allow_null=True)
+    description = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    quantity = serializers.DecimalField(max_digits=12, decimal_places=3, min_value=0)
+    unit_price = serializers.DecimalField(max_digits=12, decimal_places=2, required=False, allow_null=True)
+    tax_rate = serializers.DecimalField(max_digits=5, decimal_places=2, min_value=0, required=False, default=0)
+
+
+class InvoiceCreateSerializer(serializers.Serializer):
+    client = serializers.UUIDField(required=False, allow_null=True)
+    client_name = serializers.CharField(max_length=255, required=False, allow_blank=True)
+    issue_date = serializers.DateField()
+    due_date = serializers.DateField()
+    status = serializers.ChoiceField(choices=Invoice._meta.get_field("status").choices, required=False)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    line_items = InvoiceLineInputSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        if attrs["due_date"] < attrs["issue_date"]:
+            raise serializers.ValidationError({"due_date": "Due date cannot be before the issue date"})
+        return attrs
+
+
+class ReceiptSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Receipt
+        fields = ["id", "invoice", "payment_date", "payment_method", "amount_paid", "reference"]
+
+
+class ReceiptCreateSerializer(serializers.Serializer):
+    invoice = serializers.IntegerField()
+    payment_date = serializers.DateField()
+    payment_method = serializers.CharField(max_length=50)
+    amount_paid = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.01"))
+
+
+class StatementPaymentSerializer(serializers.Serializer):
+    """One incoming payment, e.g. a bank statement line; client/invoice narrow the match."""
+    amount = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal("0.01"))
+    payment_date = serializers.DateField()
+    payment_method = serializers.CharField(max_length=50, default="bank_transfer")
+    reference = serializers.CharField(max_length=255, required=False, allow_blank=True, default="")
+    client = serializers.UUIDField(required=False, allow_null=True)
+    invoice = serializers.IntegerField(required=False, allow_null=True)
+
+
+class ReconciliationSerializer(serializers.Serializer):
+    payments = StatementPaymentSerializer(
+        many=True, allow_empty=False, max_length=settings.RECONCILIATION_MAX_PAYMENTS
+    )
+    dry_run = serializers.BooleanField(default=False)
+
+
+class DashboardQuerySerializer(serializers.Serializer):
+    """?start=&end= of the revenue period on the dashboard summary."""
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if attrs.get("start") and attrs.get("end") and attrs["end"] < attrs["start"]:
+            raise serializers.ValidationError({"end": "End date cannot be before the start date"})
+        return attrs
+
+
+class RecurringInvoiceLineSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RecurringInvoiceLine
+        fields = ["id", "product", "position", "description", "quantity", "unit_price", "tax_rate"]
+
+
+class RecurringScheduleSerializer(serializers.ModelSerializer):
+    lines = RecurringInvoiceLineSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = RecurringInvoiceSchedule
+        fields = [
+            "id", "client", "frequency", "start_date", "end_date", "next_run_date", "payment_terms_days",
+            "notes", "is_active", "created_at", "updated_at", "lines"
+        ]
+
+
+class RecurringScheduleCreateSerializer(serializers.Serializer):
+    client = serializers.UUIDField()
+    frequency = serializers.ChoiceField(choices=RecurringInvoiceSchedule._meta.get_field("frequency").choices)
+    start_date = serializers.DateField()
+    end_date = serializers.DateField(required=False, allow_null=True)
+    payment_terms_days = serializers.IntegerField(min_value=0, required=False, default=30)
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    line_items = InvoiceLineInputSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        if attrs.get("end_date") and attrs["end_date"] < attrs["start_date"]:
+            raise serializers.ValidationError({"end_date": "End date cannot be before the start date"})
+        return attrs
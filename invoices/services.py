@@ -0,0 +1,205 @@
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from rest_framework.exceptions import ValidationError
+
+from clients.models import ClientCompany
+from productservices.models import ProductService
+from . import rollups
+from .models import Invoice, InvoiceLineItem, Receipt, RecurringInvoiceLine, RecurringInvoiceSchedule
+from .sequences import invoice_numbers
+
+CENT = Decimal("0.01")
+HUNDRED = Decimal("100")
+
+
+def to_money(value):
+    return Decimal(value).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def line_amounts(quantity, unit_price, tax_rate):
+    """(subtotal, tax_amount, total) of a line item, rounded to cents."""
+    subtotal = to_money(quantity * unit_price)
+    tax_amount = to_money(subtotal * tax_rate / HUNDRED)
+    return subtotal, tax_amount, subtotal + tax_amount
+
+
+def build_line_items(db_alias, lines):
+    """
+    Turn validated line input into unsaved InvoiceLineItem objects with their
+    amounts computed in Decimal. Products referenced by the lines are loaded
+    with a single query; their name/price fill in missing description/price.
+    """
+    product_ids = {line["product"] for line in lines if line.get("product")}
+    products = ProductService.objects.using(db_alias).in_bulk(product_ids) if product_ids else {}
+    missing = product_ids - products.keys()
+    if missing:
+        raise ValidationError({"line_items": f"Unknown product/service ids: {sorted(missing)}"})
+
+    items = []
+    for position, line in enumerate(lines, start=1):
+        product = products.get(line.get("product"))
+        unit_price = line.get("unit_price")
+        if unit_price is None:
+            if product is None or product.price is None:
+                raise ValidationError({"line_items": f"Line {position}: unit_price is required"})
+            unit_price = product.price
+        description = line.get("description") or (product.name if product else "")
+        if not description:
+            raise ValidationError({"line_items": f"Line {position}: description is required"})
+
+        quantity = line["quantity"]
+        tax_rate = line.get("tax_rate") or Decimal("0")
+        subtotal, tax_amount, total = line_amounts(quantity, unit_price, tax_rate)
+        items.append(InvoiceLineItem(
+            product=product,
+            position=position,
+            description=description,
+            quantity=quantity,
+            unit_price=unit_price,
+            tax_rate=tax_rate,
+            subtotal=subtotal,
+            tax_amount=tax_amount,
+            total=total,
+        ))
+    return items
+
+
+def create_invoice(db_alias, data, allocator=None):
+    """
+    Persist an invoice and its line items on the tenant database.
+
+    ``data`` is the validated payload of InvoiceCreateSerializer. Totals are
+    computed once here, and the invoice row plus all line items (one
+    bulk INSERT) and its rollup row (invoices.rollups) are written in a
+    single transaction. The invoice number
+    comes from ``allocator`` (invoices.sequences), see INVOICE_NUMBER_MODE.
+    """
+    allocator = allocator or invoice_numbers
+    strict = settings.INVOICE_NUMBER_MODE == "strict"
+    lines = data["line_items"]
+    items = build_line_items(db_alias, lines)
+
+    client = None
+    client_name = data.get("client_name")
+    if data.get("client"):
+        client = ClientCompany.objects.using(db_alias).only("id", "name").filter(id=data["client"]).first()
+        if client is None:
+            raise ValidationError({"client": "Client company not found"})
+        client_name = client_name or client.name
+    if not client_name:
+        raise ValidationError({"client_name": "client or client_name is required"})
+
+    subtotal = sum((item.subtotal for item in items), Decimal("0"))
+    tax_amount = sum((item.tax_amount for item in items), Decimal("0"))
+    amount = subtotal + tax_amount
+    # Only "paid" (settled outside of receipts) is taken from the client; the
+    # status always follows amount_paid so balances and rollups agree
+    amount_paid = amount if data.get("status") == "paid" else Decimal("0")
+    status = payment_status(amount, amount_paid)
+
+    # Block numbers are taken before the transaction so it never waits on the counter row
+    number = None if strict else allocator.next(db_alias)
+
+    with transaction.atomic(using=db_alias):
+        if strict:
+            number = allocator.next_strict(db_alias)
+        invoice = Invoice.objects.using(db_alias).create(
+            number=number,
+            client=client,
+            client_name=client_name,
+            issue_date=data["issue_date"],
+            due_date=data["due_date"],
+            subtotal=subtotal,
+            tax_amount=tax_amount,
+            amount=amount,
+            amount_paid=amount_paid,
+            status=status,
+            notes=data.get("notes"),
+        )
+        for item in items:
+            item.invoice = invoice
+        InvoiceLineItem.objects.using(db_alias).bulk_create(items)
+        rollups.invoice_changed(db_alias, invoice)
+
+    return invoice
+
+
+def payment_status(amount, amount_paid):
+    if amount_paid >= amount:
+        return "paid"
+    return "partially_paid" if amount_paid > 0 else "unpaid"
+
+
+def record_receipt(db_alias, data):
+    """
+    Record a payment against an invoice on the tenant database.
+
+    ``data`` is the validated payload of ReceiptCreateSerializer. The
+    invoice row is locked while its amount_paid/status are updated, so
+    concurrent payments can't overpay it; the receipt and the rollup rows
+    are written in the same transaction.
+    """
+    amount = to_money(data["amount_paid"])
+    with transaction.atomic(using=db_alias):
+        invoice = Invoice.objects.using(db_alias).select_for_update().filter(id=data["invoice"]).first()
+        if invoice is None:
+            raise ValidationError({"invoice": "Invoice not found"})
+        balance = invoice.amount - invoice.amount_paid
+        if amount > balance:
+            raise ValidationError({"amount_paid": f"Payment exceeds the outstanding balance of {balance}"})
+
+        before = rollups.invoice_snapshot(invoice)
+        invoice.amount_paid += amount
+        invoice.status = payment_status(invoice.amount, invoice.amount_paid)
+        Invoice.objects.using(db_alias).filter(id=invoice.id).update(
+            amount_paid=F("amount_paid") + amount, status=invoice.status,
+        )
+        receipt = Receipt.objects.using(db_alias).create(
+            invoice=invoice,
+            payment_date=data["payment_date"],
+            payment_method=data["payment_method"],
+            amount_paid=amount,
+        )
+        rollups.invoice_changed(db_alias, invoice, before)
+        rollups.receipt_added(db_alias, receipt, invoice.client_id)
+
+    return receipt
+
+
+def create_schedule(db_alias, data):
+    """
+    Create a recurring invoice schedule from the validated payload of
+    RecurringScheduleCreateSerializer; its lines are resolved like invoice
+    line items (product name/price fill in missing description/price).
+    """
+    client = ClientCompany.objects.using(db_alias).only("id").filter(id=data["client"]).first()
+    if client is None:
+        raise ValidationError({"client": "Client company not found"})
+    items = build_line_items(db_alias, data["line_items"])
+
+    with transaction.atomic(using=db_alias):
+        schedule = RecurringInvoiceSchedule.objects.using(db_alias).create(
+            client=client,
+            frequency=data["frequency"],
+            start_date=data["start_date"],
+            end_date=data.get("end_date"),
+            next_run_date=data["start_date"],
+            payment_terms_days=data["payment_terms_days"],
+            notes=data.get("notes"),
+        )
+        RecurringInvoiceLine.objects.using(db_alias).bulk_create([
+            RecurringInvoiceLine(
+                schedule=schedule,
+                product=item.product,
+                position=item.position,
+                description=item.description,
+                quantity=item.quantity,
+                unit_price=item.unit_price,
+                tax_rate=item.tax_rate,
+            )
+            for item in items
+        ])
+    return schedule
@@ -0,0 +1,44 @@
+from celery import shared_task
+
+from tenants.cache import get_cached_tenant
+from tenants.db_utils import get_tenant_db
+from tenants.models import Tenant
+from . import recurring
+from .rendering import render_invoices
+from .rollups import rebuild_rollups
+
+
+@shared_task
+def rebuild_invoice_rollups(tenant_id):
+    """Backfill the dashboard rollup tables of one tenant (on demand, see rollups.rebuild_rollups)."""
+    report = rebuild_rollups(get_tenant_db(get_cached_tenant(tenant_id)))
+    report["tenant_id"] = tenant_id
+    return report
+
+
+@shared_task
+def render_invoice_pdfs(tenant_id, invoice_ids):
+    """Store the PDFs of a batch of invoices (see invoices.rendering)."""
+    tenant = get_cached_tenant(tenant_id)
+    # Celery's prefork workers can't start a process pool; the batches are the parallelism
+    paths = render_invoices(get_tenant_db(tenant), tenant, invoice_ids, workers=1)
+    return {"tenant_id": tenant_id, "rendered": len(paths)}
+
+
+@shared_task
+def generate_recurring_invoices(tenant_id):
+    """Bill every recurring schedule of one tenant that is due today."""
+    report = recurring.generate_recurring_invoices(get_tenant_db(get_cached_tenant(tenant_id)))
+    report["tenant_id"] = tenant_id
+    return report
+
+
+@shared_task
+def generate_all_recurring_invoices():
+    """Queue recurring invoice generation for every ready tenant (daily, see CELERY_BEAT_SCHEDULE)."""
+    tenant_ids = list(
+        Tenant.objects.using("default").filter(status="ready", is_active=True).values_list("id", flat=True)
+    )
+    for tenant_id in tenant_ids:
+        generate_recurring_invoices.delay(tenant_id)
+    return {"tenants": len(tenant_ids)}
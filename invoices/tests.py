@@ -1,3 +1,310 @@
+import datetime
+from decimal import Decimal
+from unittest import skipUnless
+
+from django.db import IntegrityError, connection
 from django.test import TestCase
 
-# Create your tests here.
+from clients.models import ClientCompany
+from common.testing import IndexUsageMixin
+from .models import Invoice, InvoiceDailyRollup, InvoiceLineItem, Receipt, ReceiptDailyRollup, RecurringInvoiceSchedule
+from .reconciliation import reconcile_payments
+from .recurring import add_months, generate_recurring_invoices
+from .rollups import invoices_added, rebuild_rollups, repair_rollups
+from .services import create_invoice, create_schedule
+
+
+@skipUnless(connection.vendor == "mysql", "EXPLAIN plans are checked on MySQL only")
+class InvoiceIndexTests(IndexUsageMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        today = datetime.date.today()
+        Invoice.objects.bulk_create([
+            Invoice(
+                client_name=f"Client {i}",
+                issue_date=today,
+                due_date=today + datetime.timedelta(days=i % 60 - 30),
+                status="paid" if i % 4 else "unpaid",
+            )
+            for i in range(400)
+        ])
+
+    def test_overdue_lookup_uses_status_due_date_index(self):
+        queryset = Invoice.objects.filter(status="unpaid", due_date__lt=datetime.date.today())
+        self.assertUsesIndex(queryset, "invoice_status_due_idx")
+
+    def test_list_page_uses_created_at_index(self):
+        queryset = Invoice.objects.order_by("-created_at", "-id")[:51]
+        self.assertUsesIndex(queryset, "invoice_created_id_idx")
+
+
+class ReconciliationTests(TestCase):
+
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.acme = ClientCompany.objects.create(name="Acme")
+        self.globex = ClientCompany.objects.create(name="Globex")
+        self.invoices = Invoice.objects.bulk_create([
+            self.invoice(1, self.acme, "100.00", days=-20),
+            self.invoice(2, self.acme, "250.00", days=-10),
+            self.invoice(3, self.globex, "250.00", days=5),
+            self.invoice(4, self.globex, "75.50", days=10),
+        ])
+        invoices_added("default", self.invoices)
+
+    def invoice(self, number, client, amount, days):
+        return Invoice(
+            number=number,
+            client=client,
+            client_name=client.name,
+            issue_date=self.today,
+            due_date=self.today + datetime.timedelta(days=days),
+            subtotal=Decimal(amount),
+            amount=Decimal(amount),
+            status="unpaid",
+        )
+
+    def payment(self, amount, **extra):
+        return {"amount": Decimal(amount), "payment_date": self.today, "payment_method": "bank_transfer", **extra}
+
+    def rollup_rows(self):
+        # Rows emptied by a status change stay behind with zero counts
+        return (
+            set(InvoiceDailyRollup.objects.exclude(invoice_count=0).values_list(
+                "day", "status", "client_id", "invoice_count", "amount", "amount_paid",
+            )),
+            set(ReceiptDailyRollup.objects.values_list("day", "client_id", "receipt_count", "amount")),
+        )
+
+    def assert_rollups_consistent(self):
+        rows = self.rollup_rows()
+        rebuild_rollups("default")
+        self.assertEqual(rows, self.rollup_rows())
+
+    def test_matches_by_reference_client_and_unique_amount(self):
+        report = reconcile_payments("default", [
+            self.payment("100.00", reference="NEFT/INV-000001/ACME"),
+            self.payment("250.00", client=self.globex.id),
+            self.payment("75.50"),
+            self.payment("999.00"),
+        ])
+
+        self.assertEqual(
+            [(result["method"], result["status"]) for result in report["results"]],
+            [("reference", "applied"), ("client_amount", "applied"), ("amount", "applied"), (None, "unmatched")],
+        )
+        self.assertEqual(report["receipts"], 3)
+        self.assertEqual(
+            dict(Invoice.objects.values_list("number", "status")),
+            {1: "paid", 2: "unpaid", 3: "paid", 4: "paid"},
+        )
+        self.assert_rollups_consistent()
+
+    def test_client_payment_is_split_oldest_first(self):
+        report = reconcile_payments("default", [self.payment("150.00", client=self.acme.id)])
+
+        self.assertEqual(
+            [(allocation["invoice_number"], allocation["amount"]) for allocation in report["results"][0]["allocations"]],
+            [("INV-000001", Decimal("100.00")), ("INV-000002", Decimal("50.00"))],
+        )
+        invoice = Invoice.objects.get(number=2)
+        self.assertEqual((invoice.status, invoice.amount_paid), ("partially_paid", Decimal("50.00")))
+        self.assert_rollups_consistent()
+
+    def test_ambiguous_amount_and_overpayment(self):
+        report = reconcile_payments("default", [
+            self.payment("250.00"),
+            self.payment("300.00", reference="INV-000002"),
+        ])
+
+        self.assertEqual(report["results"][0]["status"], "unmatched")
+        self.assertEqual(report["results"][1]["status"], "partially_applied")
+        self.assertEqual(report["results"][1]["unapplied"], Decimal("50.00"))
+        self.assertEqual(Invoice.objects.get(number=2).status, "paid")
+
+    def test_dry_run_and_reupload_write_nothing(self):
+        preview = reconcile_payments("default", [self.payment("100.00", reference="INV-000001")], dry_run=True)
+        self.assertEqual(preview["results"][0]["status"], "applied")
+        self.assertFalse(Receipt.objects.exists())
+
+        reconcile_payments("default", [self.payment("40.00", reference="INV-000001")])
+        again = reconcile_payments("default", [self.payment("40.00", reference="INV-000001")])
+        self.assertEqual(again["results"][0]["status"], "duplicate")
+        self.assertEqual(Receipt.objects.count(), 1)
+        self.assertEqual(Invoice.objects.get(number=1).amount_paid, Decimal("40.00"))
+
+    def test_reuploaded_statement_applies_nothing(self):
+        statement = [
+            self.payment("40.00", reference="INV-000002"),
+            self.payment("40.00", reference="INV-000002"),
+            self.payment("60.00", reference="INV-000002"),
+        ]
+        report = reconcile_payments("default", statement)
+        self.assertEqual([result["status"] for result in report["results"]], ["applied"] * 3)
+
+        again = reconcile_payments("default", statement)
+        self.assertEqual([result["status"] for result in again["results"]], ["duplicate"] * 3)
+        self.assertEqual(again["receipts"], 0)
+        self.assertEqual(Receipt.objects.count(), 3)
+        self.assertEqual(Invoice.objects.get(number=2).amount_paid, Decimal("140.00"))
+
+        receipt = Receipt.objects.first()
+        with self.assertRaises(IntegrityError):
+            Receipt.objects.create(
+                invoice=receipt.invoice, payment_date=receipt.payment_date, payment_method="bank_transfer",
+                amount_paid=receipt.amount_paid, statement_line=receipt.statement_line,
+            )
+
+    def test_new_payment_with_a_recorded_reference_is_applied(self):
+        reconcile_payments("default", [
+            self.payment("40.00", reference="INV-000002"),
+            self.payment("60.00", reference="INV-000002"),
+        ])
+        report = reconcile_payments("default", [self.payment("100.00", reference="INV-000002")])
+
+        self.assertEqual(report["results"][0]["status"], "applied")
+        self.assertEqual(Invoice.objects.get(number=2).amount_paid, Decimal("200.00"))
+
+    def test_partially_applied_line_is_recognised(self):
+        statement = [self.payment("300.00", reference="INV-000002")]
+        reconcile_payments("default", statement)
+        Invoice.objects.filter(number=2).update(amount=Decimal("400.00"), status="partially_paid")
+
+        again = reconcile_payments("default", statement)
+        self.assertEqual(again["results"][0]["status"], "duplicate")
+
+    def test_fingerprint_includes_the_client(self):
+        reconcile_payments("default", [self.payment("50.00", reference="TRANSFER", client=self.acme.id)])
+        report = reconcile_payments("default", [
+            self.payment("50.00", reference="TRANSFER", client=self.acme.id),
+            self.payment("50.00", reference="TRANSFER", client=self.globex.id),
+        ])
+        self.assertEqual(
+            [result["status"] for result in report["results"]],
+            ["duplicate", "applied"],
+        )
+
+
+class RollupRepairTests(TestCase):
+
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.client_company = ClientCompany.objects.create(name="Acme")
+        for days, amount in ((0, "100"), (0, "50"), (3, "80")):
+            create_invoice("default", {
+                "client": self.client_company.id,
+                "issue_date": self.today,
+                "due_date": self.today + datetime.timedelta(days=days),
+                "line_items": [{"description": "Work", "quantity": Decimal("1"), "unit_price": Decimal(amount)}],
+            })
+
+    def test_status_follows_amount_paid(self):
+        invoice = create_invoice("default", {
+            "client_name": "Walk-in",
+            "issue_date": self.today,
+            "due_date": self.today,
+            "status": "partially_paid",
+            "line_items": [{"description": "Work", "quantity": Decimal("1"), "unit_price": Decimal("10")}],
+        })
+        self.assertEqual((invoice.status, invoice.amount_paid), ("unpaid", Decimal("0")))
+
+    def test_repair_rewrites_only_drifted_days(self):
+        self.assertEqual(repair_rollups("default"), {"invoicedailyrollup": 0, "receiptdailyrollup": 0})
+
+        drifted = InvoiceDailyRollup.objects.get(day=self.today)
+        drifted.amount += 1
+        drifted.save()
+        untouched = InvoiceDailyRollup.objects.get(day=self.today + datetime.timedelta(days=3))
+
+        self.assertEqual(repair_rollups("default"), {"invoicedailyrollup": 1, "receiptdailyrollup": 0})
+        self.assertEqual(InvoiceDailyRollup.objects.get(day=self.today).amount, Decimal("150.00"))
+        self.assertEqual(InvoiceDailyRollup.objects.get(pk=untouched.pk).amount, untouched.amount)
+        self.assertEqual(repair_rollups("default"), {"invoicedailyrollup": 0, "receiptdailyrollup": 0})
+
+    def test_repair_recreates_missing_rows(self):
+        InvoiceDailyRollup.objects.filter(day=self.today).delete()
+        repair_rollups("default", start=self.today, end=self.today)
+        self.assertEqual(InvoiceDailyRollup.objects.get(day=self.today).invoice_count, 2)
+
+
+class RecurringInvoiceTests(TestCase):
+
+    def setUp(self):
+        self.client_company = ClientCompany.objects.create(name="Acme")
+
+    def schedule(self, description, start, end=None, frequency="monthly"):
+        return create_schedule("default", {
+            "client": self.client_company.id,
+            "frequency": frequency,
+            "start_date": start,
+            "end_date": end,
+            "payment_terms_days": 30,
+            "line_items": [{"description": description, "quantity": Decimal("2"), "unit_price": Decimal("50")}],
+        })
+
+    def test_add_months_keeps_the_anchor_day(self):
+        jan31 = datetime.date(2025, 1, 31)
+        self.assertEqual(add_months(jan31, 1, 31), datetime.date(2025, 2, 28))
+        self.assertEqual(add_months(datetime.date(2025, 2, 28), 1, 31), datetime.date(2025, 3, 31))
+        self.assertEqual(add_months(datetime.date(2024, 1, 31), 1, 31), datetime.date(2024, 2, 29))
+        self.assertEqual(add_months(datetime.date(2024, 11, 30), 3, 30), datetime.date(2025, 2, 28))
+
+    def test_missed_periods_are_caught_up_until_the_end_date(self):
+        schedule = self.schedule("Hosting", datetime.date(2025, 1, 31), end=datetime.date(2025, 4, 15))
+
+        report = generate_recurring_invoices("default", today=datetime.date(2025, 12, 1))
+
+        self.assertEqual(report["invoices"], 3)
+        self.assertEqual(
+            list(Invoice.objects.order_by("billing_period").values_list("billing_period", flat=True)),
+            [datetime.date(2025, 1, 31), datetime.date(2025, 2, 28), datetime.date(2025, 3, 31)],
+        )
+        self.assertEqual(sorted(Invoice.objects.values_list("number", flat=True)), [1, 2, 3])
+        schedule.refresh_from_db()
+        self.assertFalse(schedule.is_active)
+        self.assertEqual(schedule.next_run_date, datetime.date(2025, 4, 30))
+
+    def test_rerun_creates_no_duplicates(self):
+        self.schedule("Hosting", datetime.date(2025, 1, 15))
+        today = datetime.date(2025, 3, 20)
+        self.assertEqual(generate_recurring_invoices("default", today=today)["invoices"], 3)
+        self.assertEqual(generate_recurring_invoices("default", today=today)["invoices"], 0)
+
+        # An interrupted run that never moved next_run_date forward
+        RecurringInvoiceSchedule.objects.update(next_run_date=datetime.date(2025, 1, 15))
+        self.assertEqual(generate_recurring_invoices("default", today=today)["invoices"], 0)
+        self.assertEqual(Invoice.objects.count(), 3)
+
+    def test_line_items_belong_to_their_schedule(self):
+        hosting = self.schedule("Hosting", datetime.date(2025, 1, 10))
+        support = self.schedule("Support", datetime.date(2025, 1, 20))
+
+        generate_recurring_invoices("default", today=datetime.date(2025, 2, 25), batch_size=1)
+
+        for schedule, description in ((hosting, "Hosting"), (support, "Support")):
+            invoices = Invoice.objects.filter(schedule=schedule)
+            self.assertEqual(invoices.count(), 2)
+            for invoice in invoices:
+                self.assertEqual(
+                    list(invoice.line_items.values_list("description", "total")),
+                    [(description, Decimal("100.00"))],
+                )
+                self.assertEqual(invoice.amount, Decimal("100.00"))
+        self.assertEqual(InvoiceLineItem.objects.count(), 4)
+
+    def test_number_collision_rolls_the_batch_back(self):
+        self.schedule("Hosting", datetime.date(2025, 1, 10))
+        Invoice.objects.create(
+            number=1, client_name="Manual", issue_date=datetime.date(2025, 1, 1),
+            due_date=datetime.date(2025, 1, 1), status="unpaid",
+        )
+
+        class ReusedNumbers:
+            def reserve(self, db_alias, count):
+                return 1, 1 + count
+
+        with self.assertRaises(IntegrityError):
+            generate_recurring_invoices("default", today=datetime.date(2025, 1, 10), allocator=ReusedNumbers())
+        self.assertEqual(Invoice.objects.count(), 1)
+        self.assertEqual(RecurringInvoiceSchedule.objects.get().next_run_date, datetime.date(2025, 1, 10))
@@ -0,0 +1,18 @@
+from django.urls import path
+from . import views
+
+urlpatterns = [
+    path("create/", views.create_invoice, name="create-invoice"),
+    path("list/", views.list_invoices, name="list-invoices"),
+    path("export/", views.export_invoices, name="export-invoices"),
+    path("<int:pk>/", views.get_invoice, name="get-invoice"),
+    path("<int:pk>/pdf/", views.invoice_pdf, name="invoice-pdf"),
+    path("pdf/", views.render_invoice_pdfs_batch, name="render-invoice-pdfs"),
+    path("recurring/create/", views.create_recurring_schedule, name="create-recurring-schedule"),
+    path("recurring/list/", views.list_recurring_schedules, name="list-recurring-schedules"),
+    path("recurring/<int:pk>/deactivate/", views.deactivate_recurring_schedule, name="deactivate-recurring-schedule"),
+    path("proposals/create/", views.create_proposal, name="create-proposal"),
+    path("receipts/create/", views.create_receipt, name="create-receipt"),
+    path("receipts/reconcile/", views.reconcile_receipts, name="reconcile-receipts"),
+    path("dashboard/", views.invoice_dashboard, name="invoice-dashboard"),
+]
@@ -2,7 +2,24 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import IntegrityError
+from django.http import FileResponse
+from rest_framework.exceptions import ValidationError
 from common.decorators import role_required
+from common.exports import EXPORT_FORMATS, export_response
+from common.pagination import InvalidCursor, KeysetPaginator
+from tenants.db_utils import resolve_tenant
+from tenants.models import Tenant
+from . import reconciliation, rollups, services
+from .rendering import render_invoices
+from .tasks import render_invoice_pdfs
+from .models import Invoice, RecurringInvoiceSchedule
+from .serializers import (
+    DashboardQuerySerializer, InvoiceCreateSerializer, InvoiceSerializer, ReceiptCreateSerializer, ReceiptSerializer,
+    ReconciliationSerializer, RecurringScheduleCreateSerializer, RecurringScheduleSerializer,
+)
 
 
 
@@ -14,9 +31,25 @@ from common.decorators import role_required
 @role_required(["admin"])   # only admin can create invoices
 def create_invoice(request):
     try:
-        data = request.data
-        # save invoice in DB (pseudo)
-        return Response({"success": "Invoice created", "data": data}, status=status.HTTP_201_CREATED)
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+
+        serializer = InvoiceCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            invoice = services.create_invoice(db_alias, serializer.validated_data)
+        except ValidationError as e:
+            return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"success": "Invoice created", "data": InvoiceSerializer(invoice).data}, status=status.HTTP_201_CREATED)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -26,9 +59,218 @@ def create_invoice(request):
 @role_required(["admin", "staff"])   # both can view
 def list_invoices(request):
     try:
-        # fetch invoices (pseudo)
-        invoices = []
-        return Response({"invoices": invoices}, status=status.HTTP_200_OK)
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+        paginator = KeysetPaginator(request)
+        try:
+            invoices = paginator.paginate(Invoice.objects.using(db_alias).prefetch_related("line_items"))
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = InvoiceSerializer(invoices, many=True)
+        return Response(
+            {"invoices": serializer.data, "pagination": paginator.get_pagination()},
+            status=status.HTTP_200_OK
+        )
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin", "staff"])
+def export_invoices(request):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        export_format = request.query_params.get("file_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "file_format must be csv or xlsx"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+        columns = [
+            ("Invoice Number", "number", lambda number: settings.INVOICE_NUMBER_FORMAT.format(number=number)),
+            ("Client", "client_name"),
+            ("Issue Date", "issue_date"),
+            ("Due Date", "due_date"),
+            ("Subtotal", "subtotal"),
+            ("Tax", "tax_amount"),
+            ("Total", "amount"),
+            ("Status", "status"),
+            ("Created At", "created_at"),
+        ]
+        return export_response(Invoice.objects.using(db_alias), columns, "invoices", export_format)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin", "staff"])
+def get_invoice(request, pk):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+        try:
+            invoice = Invoice.objects.using(db_alias).prefetch_related("line_items").get(id=pk)
+        except Invoice.DoesNotExist:
+            return Response({"error": "Invoice not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({"invoice": InvoiceSerializer(invoice).data}, status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin", "staff"])
+def invoice_pdf(request, pk):
+    """The invoice as a PDF; rendered once per content version, then served from storage."""
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+        path = render_invoices(db_alias, tenant, [pk]).get(pk)
+        if path is None:
+            return Response({"error": "Invoice not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        number = Invoice.objects.using(db_alias).values_list("number", flat=True).get(id=pk)
+        filename = settings.INVOICE_NUMBER_FORMAT.format(number=number) if number else f"invoice-{pk}"
+        return FileResponse(default_storage.open(path, "rb"), content_type="application/pdf", filename=f"{filename}.pdf")
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin", "staff"])
+def render_invoice_pdfs_batch(request):
+    """Queue PDF rendering of many invoices (``invoices``: list of ids) as Celery jobs."""
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        invoice_ids = request.data.get("invoices")
+        if not isinstance(invoice_ids, list) or not all(isinstance(i, int) for i in invoice_ids):
+            return Response({"error": "invoices must be a list of invoice ids"}, status=status.HTTP_400_BAD_REQUEST)
+
+        size = settings.INVOICE_PDF_BATCH_SIZE
+        task_ids = [
+            render_invoice_pdfs.delay(request.tenant_id, invoice_ids[i:i + size]).id
+            for i in range(0, len(invoice_ids), size)
+        ]
+        return Response({"success": "PDF rendering queued", "task_ids": task_ids}, status=status.HTTP_202_ACCEPTED)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ------------------- RECURRING INVOICES -------------------
+# Invoices are generated from the schedules by a Celery beat job (invoices.recurring)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin"])
+def create_recurring_schedule(request):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+
+        serializer = RecurringScheduleCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            schedule = services.create_schedule(db_alias, serializer.validated_data)
+        except ValidationError as e:
+            return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {"success": "Recurring schedule created", "data": RecurringScheduleSerializer(schedule).data},
+            status=status.HTTP_201_CREATED
+        )
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin", "staff"])
+def list_recurring_schedules(request):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+        schedules = RecurringInvoiceSchedule.objects.using(db_alias).prefetch_related("lines")
+        client_id = request.query_params.get("client")
+        if client_id:
+            schedules = schedules.filter(client_id=client_id)
+
+        paginator = KeysetPaginator(request)
+        try:
+            schedules = paginator.paginate(schedules)
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = RecurringScheduleSerializer(schedules, many=True)
+        return Response(
+            {"schedules": serializer.data, "pagination": paginator.get_pagination()},
+            status=status.HTTP_200_OK
+        )
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin"])
+def deactivate_recurring_schedule(request, pk):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+        if not RecurringInvoiceSchedule.objects.using(db_alias).filter(id=pk).update(is_active=False):
+            return Response({"error": "Schedule not found"}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response({"success": "Recurring schedule deactivated"}, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -49,7 +291,80 @@ def create_proposal(request):
 @role_required(["admin", "staff"])  # both can create receipts
 def create_receipt(request):
     try:
-        data = request.data
-        return Response({"success": "Receipt created", "data": data}, status=status.HTTP_201_CREATED)
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+
+        serializer = ReceiptCreateSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            receipt = services.record_receipt(db_alias, serializer.validated_data)
+        except ValidationError as e:
+            return Response({"error": e.detail}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response({"success": "Receipt created", "data": ReceiptSerializer(receipt).data}, status=status.HTTP_201_CREATED)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin", "staff"])
+def reconcile_receipts(request):
+    """Match a batch of payments (bank statement lines) to open invoices and record the receipts."""
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = ReconciliationSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            report = reconciliation.reconcile_payments(request.db_alias, **serializer.validated_data)
+        except IntegrityError:
+            # Another upload recorded one of these statement lines meanwhile
+            return Response(
+                {"error": "These payments are being reconciled by another upload, try again"},
+                status=status.HTTP_409_CONFLICT
+            )
+        return Response(
+            {"success": "Payments reconciled", "data": report},
+            status=status.HTTP_200_OK if report["dry_run"] else status.HTTP_201_CREATED
+        )
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ------------------- DASHBOARD -------------------
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@role_required(["admin", "staff"])
+def invoice_dashboard(request):
+    """Revenue / outstanding / overdue totals, read from the rollup tables."""
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        query = DashboardQuerySerializer(data=request.query_params)
+        if not query.is_valid():
+            return Response({"error": query.errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        summary = rollups.dashboard_summary(request.db_alias, **query.validated_data)
+        return Response({"summary": summary}, status=status.HTTP_200_OK)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
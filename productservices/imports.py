@@ -0,0 +1,55 @@
+from rest_framework import serializers
+
+from common.imports import BulkImporter
+from .models import Category, ProductService
+
+
+class ProductServiceImportSerializer(serializers.ModelSerializer):
+    """
+    A CSV row of a product/service import. The category is given by name,
+    and SKU uniqueness is checked by the importer against its preloaded set
+    rather than with one query per row.
+    """
+    category = serializers.CharField(required=False, allow_blank=True)
+
+    class Meta:
+        model = ProductService
+        fields = [
+            "type", "category", "name", "description", "price", "is_active",
+            "sku", "stock_quantity", "delivery_available"
+        ]
+        extra_kwargs = {"sku": {"validators": []}}
+
+
+class ProductServiceImporter(BulkImporter):
+    model = ProductService
+    serializer_class = ProductServiceImportSerializer
+    duplicate_field = "sku"
+    duplicate_error = "Product/Service with this SKU already exists"
+
+    def existing_keys(self):
+        self.categories = {
+            name.lower(): category_id
+            for category_id, name in Category.objects.using(self.db_alias).values_list("id", "name")
+        }
+        skus = ProductService.objects.using(self.db_alias).exclude(sku__isnull=True).values_list("sku", flat=True)
+        return {sku.lower() for sku in skus.iterator()}
+
+    def keys(self, data):
+        return [data["sku"].lower()] if data.get("sku") else []
+
+    def import_batch(self, batch):
+        # Category names are resolved from the preloaded map, not per row
+        checked = []
+        for line, row in batch:
+            category = row.get("category")
+            if category and category.lower() not in self.categories:
+                self.add_error(line, {"category": [f"Unknown category '{category}'"]})
+                continue
+            checked.append((line, row))
+        super().import_batch(checked)
+
+    def build(self, data):
+        data = dict(data)
+        category = data.pop("category", None)
+        return ProductService(category_id=self.categories.get(category.lower()) if category else None, **data)
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productservices', '0005_remove_productservice_entrepreneur_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productservice',
+            index=models.Index(fields=['created_at', 'id'], name='product_created_id_idx'),
+        ),
+    ]
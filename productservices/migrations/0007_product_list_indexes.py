@@ -0,0 +1,25 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productservices', '0006_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='productservice',
+            index=models.Index(fields=['is_active', 'type', 'created_at'], name='product_active_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productservice',
+            index=models.Index(fields=['name', 'id'], name='product_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='productservice',
+            index=models.Index(fields=['price', 'id'], name='product_price_id_idx'),
+        ),
+    ]
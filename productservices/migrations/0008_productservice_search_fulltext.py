@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+def add_search_index(apps, schema_editor):
+    # FULLTEXT is MySQL-only; other databases use the icontains fallback of common.search
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute(
+        "CREATE FULLTEXT INDEX product_search_ft ON productservices_productservice (name, description, sku)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != "mysql":
+        return
+    schema_editor.execute("DROP INDEX product_search_ft ON productservices_productservice")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('productservices', '0007_product_list_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_index, drop_search_index),
+    ]
@@ -18,6 +18,8 @@ class ProductService(models.Model):
         ("product", "Product"),
         ("service", "Service"),
     ]
+    # Covered by the FULLTEXT index product_search_ft (MySQL), see common.search
+    SEARCH_FIELDS = ["name", "description", "sku"]
 
     type = models.CharField(max_length=20, choices=TYPE_CHOICES)
     category = models.ForeignKey(
@@ -39,6 +41,16 @@ class ProductService(models.Model):
     stock_quantity = models.PositiveIntegerField(default=0, null=True, blank=True)  # for products
     delivery_available = models.BooleanField(default=False)  # for services/products
 
+    class Meta:
+        indexes = [
+            # Keyset pagination order (common.pagination)
+            models.Index(fields=["created_at", "id"], name="product_created_id_idx"),
+            # Product list filters and sort orders (get_my_products_services)
+            models.Index(fields=["is_active", "type", "created_at"], name="product_active_type_idx"),
+            models.Index(fields=["name", "id"], name="product_name_id_idx"),
+            models.Index(fields=["price", "id"], name="product_price_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.type})"
 
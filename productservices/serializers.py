@@ -28,21 +28,67 @@ class ProductServiceSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at", "updated_at"]
 
     def __init__(self, *args, **kwargs):
-        db_alias = kwargs.get("context", {}).get("db_alias", "default")
+        # Without an explicit alias TenantRouter picks the current tenant DB.
+        # The queryset stays lazy: it is only evaluated to validate input.
+        db_alias = kwargs.get("context", {}).get("db_alias")
         super().__init__(*args, **kwargs)
-        if db_alias:
-            dd = Category.objects.using(db_alias).all()
-            print([i for i in dd])
-            self.fields["category"].queryset = Category.objects.using(db_alias).all()
+        self.fields["category"].queryset = Category.objects.using(db_alias).all()
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        """Load images and category with the list query instead of once per item."""
+        return queryset.select_related("category").prefetch_related("images")
 
     def create(self, validated_data):
-        db_alias = self.context.get("db_alias", "default")
+        db_alias = self.context.get("db_alias")
         # ✅ Just save in tenant DB; no FK to admin user
         return ProductService.objects.using(db_alias).create(**validated_data)
 
 
     
 
+class ProductServiceFilterSerializer(serializers.Serializer):
+    """Query parameters of the product list (filters and sort order)."""
+    SORT_CHOICES = ["created_at", "-created_at", "name", "-name", "price", "-price"]
+
+    type = serializers.ChoiceField(choices=ProductService.TYPE_CHOICES, required=False)
+    category = serializers.IntegerField(required=False)
+    is_active = serializers.BooleanField(required=False, allow_null=True, default=None)
+    min_price = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=12, decimal_places=2, required=False)
+    sort = serializers.ChoiceField(choices=SORT_CHOICES, required=False, default="-created_at")
+
+    def validate(self, attrs):
+        if "min_price" in attrs and "max_price" in attrs and attrs["min_price"] > attrs["max_price"]:
+            raise serializers.ValidationError({"max_price": "max_price cannot be lower than min_price"})
+        return attrs
+
+    def filter_queryset(self, queryset):
+        data = self.validated_data
+        filters = {}
+        if "type" in data:
+            filters["type"] = data["type"]
+        if "category" in data:
+            filters["category_id"] = data["category"]
+        if data.get("is_active") is not None:
+            filters["is_active"] = data["is_active"]
+        if "min_price" in data:
+            filters["price__gte"] = data["min_price"]
+        if "max_price" in data:
+            filters["price__lte"] = data["max_price"]
+        return queryset.filter(**filters)
+
+    def get_ordering(self):
+        """Sort field plus the primary key as tie-breaker, for keyset paging."""
+        sort = self.validated_data["sort"]
+        return (sort, "-id" if sort.startswith("-") else "id")
+
+    def cache_key(self):
+        """Identifies the filtered set (not the order) for cached counts."""
+        data = self.validated_data
+        return ":".join(f"{name}={data[name]}" for name in sorted(data) if name != "sort")
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
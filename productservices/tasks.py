@@ -0,0 +1,15 @@
+from celery import shared_task
+
+from common.imports import import_stored_file
+from tenants.cache import get_cached_tenant
+from tenants.db_utils import get_tenant_db
+from .imports import ProductServiceImporter
+
+
+@shared_task
+def import_products_services(tenant_id, path):
+    """Bulk import a stored product/service CSV into the tenant DB."""
+    db_alias = get_tenant_db(get_cached_tenant(tenant_id))
+    report = import_stored_file(ProductServiceImporter(db_alias), path)
+    report["tenant_id"] = tenant_id
+    return report
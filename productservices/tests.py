@@ -1,3 +1,63 @@
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from common.testing import IndexUsageMixin
+from .models import Category, ProductService, ProductServiceImage
+from .serializers import ProductServiceSerializer
+
+
+class ProductServiceListQueryTests(TestCase):
+    """The product list must cost a constant number of queries."""
+
+    def create_items(self, count):
+        category = Category.objects.create(name=f"Category {Category.objects.count()}")
+        for i in range(count):
+            item = ProductService.objects.create(type="product", name=f"Item {i}", category=category)
+            ProductServiceImage.objects.create(item=item, image="products/item.png")
+            ProductServiceImage.objects.create(item=item, image="products/item-2.png")
+
+    def serialize_list(self):
+        queryset = ProductServiceSerializer.setup_eager_loading(ProductService.objects.using("default"))
+        return ProductServiceSerializer(queryset, many=True, context={"db_alias": "default"}).data
+
+    def test_serializer_init_does_not_query(self):
+        with self.assertNumQueries(0):
+            ProductServiceSerializer(context={"db_alias": "default"})
+
+    def test_list_queries_do_not_grow_with_items(self):
+        self.create_items(3)
+        # One query for the items (with their category), one for all images
+        with self.assertNumQueries(2):
+            data = self.serialize_list()
+        self.assertEqual(len(data), 3)
+        self.assertEqual(len(data[0]["images"]), 2)
+
+        self.create_items(20)
+        with self.assertNumQueries(2):
+            data = self.serialize_list()
+        self.assertEqual(len(data), 23)
+
+
+@skipUnless(connection.vendor == "mysql", "EXPLAIN plans are checked on MySQL only")
+class ProductServiceIndexTests(IndexUsageMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        ProductService.objects.bulk_create([
+            ProductService(
+                type="product" if i % 2 else "service",
+                name=f"Item {i}",
+                price=i,
+                is_active=bool(i % 5),
+            )
+            for i in range(300)
+        ])
+
+    def test_active_type_filter_uses_index(self):
+        queryset = ProductService.objects.filter(is_active=False, type="service").order_by("-created_at", "-id")[:51]
+        self.assertUsesIndex(queryset, "product_active_type_idx")
+
+    def test_sort_by_name_uses_index(self):
+        self.assertUsesIndex(ProductService.objects.order_by("name", "id")[:51], "product_name_id_idx")
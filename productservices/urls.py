@@ -3,6 +3,10 @@ from .views import (
     create_product_service,
     get_my_products_services,
     update_product_service,
+    export_products_services,
+    search_products_services,
+    import_products_services_csv,
+    product_import_status,
     delete_product_service,
     list_categories,
     create_category,
@@ -13,6 +17,10 @@ urlpatterns = [
     path('categories/create/', create_category, name='create_category'),
     path("create/", create_product_service, name="create_product_service"),
     path("my/", get_my_products_services, name="get_my_products_services"),
+    path("search/", search_products_services, name="search_products_services"),
+    path("export/", export_products_services, name="export_products_services"),
+    path("import/", import_products_services_csv, name="import_products_services"),
+    path("import/<str:task_id>/", product_import_status, name="import_products_services_status"),
     path("<int:pk>/update/", update_product_service, name="update_product_service"),
     path("<int:pk>/delete/", delete_product_service, name="delete_product_service"),
 ]
@@ -1,12 +1,19 @@
 import traceback
-from tenants.db_utils import get_tenant_db
+from django.conf import settings
+from common.exports import EXPORT_FORMATS, export_response
+from common.imports import import_job_status, queue_import, read_csv
+from common.pagination import InvalidCursor, KeysetPaginator
+from common.search import paginate_hits, search
+from tenants.db_utils import resolve_tenant
 from tenants.models import Tenant
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from .imports import ProductServiceImporter
 from .models import Category, ProductService
-from .serializers import CategorySerializer, ProductServiceSerializer
+from .serializers import CategorySerializer, ProductServiceFilterSerializer, ProductServiceSerializer
+from .tasks import import_products_services
 
 
 # ✅ Create Product/Service
@@ -14,18 +21,16 @@ from .serializers import CategorySerializer, ProductServiceSerializer
 @permission_classes([IsAuthenticated])
 def create_product_service(request):
     try:
-        tenant_id = request.data.get("tenant")
-        if not tenant_id:
-            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
-
         # Get tenant
         try:
-            tenant = Tenant.objects.get(id=tenant_id)
+            tenant = resolve_tenant(request)
         except Tenant.DoesNotExist:
             return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # ✅ Get DB alias dynamically (this will return main or copy DB depending on your get_tenant_db logic)
-        db_alias = get_tenant_db(tenant)
+        # ✅ DB alias resolved by TenantMiddleware / resolve_tenant
+        db_alias = request.db_alias
 
         data = request.data.copy()
         serializer = ProductServiceSerializer(
@@ -55,7 +60,9 @@ def create_product_service(request):
 
 
 # ✅ Get Entrepreneur's Products/Services
-@api_view(['POST'])
+# Filters, sort order and paging come from the query string
+# (?type=&category=&is_active=&min_price=&max_price=&sort=&page_size=&cursor=)
+@api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
 def get_my_products_services(request):
     try:
@@ -68,25 +75,35 @@ def get_my_products_services(request):
         #         status=status.HTTP_403_FORBIDDEN
         #     )
 
-        # 🔹 Get tenant ID from request body
-        tenant_id = request.data.get("tenant")
-        if not tenant_id:
+        # 🔹 Fetch tenant (resolved by TenantMiddleware or from request body)
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
             return Response(
                 {"error": "Tenant ID is required"},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # 🔹 Fetch tenant
-        try:
-            tenant = Tenant.objects.get(id=tenant_id)
-        except Tenant.DoesNotExist:
-            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
-
         # 🔹 Get tenant DB alias
-        db_alias = get_tenant_db(tenant)
+        db_alias = request.db_alias
+
+        # 🔹 Filters and sort order are applied in SQL
+        filters = ProductServiceFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response({"error": filters.errors}, status=status.HTTP_400_BAD_REQUEST)
+        queryset = filters.filter_queryset(ProductService.objects.using(db_alias))
 
-        # 🔹 Fetch products/services from tenant DB
-        items = ProductService.objects.using(db_alias).all()
+        # 🔹 Fetch one page of products/services from tenant DB
+        paginator = KeysetPaginator(request, ordering=filters.get_ordering())
+        try:
+            items = paginator.paginate(ProductServiceSerializer.setup_eager_loading(queryset))
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # 🔹 Exact from the page when it holds everything, else a cached COUNT(*)
+        count, count_is_exact = paginator.get_count(queryset, cache_key=f"products:{db_alias}:{filters.cache_key()}")
 
         serializer = ProductServiceSerializer(
             items,
@@ -96,8 +113,10 @@ def get_my_products_services(request):
 
         return Response({
             "success": "Products/Services fetched successfully",
-            "count": items.count(),
-            "items": serializer.data
+            "count": count,
+            "count_is_exact": count_is_exact,
+            "items": serializer.data,
+            "pagination": paginator.get_pagination()
         }, status=status.HTTP_200_OK)
 
     except Exception as e:
@@ -105,22 +124,137 @@ def get_my_products_services(request):
         print(traceback.format_exc())
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+# ✅ Search Products/Services (name, description, SKU)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_products_services(request):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response({"error": "Search query (q) is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+        queryset = ProductServiceSerializer.setup_eager_loading(ProductService.objects.using(db_alias))
+        hits, page = paginate_hits(request, search(queryset, ProductService.SEARCH_FIELDS, query))
+
+        serializer = ProductServiceSerializer(hits, many=True, context={"db_alias": db_alias, "request": request})
+        results = [
+            {**data, "score": float(item.relevance)}
+            for item, data in zip(hits, serializer.data)
+        ]
+        return Response({"results": results, "pagination": page}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        print(traceback.format_exc())
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ✅ Export Products/Services as CSV/XLSX (streamed)
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_products_services(request):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        export_format = request.query_params.get("file_format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": "file_format must be csv or xlsx"}, status=status.HTTP_400_BAD_REQUEST)
+
+        db_alias = request.db_alias
+        columns = [
+            ("Name", "name"),
+            ("Type", "type"),
+            ("Category", "category__name"),
+            ("SKU", "sku"),
+            ("Description", "description"),
+            ("Price", "price"),
+            ("Stock Quantity", "stock_quantity"),
+            ("Delivery Available", "delivery_available"),
+            ("Active", "is_active"),
+            ("Created At", "created_at"),
+        ]
+        return export_response(ProductService.objects.using(db_alias), columns, "products_services", export_format)
+
+    except Exception as e:
+        print(traceback.format_exc())
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ✅ Bulk Import Products/Services from CSV
+# Small files are imported right away; bigger ones run as a Celery job
+# whose report is polled from import/<task_id>/.
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def import_products_services_csv(request):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"error": "A CSV file is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        if upload.size <= settings.IMPORT_SYNC_MAX_BYTES:
+            db_alias = request.db_alias
+            report = ProductServiceImporter(db_alias).run(read_csv(upload))
+            return Response({"success": "Products/Services imported", "report": report}, status=status.HTTP_200_OK)
+
+        task_id = queue_import(import_products_services, request.tenant_id, upload)
+        return Response({"success": "Import queued", "task_id": task_id}, status=status.HTTP_202_ACCEPTED)
+
+    except Exception as e:
+        print(traceback.format_exc())
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+# ✅ Bulk Import Status
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def product_import_status(request, task_id):
+    try:
+        try:
+            tenant = resolve_tenant(request)
+        except Tenant.DoesNotExist:
+            return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        job = import_job_status(task_id, request.tenant_id)
+        if job is None:
+            return Response({"error": "Import not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(job, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        print(traceback.format_exc())
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
 # ✅ Update Product/Service
 @api_view(['PUT', 'PATCH'])
 @permission_classes([IsAuthenticated])
 def update_product_service(request, pk):
     try:
-        tenant_id = request.data.get("tenant")
-        if not tenant_id:
-            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
-
         # 🔹 Get tenant and db alias
         try:
-            tenant = Tenant.objects.get(id=tenant_id)
+            tenant = resolve_tenant(request)
         except Tenant.DoesNotExist:
             return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        db_alias = get_tenant_db(tenant)
+        db_alias = request.db_alias
 
         # 🔹 Fetch product from tenant DB
         try:
@@ -156,19 +290,16 @@ def update_product_service(request, pk):
 @permission_classes([IsAuthenticated])
 def delete_product_service(request, pk):
     try:
-        # 1️⃣ Get tenant_id from request data or query params
-        tenant_id = request.data.get("tenant") or request.query_params.get("tenant")
-        if not tenant_id:
-            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # 2️⃣ Get tenant object
+        # 1️⃣ Get tenant object (middleware, request data or query params)
         try:
-            tenant = Tenant.objects.get(id=tenant_id)
+            tenant = resolve_tenant(request)
         except Tenant.DoesNotExist:
             return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         # 3️⃣ Get DB alias for this tenant
-        db_alias = get_tenant_db(tenant)
+        db_alias = request.db_alias
 
         # 4️⃣ Fetch product from tenant DB
         try:
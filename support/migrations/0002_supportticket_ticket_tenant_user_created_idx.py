@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:43
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('support', '0001_initial'),
+        ('tenants', '0006_created_at_id_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='supportticket',
+            index=models.Index(fields=['tenant', 'user', '-created_at'], name='ticket_tenant_user_created_idx'),
+        ),
+    ]
@@ -16,5 +16,11 @@ class SupportTicket(models.Model):
     status = models.CharField(max_length=20, default='Open')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # list_support_tickets: a user's tickets in a tenant, newest first
+            models.Index(fields=["tenant", "user", "-created_at"], name="ticket_tenant_user_created_idx"),
+        ]
+
     def __str__(self):
         return self.subject
@@ -1,3 +1,34 @@
+from unittest import skipUnless
+
+from django.db import connection
 from django.test import TestCase
 
-# Create your tests here.
+from common.testing import IndexUsageMixin
+from tenants.models import Tenant
+from users.models import User
+from .models import SupportTicket
+
+
+@skipUnless(connection.vendor == "mysql", "EXPLAIN plans are checked on MySQL only")
+class SupportTicketIndexTests(IndexUsageMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username="owner", email="owner@example.com")
+        cls.tenants = [
+            Tenant.objects.create(name=f"Tenant {i}", db_name=f"tenant_{i}", owner=cls.owner)
+            for i in range(5)
+        ]
+        cls.users = [User.objects.create(username=f"user{i}") for i in range(5)]
+        SupportTicket.objects.bulk_create([
+            SupportTicket(tenant=tenant, user=user, subject="Help", description="...")
+            for tenant in cls.tenants
+            for user in cls.users
+            for _ in range(10)
+        ])
+
+    def test_ticket_list_uses_composite_index(self):
+        queryset = SupportTicket.objects.filter(
+            tenant=self.tenants[0], user=self.users[0]
+        ).order_by("-created_at", "-id")[:51]
+        self.assertUsesIndex(queryset, "ticket_tenant_user_created_idx")
@@ -1,7 +1,9 @@
 from rest_framework.decorators import api_view, permission_classes
+from common.pagination import InvalidCursor, KeysetPaginator
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from tenants.db_utils import resolve_tenant
 from tenants.models import Tenant
 from .models import SupportTicket
 from .serializers import SupportTicketSerializer
@@ -12,22 +14,18 @@ from users.models import User  # Adjust import if your apps differ
 @permission_classes([IsAuthenticated])
 def create_support_ticket(request):
     try:
-        # ✅ Get tenant from request data
-        tenant_id = request.data.get("tenant")
-        if not tenant_id:
+        # ✅ Get tenant (middleware or request data)
+        tenant = resolve_tenant(request)
+        if tenant is None:
             return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        tenant = Tenant.objects.get(id=tenant_id)
-
-        # ✅ Use current logged-in user if needed
-        user = request.user
-
         # ✅ Initialize serializer
         serializer = SupportTicketSerializer(data=request.data)
 
         # ✅ Validate and save (default DB is used automatically)
         if serializer.is_valid():
-            ticket = serializer.save(user=user, tenant=tenant)
+            # user_id comes from the token, no need to load the user row
+            ticket = serializer.save(user_id=request.user.id, tenant_id=request.tenant_id)
 
             return Response({
                 "success": "Support ticket submitted successfully",
@@ -47,21 +45,26 @@ def create_support_ticket(request):
 @permission_classes([IsAuthenticated])
 def list_support_tickets(request):
     try:
-        # ✅ Get tenant from query params
-        tenant_id = request.query_params.get("tenant")
-        if not tenant_id:
-            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
-
+        # ✅ Get tenant (middleware or query params)
         try:
-            tenant = Tenant.objects.get(id=tenant_id)
+            tenant = resolve_tenant(request)
         except Tenant.DoesNotExist:
             return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+        if tenant is None:
+            return Response({"error": "Tenant ID is required"}, status=status.HTTP_400_BAD_REQUEST)
 
         # ✅ Filter tickets by tenant (and optionally by logged-in user)
-        tickets = SupportTicket.objects.filter(tenant=tenant, user=request.user).order_by("-created_at")
+        paginator = KeysetPaginator(request)
+        try:
+            tickets = paginator.paginate(SupportTicket.objects.filter(tenant_id=request.tenant_id, user_id=request.user.id))
+        except InvalidCursor as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = SupportTicketSerializer(tickets, many=True)
-        return Response({"tickets": serializer.data}, status=status.HTTP_200_OK)
+        return Response(
+            {"tickets": serializer.data, "pagination": paginator.get_pagination()},
+            status=status.HTTP_200_OK
+        )
 
     except Exception as e:
         import traceback
@@ -0,0 +1,35 @@
+from django.db.backends.mysql import base
+
+from tenants.pool import tenant_pools
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    MySQL backend for tenant databases that borrows its raw connection from
+    ``tenants.pool.tenant_pools`` and hands it back on close, instead of
+    opening and tearing down a TCP/auth handshake per request.
+    """
+
+    def get_new_connection(self, conn_params):
+        return tenant_pools.acquire(
+            self.alias,
+            lambda: super(DatabaseWrapper, self).get_new_connection(conn_params),
+        )
+
+    def _close(self):
+        if self.connection is None:
+            return
+
+        connection = self.connection
+        # A connection closed inside atomic() may still be referenced by this
+        # wrapper until the block exits, so never hand it to another thread.
+        discard = self.in_atomic_block
+        if not discard:
+            try:
+                if not connection.get_autocommit():
+                    connection.rollback()
+                if self.errors_occurred:
+                    connection.ping(reconnect=False)
+            except Exception:
+                discard = True
+        tenant_pools.release(self.alias, connection, discard=discard)
@@ -0,0 +1,75 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+
+from .models import Tenant
+
+
+class TenantCache:
+    """
+    In-process TTL/LRU cache of Tenant rows keyed by tenant id.
+
+    Saves the master-DB round trip that every tenant-aware view used to make
+    before doing any real work. Entries expire after ``ttl`` seconds and the
+    least recently used entry is dropped once ``maxsize`` is reached.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id):
+        """
+        Return the Tenant for ``tenant_id``, loading it on a miss.
+        Raises Tenant.DoesNotExist for unknown or malformed ids.
+        """
+        try:
+            key = int(tenant_id)
+        except (TypeError, ValueError):
+            raise Tenant.DoesNotExist(f"Invalid tenant id {tenant_id!r}")
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end(key)
+                return entry[0]
+
+        tenant = Tenant.objects.using("default").get(id=key)
+
+        with self._lock:
+            self._entries[key] = (tenant, now + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return tenant
+
+    def invalidate(self, tenant_id):
+        try:
+            key = int(tenant_id)
+        except (TypeError, ValueError):
+            return
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+tenant_cache = TenantCache(
+    maxsize=getattr(settings, "TENANT_CACHE_MAXSIZE", 1024),
+    ttl=getattr(settings, "TENANT_CACHE_TTL", 300),
+)
+
+
+def get_cached_tenant(tenant_id):
+    return tenant_cache.get(tenant_id)
+
+
+def invalidate_tenant(tenant_id):
+    tenant_cache.invalidate(tenant_id)
@@ -0,0 +1,27 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Alias of the tenant database the current request/task works against.
+# A ContextVar is isolated per thread under WSGI and per task under ASGI.
+_current_tenant_db = ContextVar("current_tenant_db", default=None)
+
+
+def get_current_tenant_db():
+    return _current_tenant_db.get()
+
+
+def set_current_tenant_db(db_alias):
+    _current_tenant_db.set(db_alias)
+
+
+@contextmanager
+def tenant_db(db_alias):
+    """
+    Route tenant-scoped queries to ``db_alias`` for the duration of the block,
+    e.g. in Celery tasks and management commands.
+    """
+    token = _current_tenant_db.set(db_alias)
+    try:
+        yield db_alias
+    finally:
+        _current_tenant_db.reset(token)
@@ -1,21 +1,41 @@
-from .models import Tenant
-from django.db import connections
+from django.conf import settings
+
+from .context import get_current_tenant_db
+from .db_utils import get_tenant_db
+
 
 class TenantRouter:
-    def db_for_read(self, model, **hints):
+    """
+    Route models of tenant-scoped apps (``settings.TENANT_APPS``) to the
+    current tenant database, so querysets don't need ``.using(db_alias)``.
+
+    Precedence: an explicit ``tenant`` hint, the database of a related
+    ``instance`` hint, then the tenant database set for the current
+    request/task (see tenants.context). Everything else falls through to
+    Django's default handling, i.e. the ``default`` database.
+    """
+
+    def _db_for(self, model, **hints):
         tenant = hints.get("tenant")
         if tenant:
-            return tenant.db_name
-        return "default"
+            return get_tenant_db(tenant)
+
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+
+        if model._meta.app_label in getattr(settings, "TENANT_APPS", ()):
+            return get_current_tenant_db()
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._db_for(model, **hints)
 
     def db_for_write(self, model, **hints):
-        tenant = hints.get("tenant")
-        if tenant:
-            return tenant.db_name
-        return "default"
+        return self._db_for(model, **hints)
 
     def allow_relation(self, obj1, obj2, **hints):
         return True
 
     def allow_migrate(self, db, app_label, model_name=None, **hints):
-        return True
\ No newline at end of file
+        return True
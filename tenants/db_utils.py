@@ -1,24 +1,61 @@
-from django.db import connections
+from .cache import get_cached_tenant
+from .context import set_current_tenant_db
+from .registry import tenant_registry
+
+
+def register_tenant_db(db_name):
+    """
+    Ensure a tenant database is registered in connections.databases with all required keys.
+    """
+    return tenant_registry.register(db_name)
+
+
+def configure_db(db_name):
+    """
+    Connection settings for a database that is not a tenant (the template,
+    benchmarks), kept out of the tenant registry.
+    """
+    return tenant_registry.configure(db_name)
+
+
+def unregister_tenant_db(db_name):
+    """
+    Forget a tenant database in this worker (other workers follow once the
+    registry version is bumped).
+    """
+    tenant_registry.unregister(db_name)
+
 
 def get_tenant_db(tenant):
     """
-    Ensure tenant database is registered in connections.databases with all required keys.
-    """
-    db_alias = tenant.db_name
-    if db_alias not in connections.databases:
-        connections.databases[db_alias] = {
-            "ENGINE": "django.db.backends.mysql",
-            "NAME": tenant.db_name,
-            "USER": "root",
-            "PASSWORD": "root@123",
-            "HOST": "127.0.0.1",
-            "PORT": "3306",
-            "OPTIONS": {"charset": "utf8mb4"},
-            "TIME_ZONE": "UTC",
-            "AUTOCOMMIT": True,
-            "ATOMIC_REQUESTS": False,
-            "CONN_MAX_AGE": 0,
-            "CONN_HEALTH_CHECKS": True,
-            "TEST": {"NAME": tenant.db_name},
-        }
-    return db_alias
+    Return the DB alias of ``tenant`` from the tenant registry.
+    """
+    return tenant_registry.get(tenant.db_name)
+
+
+def resolve_tenant(request):
+    """
+    Return the tenant for this request.
+
+    Uses the tenant resolved by TenantMiddleware when there is one and falls
+    back to a ``tenant`` id in the request body, which then also becomes the
+    current tenant DB for routing. Returns None when no tenant id was
+    supplied and raises Tenant.DoesNotExist for unknown ids.
+
+    Either way ``request.db_alias`` and ``request.tenant_id`` are set
+    afterwards; use them rather than the tenant, which may be a lazy
+    object whose row is only loaded on attribute access.
+    """
+    tenant = getattr(request, "tenant", None)
+    if tenant is not None:
+        return tenant
+
+    tenant_id = request.data.get("tenant") or request.query_params.get("tenant")
+    if not tenant_id:
+        return None
+    tenant = get_cached_tenant(tenant_id)
+    request.tenant = tenant
+    request.tenant_id = tenant.id
+    request.db_alias = get_tenant_db(tenant)
+    set_current_tenant_db(request.db_alias)
+    return tenant
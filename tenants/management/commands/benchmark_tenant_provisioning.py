@@ -0,0 +1,49 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test.utils import override_settings
+
+from tenants.db_utils import configure_db, unregister_tenant_db
+from tenants.provisioning import create_database, migrate_database, sync_template_database
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare tenant database provisioning time when cloning the golden "
+        "template schema against running the full migration graph."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Databases to provision per strategy")
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+        sync_template_database()
+
+        results = {}
+        for strategy in ("migrate", "clone"):
+            timings = []
+            for i in range(runs):
+                db_name = f"bench_{strategy}_{uuid.uuid4().hex[:8]}"
+                try:
+                    with override_settings(TENANT_PROVISIONING_STRATEGY=strategy):
+                        started = time.perf_counter()
+                        create_database(db_name)
+                        migrate_database(configure_db(db_name))
+                        timings.append(time.perf_counter() - started)
+                finally:
+                    unregister_tenant_db(db_name)
+                    with connections["default"].cursor() as cursor:
+                        cursor.execute(f"DROP DATABASE IF EXISTS `{db_name}`")
+            results[strategy] = timings
+            self.stdout.write(
+                f"{strategy:>8}: mean {statistics.mean(timings):.2f}s  "
+                f"median {statistics.median(timings):.2f}s  "
+                f"min {min(timings):.2f}s  max {max(timings):.2f}s  ({runs} runs)"
+            )
+
+        speedup = statistics.mean(results["migrate"]) / statistics.mean(results["clone"])
+        self.stdout.write(self.style.SUCCESS(f"clone is {speedup:.1f}x faster than migrate"))
@@ -0,0 +1,121 @@
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.migrations.loader import MigrationLoader
+
+from tenants.models import Tenant
+from tenants.pool import tenant_pools
+from tenants.provisioning import sync_template_database
+from tenants.workers import init_worker, migrate_tenant
+
+
+class Command(BaseCommand):
+    help = (
+        "Migrate every tenant database in parallel with a bounded process pool. "
+        "Progress is recorded in a state file so an interrupted or partially "
+        "failed run can be resumed with --resume."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--processes", type=int, default=os.cpu_count() or 4,
+            help="Number of worker processes (default: CPU count)",
+        )
+        parser.add_argument(
+            "--tenant", action="append", dest="tenants", default=[],
+            help="Only migrate this tenant database (repeatable)",
+        )
+        parser.add_argument(
+            "--resume", action="store_true",
+            help="Skip tenants already migrated by a previous run against the same migrations",
+        )
+        parser.add_argument(
+            "--state-file", default="tenant_migrations.json",
+            help="Where per-tenant progress is recorded",
+        )
+        parser.add_argument(
+            "--skip-template", action="store_true",
+            help="Don't migrate the golden template database first",
+        )
+
+    def handle(self, *args, **options):
+        target = self.migration_target()
+        state_file = options["state_file"]
+        state = self.load_state(state_file) if options["resume"] else {}
+        if state.get("target") != target:
+            state = {"target": target, "done": [], "failed": {}}
+
+        if not options["skip_template"]:
+            sync_template_database()
+
+        db_names = Tenant.objects.filter(
+            status__in=["migrated", "ready"], db_name__isnull=False
+        ).values_list("db_name", flat=True)
+        if options["tenants"]:
+            db_names = db_names.filter(db_name__in=options["tenants"])
+        done = set(state["done"])
+        pending = [db_name for db_name in db_names if db_name not in done]
+
+        total = len(pending)
+        self.stdout.write(
+            f"Migrating {total} tenant databases with {options['processes']} processes "
+            f"({len(done)} already done)"
+        )
+        if not total:
+            return
+
+        # Don't leak this process' connections into the workers
+        connections.close_all()
+        tenant_pools.clear()
+
+        failed = {}
+        with ProcessPoolExecutor(
+            max_workers=options["processes"],
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        ) as executor:
+            futures = [executor.submit(migrate_tenant, db_name) for db_name in pending]
+            for position, future in enumerate(as_completed(futures), start=1):
+                db_name, error, elapsed = future.result()
+                if error:
+                    failed[db_name] = error
+                    state["failed"][db_name] = error
+                    self.stderr.write(f"[{position}/{total}] {db_name} FAILED ({elapsed:.1f}s)")
+                else:
+                    state["done"].append(db_name)
+                    state["failed"].pop(db_name, None)
+                    self.stdout.write(f"[{position}/{total}] {db_name} ok ({elapsed:.1f}s)")
+                self.save_state(state_file, state)
+
+        if failed:
+            for db_name, error in failed.items():
+                self.stderr.write(f"\n{db_name}:\n{error}")
+            raise CommandError(
+                f"{len(failed)} of {total} tenant databases failed to migrate; "
+                f"fix them and re-run with --resume"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Migrated {total} tenant databases"))
+
+    @staticmethod
+    def migration_target():
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        return sorted(f"{app}.{name}" for app, name in loader.graph.leaf_nodes())
+
+    @staticmethod
+    def load_state(path):
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def save_state(path, state):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(state, fh, indent=2)
+        os.replace(tmp_path, path)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from tenants.provisioning import sync_template_database, template_db_name
+
+
+class Command(BaseCommand):
+    help = "Create/migrate the golden template database new tenant databases are cloned from."
+
+    def handle(self, *args, **options):
+        sync_template_database()
+        self.stdout.write(self.style.SUCCESS(f"Template database '{template_db_name()}' is up to date"))
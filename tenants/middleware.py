@@ -0,0 +1,92 @@
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .cache import get_cached_tenant
+from .context import set_current_tenant_db
+from .db_utils import get_tenant_db
+from .models import Tenant
+from .registry import tenant_registry
+
+
+class TenantMiddleware:
+    """
+    Resolve the tenant for the current request and attach it as
+    ``request.tenant`` / ``request.db_alias``.
+
+    The tenant id is looked up, in order, in the ``tenant_id`` claim of the
+    bearer token, the ``X-Tenant-ID`` header, the ``tenant`` URL kwarg and
+    the ``tenant`` query parameter. Tenant rows come from the in-process
+    tenant cache, so resolving a tenant does not hit the master DB.
+
+    The tenant database also becomes the current tenant DB (tenants.context)
+    for the rest of the request, which TenantRouter uses for routing.
+    Tokens issued by signin carry the tenant's ``db_alias`` as well, so
+    those requests are routed straight from the verified token and the
+    Tenant row is only loaded if the view actually uses ``request.tenant``;
+    views should use ``request.db_alias`` / ``request.tenant_id`` instead.
+    A token naming a database the registry doesn't know (e.g. a deleted
+    tenant) goes through the regular lookup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.claim = getattr(settings, "TENANT_JWT_CLAIM", "tenant_id")
+        self.header = getattr(settings, "TENANT_HEADER", "HTTP_X_TENANT_ID")
+        self.url_kwarg = getattr(settings, "TENANT_URL_KWARG", "tenant")
+
+    def __call__(self, request):
+        request.tenant = None
+        request.tenant_id = None
+        request.db_alias = None
+        set_current_tenant_db(None)
+        try:
+            return self.get_response(request)
+        finally:
+            set_current_tenant_db(None)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        claims = self.get_token_claims(request)
+        tenant_id = claims.get(self.claim)
+        db_alias = tenant_registry.lookup(claims["db_alias"]) if claims.get("db_alias") else None
+        if tenant_id and db_alias:
+            request.tenant = SimpleLazyObject(lambda: get_cached_tenant(tenant_id))
+            request.tenant_id = tenant_id
+            request.db_alias = db_alias
+            set_current_tenant_db(request.db_alias)
+            return None
+
+        tenant_id = tenant_id or self.get_tenant_id(request, view_kwargs)
+        if not tenant_id:
+            return None
+
+        try:
+            tenant = get_cached_tenant(tenant_id)
+        except Tenant.DoesNotExist:
+            # Let the view decide how to report an unknown tenant.
+            return None
+
+        request.tenant = tenant
+        request.tenant_id = tenant.id
+        request.db_alias = get_tenant_db(tenant)
+        set_current_tenant_db(request.db_alias)
+        return None
+
+    def get_token_claims(self, request):
+        """Claims of a valid bearer access token, or an empty dict."""
+        auth = request.META.get("HTTP_AUTHORIZATION", "")
+        parts = auth.split()
+        if len(parts) == 2 and parts[0].lower() == "bearer":
+            try:
+                return AccessToken(parts[1]).payload
+            except TokenError:
+                pass
+        return {}
+
+    def get_tenant_id(self, request, view_kwargs):
+        return (
+            request.META.get(self.header)
+            or view_kwargs.get(self.url_kwarg)
+            or request.GET.get(self.url_kwarg)
+        )
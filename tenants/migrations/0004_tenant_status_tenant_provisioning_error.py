@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:29
+
+from django.db import migrations, models
+
+
+def mark_existing_tenants_ready(apps, schema_editor):
+    # Tenants created before async provisioning already have a migrated DB
+    Tenant = apps.get_model("tenants", "Tenant")
+    Tenant.objects.using(schema_editor.connection.alias).update(status="ready")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0003_tenant_is_active_tenant_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenant',
+            name='provisioning_error',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='tenant',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('db_created', 'Database created'), ('migrated', 'Migrated'), ('ready', 'Ready'), ('failed', 'Failed')], default='pending', max_length=20),
+        ),
+        migrations.RunPython(mark_existing_tenants_ready, migrations.RunPython.noop),
+    ]
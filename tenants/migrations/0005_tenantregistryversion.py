@@ -0,0 +1,20 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0004_tenant_status_tenant_provisioning_error'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TenantRegistryVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
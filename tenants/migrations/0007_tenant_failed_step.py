@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 17:11
+
+from django.db import migrations, models
+
+
+def backfill_failed_step(apps, schema_editor):
+    # provisioning_error of failed tenants starts with "<status>: "
+    Tenant = apps.get_model("tenants", "Tenant")
+    tenants = Tenant.objects.using(schema_editor.connection.alias)
+    for tenant in tenants.filter(status="failed").only("id", "provisioning_error"):
+        step = (tenant.provisioning_error or "").partition(":")[0]
+        if step in ("pending", "db_created", "migrated"):
+            tenants.filter(id=tenant.id).update(failed_step=step)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0006_created_at_id_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tenant',
+            name='failed_step',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('db_created', 'Database created'), ('migrated', 'Migrated'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=20, null=True),
+        ),
+        migrations.RunPython(backfill_failed_step, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,17 @@
-from django.db import models, connections
-from django.db.utils import OperationalError
+from django.db import models
 import uuid
 
 class Tenant(models.Model):
+    # Provisioning state machine: pending -> db_created -> migrated -> ready,
+    # or failed at any step (see tenants.provisioning)
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("db_created", "Database created"),
+        ("migrated", "Migrated"),
+        ("ready", "Ready"),
+        ("failed", "Failed"),
+    ]
+
     name = models.CharField(max_length=255, unique=True)
     db_name = models.CharField(max_length=255, unique=True, blank=True, null=True)
     owner = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="owned_tenants")
@@ -12,8 +21,19 @@ class Tenant(models.Model):
     # ✅ Enable/Disable tenant
     is_active = models.BooleanField(default=True)
 
+    # Database provisioning (the database itself is created by a Celery task)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    provisioning_error = models.TextField(blank=True, null=True)
+    # Status whose step failed; a failed tenant resumes from it
+    failed_step = models.CharField(max_length=20, choices=STATUS_CHOICES, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination order (common.pagination)
+            models.Index(fields=["created_at", "id"], name="tenant_created_id_idx"),
+        ]
+
     def save(self, *args, **kwargs):
-        is_new = self._state.adding  # check if creating
         if not self.db_name:
             suffix = str(uuid.uuid4().int)[:6]
             safe_name = self.name.lower().replace(" ", "_")
@@ -21,12 +41,16 @@ class Tenant(models.Model):
 
         super().save(*args, **kwargs)
 
-        if is_new:
-            try:
-                with connections['default'].cursor() as cursor:
-                    cursor.execute(f"CREATE DATABASE `{self.db_name}`")
-            except OperationalError:
-                pass
-
     def __str__(self):
         return f"{self.name} ({self.db_name})"
+
+
+class TenantRegistryVersion(models.Model):
+    """
+    Single-row counter bumped whenever tenants are created, changed or
+    deleted, so every worker can refresh its tenant registry and cache.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Tenant registry v{self.version}"
@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.db.utils import OperationalError
+
+
+class PoolTimeout(OperationalError):
+    """No tenant connection became available within the pool timeout."""
+
+
+class TenantPoolManager:
+    """
+    Process-wide pool of raw DB-API connections for tenant databases.
+
+    Each tenant alias gets its own bounded pool (``pool_size`` connections)
+    and all tenant pools together never hold more than ``max_connections``
+    open connections. Connections idle for longer than ``idle_timeout``
+    seconds are closed, and when the global cap is reached the least
+    recently used idle connection of another tenant is evicted to make
+    room. The limits are per worker process, so size them as
+    ``workers * max_connections <= MySQL max_connections``.
+    """
+
+    def __init__(self, pool_size=5, max_connections=100, idle_timeout=300, timeout=10, ping_after=30):
+        self.pool_size = pool_size
+        self.max_connections = max_connections
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.total = 0
+        self._sizes = {}   # alias -> open connections (idle + in use)
+        self._idle = {}    # alias -> deque of (connection, released_at)
+        self._cond = threading.Condition()
+
+    def acquire(self, alias, connect):
+        """
+        Return a connection for ``alias``, reusing an idle one when possible
+        and calling ``connect()`` to open a new one otherwise.
+        """
+        deadline = time.monotonic() + self.timeout
+        while True:
+            reuse = None
+            reserved = False
+            with self._cond:
+                now = time.monotonic()
+                to_close = self._pop_expired(now)
+                idle = self._idle.get(alias)
+                if idle:
+                    reuse = idle.pop()
+                elif self._sizes.get(alias, 0) < self.pool_size:
+                    if self.total >= self.max_connections:
+                        to_close.extend(self._pop_lru_idle())
+                    if self.total < self.max_connections:
+                        self._sizes[alias] = self._sizes.get(alias, 0) + 1
+                        self.total += 1
+                        reserved = True
+
+                if reuse is None and not reserved and not to_close:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise PoolTimeout(
+                            f"Timed out waiting for a connection to tenant database '{alias}'"
+                        )
+                    self._cond.wait(remaining)
+                    continue
+
+            self._close(to_close)
+
+            if reserved:
+                try:
+                    return connect()
+                except Exception:
+                    self._forget(alias)
+                    raise
+
+            if reuse is not None:
+                conn, released_at = reuse
+                if now - released_at >= self.ping_after:
+                    try:
+                        conn.ping(reconnect=False)
+                    except Exception:
+                        self.release(alias, conn, discard=True)
+                        continue
+                return conn
+
+    def release(self, alias, conn, discard=False):
+        """Hand ``conn`` back to the pool of ``alias`` (or close it if ``discard``)."""
+        if discard:
+            self._forget(alias)
+            self._close([conn])
+            return
+        with self._cond:
+            self._idle.setdefault(alias, deque()).append((conn, time.monotonic()))
+            to_close = self._pop_expired(time.monotonic())
+            self._cond.notify()
+        self._close(to_close)
+
+    def clear(self, alias=None):
+        """Close the idle connections of ``alias`` (or of every tenant)."""
+        with self._cond:
+            aliases = [alias] if alias else list(self._idle)
+            to_close = []
+            for a in aliases:
+                idle = self._idle.pop(a, ())
+                for conn, _ in idle:
+                    self._uncount(a)
+                    to_close.append(conn)
+            self._cond.notify_all()
+        self._close(to_close)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "total": self.total,
+                "max_connections": self.max_connections,
+                "pools": {
+                    alias: {"open": size, "idle": len(self._idle.get(alias, ()))}
+                    for alias, size in self._sizes.items()
+                },
+            }
+
+    # The helpers below must be called with self._cond held.
+
+    def _uncount(self, alias):
+        self.total -= 1
+        self._sizes[alias] -= 1
+        if not self._sizes[alias]:
+            del self._sizes[alias]
+
+    def _pop_expired(self, now):
+        expired = []
+        for alias, idle in self._idle.items():
+            while idle and now - idle[0][1] > self.idle_timeout:
+                expired.append(idle.popleft()[0])
+                self._uncount(alias)
+        return expired
+
+    def _pop_lru_idle(self):
+        oldest = None
+        for alias, idle in self._idle.items():
+            if idle and (oldest is None or idle[0][1] < self._idle[oldest][0][1]):
+                oldest = alias
+        if oldest is None:
+            return []
+        self._uncount(oldest)
+        return [self._idle[oldest].popleft()[0]]
+
+    # The helpers below acquire self._cond themselves (or need no lock).
+
+    def _forget(self, alias):
+        with self._cond:
+            self._uncount(alias)
+            self._cond.notify()
+
+    @staticmethod
+    def _close(connections):
+        for conn in connections:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+
+def _build_manager():
+    options = getattr(settings, "TENANT_DB_POOL", {})
+    return TenantPoolManager(
+        pool_size=options.get("POOL_SIZE", 5),
+        max_connections=options.get("MAX_CONNECTIONS", 100),
+        idle_timeout=options.get("IDLE_TIMEOUT", 300),
+        timeout=options.get("TIMEOUT", 10),
+        ping_after=options.get("PING_AFTER", 30),
+    )
+
+
+tenant_pools = _build_manager()
@@ -0,0 +1,194 @@
+import re
+import threading
+import traceback
+
+from django.conf import settings
+from django.core.management import call_command
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+from django.utils import timezone
+
+from .cache import invalidate_tenant
+from .db_utils import configure_db, get_tenant_db
+from .models import Tenant
+from .registry import tenant_registry
+
+
+def database_exists(db_name):
+    with connections["default"].cursor() as cursor:
+        cursor.execute(
+            "SELECT SCHEMA_NAME FROM information_schema.SCHEMATA WHERE SCHEMA_NAME = %s",
+            [db_name],
+        )
+        return cursor.fetchone() is not None
+
+
+def template_db_name():
+    return getattr(settings, "TENANT_TEMPLATE_DB", "adinvoice_tenant_template")
+
+
+def sync_template_database():
+    """
+    Create the golden template database if needed and migrate it to the
+    latest schema. Run after every deploy; it is a no-op when current.
+    """
+    db_name = template_db_name()
+    with connections["default"].cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{db_name}`")
+    db_alias = configure_db(db_name)
+    migrate_database(db_alias)
+    return db_alias
+
+
+# (template migration count, last migration id) -> list of CREATE TABLE statements
+_template_schema_cache = {}
+_template_schema_lock = threading.Lock()
+_AUTO_INCREMENT_RE = re.compile(r"\s+AUTO_INCREMENT=\d+")
+
+
+def template_schema():
+    """
+    Return the DDL of every table in the template database, cached per
+    template migration state so the schema is only read once per deploy.
+    """
+    db_name = template_db_name()
+    db_alias = configure_db(db_name)
+    with connections[db_alias].cursor() as cursor:
+        cursor.execute("SELECT COUNT(*), MAX(id) FROM django_migrations")
+        signature = cursor.fetchone()
+        with _template_schema_lock:
+            if signature in _template_schema_cache:
+                return _template_schema_cache[signature]
+
+        cursor.execute(
+            "SELECT TABLE_NAME FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = %s AND TABLE_TYPE = 'BASE TABLE'",
+            [db_name],
+        )
+        tables = [row[0] for row in cursor.fetchall()]
+        statements = []
+        for table in tables:
+            cursor.execute(f"SHOW CREATE TABLE `{table}`")
+            ddl = cursor.fetchone()[1]
+            ddl = ddl.replace("CREATE TABLE", "CREATE TABLE IF NOT EXISTS", 1)
+            statements.append((table, _AUTO_INCREMENT_RE.sub("", ddl)))
+
+    with _template_schema_lock:
+        _template_schema_cache.clear()
+        _template_schema_cache[signature] = statements
+    return statements
+
+
+def clone_template_schema(db_name):
+    """
+    Replay the template's DDL into ``db_name`` and copy the bookkeeping rows
+    (applied migrations, content types, permissions), so the new database
+    looks fully migrated without running the migration graph. Tables are
+    created IF NOT EXISTS and rows inserted IGNORE, so a clone that broke
+    off halfway is completed by running it again.
+    """
+    template = template_db_name()
+    if not _template_schema_cache and not database_exists(template):
+        sync_template_database()
+    statements = template_schema()
+    seed_tables = getattr(
+        settings,
+        "TENANT_TEMPLATE_DATA_TABLES",
+        ["django_migrations", "django_content_type", "auth_permission"],
+    )
+    db_alias = configure_db(db_name)
+    with connections[db_alias].cursor() as cursor:
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+        try:
+            for table, ddl in statements:
+                cursor.execute(ddl)
+            for table, ddl in statements:
+                if table in seed_tables:
+                    cursor.execute(
+                        f"INSERT IGNORE INTO `{db_name}`.`{table}` "
+                        f"SELECT * FROM `{template}`.`{table}`"
+                    )
+        finally:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+
+def create_database(db_name):
+    with connections["default"].cursor() as cursor:
+        cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{db_name}`")
+    if getattr(settings, "TENANT_PROVISIONING_STRATEGY", "clone") == "clone":
+        clone_template_schema(db_name)
+
+
+def migrate_database(db_alias):
+    """Apply outstanding migrations; skips the command when there are none."""
+    connection = connections[db_alias]
+    executor = MigrationExecutor(connection)
+    targets = executor.loader.graph.leaf_nodes()
+    if executor.migration_plan(targets):
+        call_command("migrate", database=db_alias, interactive=False, verbosity=0)
+
+
+def create_tenant_database(tenant):
+    create_database(tenant.db_name)
+
+
+def migrate_tenant_database(tenant):
+    migrate_database(get_tenant_db(tenant))
+
+
+def finish_tenant(tenant):
+    # Don't keep the worker's migration connection open
+    connections[get_tenant_db(tenant)].close()
+
+
+# status -> (step to run, status once the step succeeded). Every step is
+# idempotent, so a crashed or failed step can simply be run again.
+STEPS = {
+    "pending": (create_tenant_database, "db_created"),
+    "db_created": (migrate_tenant_database, "migrated"),
+    "migrated": (finish_tenant, "ready"),
+}
+
+
+def set_status(tenant, status, error=None, failed_step=None):
+    tenant.status = status
+    tenant.provisioning_error = error
+    tenant.failed_step = failed_step
+    tenant.save(update_fields=["status", "provisioning_error", "failed_step", "updated_at"])
+    invalidate_tenant(tenant.id)
+
+
+def provision(tenant):
+    """
+    Drive ``tenant`` through the provisioning state machine up to ``ready``,
+    resuming from its current status. A failed tenant re-runs the step that
+    failed: a clone that broke off halfway is completed before migrating.
+    Of several retries queued for one failed tenant only the first resumes.
+    """
+    if tenant.status == "failed":
+        resume = tenant.failed_step or "pending"
+        claimed = Tenant.objects.filter(id=tenant.id, status="failed").update(
+            status=resume, updated_at=timezone.now()
+        )
+        invalidate_tenant(tenant.id)
+        if not claimed:
+            tenant.refresh_from_db(fields=["status"])
+            return tenant
+        tenant.status = resume
+
+    while tenant.status != "ready":
+        step, next_status = STEPS[tenant.status]
+        try:
+            step(tenant)
+        except Exception:
+            set_status(tenant, "failed", f"{tenant.status}: {traceback.format_exc()}", failed_step=tenant.status)
+            raise
+        set_status(tenant, next_status)
+
+    # Let every worker register the new tenant database
+    tenant_registry.bump()
+    return tenant
+
+
+def provision_by_id(tenant_id):
+    return provision(Tenant.objects.get(id=tenant_id))
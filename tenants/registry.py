@@ -0,0 +1,185 @@
+import threading
+import time
+from copy import deepcopy
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+from django.db.models import F
+
+from .cache import tenant_cache
+from .models import Tenant, TenantRegistryVersion
+from .pool import tenant_pools
+
+
+def tenant_db_settings(db_name):
+    """
+    Build the connection settings for a tenant database from the default one.
+
+    Tenant aliases use the pooled backend (``TENANT_DB_ENGINE``) so a request
+    borrows an already-open connection instead of reconnecting to MySQL.
+    ``TENANT_DB_CONN_MAX_AGE`` additionally keeps a connection pinned to its
+    thread across requests; the default of 0 returns it to the pool instead.
+    """
+    config = deepcopy(connections.databases["default"])
+    config.update({
+        "ENGINE": getattr(settings, "TENANT_DB_ENGINE", "tenants.backends.mysql"),
+        "NAME": db_name,
+        "OPTIONS": {"charset": "utf8mb4", **config.get("OPTIONS", {})},
+        "TIME_ZONE": "UTC",
+        "AUTOCOMMIT": True,
+        "ATOMIC_REQUESTS": False,
+        "CONN_MAX_AGE": getattr(settings, "TENANT_DB_CONN_MAX_AGE", 0),
+        "CONN_HEALTH_CHECKS": True,
+        "TEST": {**config.get("TEST", {}), "NAME": db_name},
+    })
+    return config
+
+
+class TenantRegistry:
+    """
+    Process-local registry of tenant database aliases.
+
+    All tenant databases are registered in one pass from the Tenant table,
+    either at worker boot (``preload()``) or on first use, instead of one by
+    one inside the first request for each tenant. Workers learn about
+    created, changed and deleted tenants through the TenantRegistryVersion
+    counter, which is checked at most every ``poll_interval`` seconds; a
+    changed version reloads the registry and clears the tenant cache.
+
+    Databases that are not tenants (the provisioning template, benchmark
+    databases) are only ``configure()``d: they never enter the registry, so
+    reloads keep them and ``lookup()``/``stats()`` ignore them.
+    """
+
+    def __init__(self, poll_interval=5):
+        self.poll_interval = poll_interval
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self._aliases = set()
+        self._checked_at = 0
+        self._lock = threading.RLock()
+
+    def get(self, db_name):
+        """Return the alias for ``db_name``, registering it if needed."""
+        self._refresh_if_stale()
+        with self._lock:
+            if db_name in self._aliases and db_name in connections.databases:
+                self.hits += 1
+                return db_name
+            self.misses += 1
+            return self.register(db_name)
+
+    def lookup(self, db_name):
+        """The alias of a known tenant database, or None (never registers ``db_name``)."""
+        self._refresh_if_stale()
+        with self._lock:
+            if db_name in self._aliases and db_name in connections.databases:
+                self.hits += 1
+                return db_name
+        return None
+
+    def register(self, db_name):
+        with self._lock:
+            self.configure(db_name)
+            self._aliases.add(db_name)
+        return db_name
+
+    def configure(self, db_name):
+        """Connection settings for ``db_name`` without registering it as a tenant."""
+        with self._lock:
+            if db_name not in connections.databases:
+                connections.databases[db_name] = tenant_db_settings(db_name)
+        return db_name
+
+    def unregister(self, db_name):
+        """
+        Forget a tenant database: close this thread's connection, drop its
+        settings and close any pooled connections to it.
+        """
+        with self._lock:
+            self._aliases.discard(db_name)
+            if db_name in connections.databases:
+                connections[db_name].close()
+                del connections[db_name]
+                del connections.databases[db_name]
+        tenant_pools.clear(db_name)
+
+    def load(self):
+        """(Re)load every tenant database from the Tenant table in bulk."""
+        version = self._current_version()
+        db_names = set(
+            Tenant.objects.using("default")
+            .filter(db_name__isnull=False)
+            .values_list("db_name", flat=True)
+        )
+        with self._lock:
+            for db_name in self._aliases - db_names:
+                self.unregister(db_name)
+            for db_name in db_names:
+                self.register(db_name)
+            self.version = version
+            self.reloads += 1
+            self._checked_at = time.monotonic()
+        tenant_cache.clear()
+
+    def preload(self):
+        """
+        Load at worker boot; falls back to lazy loading if the DB is unavailable.
+
+        Runs at import time, i.e. in the gunicorn master under ``--preload``,
+        so the connections it opened are closed again rather than inherited
+        (and shared) by every forked worker.
+        """
+        try:
+            self.load()
+        except DatabaseError:
+            pass
+        finally:
+            connections.close_all()
+
+    def bump(self):
+        """Tell every worker that tenants changed."""
+        updated = TenantRegistryVersion.objects.using("default").filter(pk=1).update(
+            version=F("version") + 1
+        )
+        if not updated:
+            TenantRegistryVersion.objects.using("default").get_or_create(pk=1, defaults={"version": 1})
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "version": self.version,
+                "tenants": len(self._aliases),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "reloads": self.reloads,
+                "pool": tenant_pools.stats(),
+            }
+
+    def _current_version(self):
+        return (
+            TenantRegistryVersion.objects.using("default")
+            .filter(pk=1)
+            .values_list("version", flat=True)
+            .first()
+        ) or 0
+
+    def _refresh_if_stale(self):
+        now = time.monotonic()
+        if self.version is not None and now - self._checked_at < self.poll_interval:
+            return
+        with self._lock:
+            if self.version is not None and now - self._checked_at < self.poll_interval:
+                return
+            self._checked_at = now
+            if self.version is None or self._current_version() != self.version:
+                self.load()
+
+
+tenant_registry = TenantRegistry(
+    poll_interval=getattr(settings, "TENANT_REGISTRY_POLL_INTERVAL", 5),
+)
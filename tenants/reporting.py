@@ -0,0 +1,156 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.models import Sum
+from django.utils import timezone
+
+from clients.models import ClientCompany
+from invoices.models import InvoiceDailyRollup, ReceiptDailyRollup
+from invoices.rollups import OPEN_STATUSES
+from .models import Tenant
+from .registry import tenant_registry
+
+PLATFORM_REPORT_CACHE_KEY = "platform-report"
+
+# Fields of tenant_totals() summed into the platform totals
+SUMMED_FIELDS = ("invoices_issued", "invoiced_amount", "revenue", "outstanding", "active_clients")
+
+
+def report_cache():
+    return caches[getattr(settings, "REPORT_CACHE_ALIAS", "default")]
+
+
+def tenant_totals(db_alias):
+    """Aggregates of one tenant DB, read from its rollup tables (invoices.rollups)."""
+    invoices = InvoiceDailyRollup.objects.using(db_alias).aggregate(
+        invoices_issued=Sum("invoice_count"), invoiced_amount=Sum("amount"),
+    )
+    open_invoices = InvoiceDailyRollup.objects.using(db_alias).filter(status__in=OPEN_STATUSES).aggregate(
+        amount=Sum("amount"), amount_paid=Sum("amount_paid"),
+    )
+    revenue = ReceiptDailyRollup.objects.using(db_alias).aggregate(amount=Sum("amount"))["amount"]
+    return {
+        "invoices_issued": invoices["invoices_issued"] or 0,
+        "invoiced_amount": invoices["invoiced_amount"] or Decimal("0"),
+        "revenue": revenue or Decimal("0"),
+        "outstanding": (open_invoices["amount"] or Decimal("0")) - (open_invoices["amount_paid"] or Decimal("0")),
+        "active_clients": ClientCompany.objects.using(db_alias).filter(is_active=True).count(),
+    }
+
+
+def run_on_tenant(func, db_alias, timeout):
+    """
+    Run ``func(db_alias)`` in a pool thread. On MySQL the statements are
+    capped at ``timeout`` seconds by the server, so a slow tenant frees its
+    thread instead of holding it. The thread's connection is given back
+    afterwards (to the tenant pool, see tenants.backends).
+    """
+    connection = connections[db_alias]
+    capped = connection.vendor == "mysql"
+    try:
+        if capped:
+            with connection.cursor() as cursor:
+                cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", [int(timeout * 1000)])
+        return func(db_alias)
+    finally:
+        try:
+            if capped and connection.connection is not None:
+                # Pooled connections are reused by requests
+                with connection.cursor() as cursor:
+                    cursor.execute("SET SESSION MAX_EXECUTION_TIME = 0")
+        finally:
+            connection.close()
+
+
+def fan_out(func, tenants, max_workers=None, timeout=None, deadline=None):
+    """
+    Run ``func(db_alias)`` for every tenant on a bounded thread pool.
+
+    Returns ``(results, failures)``: results maps tenant id to the value
+    returned, failures maps tenant id to an error message. ``timeout`` is
+    the budget of a single tenant, ``deadline`` of the whole fan-out;
+    tenants still queued or running at the deadline are reported as timed
+    out rather than waited for.
+    """
+    max_workers = max_workers or getattr(settings, "REPORT_MAX_WORKERS", 8)
+    timeout = timeout or getattr(settings, "REPORT_TENANT_TIMEOUT", 5)
+    deadline = deadline or getattr(settings, "REPORT_TIMEOUT", 30)
+
+    results, failures = {}, {}
+    if not tenants:
+        return results, failures
+
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tenants)), thread_name_prefix="tenant-report")
+    try:
+        futures = {
+            executor.submit(run_on_tenant, func, tenant_registry.get(tenant.db_name), timeout): tenant
+            for tenant in tenants
+        }
+        done, pending = wait(futures, timeout=deadline)
+        for future in done:
+            tenant = futures[future]
+            try:
+                results[tenant.id] = future.result()
+            except Exception as e:
+                failures[tenant.id] = str(e)
+        for future in pending:
+            future.cancel()
+            failures[futures[future].id] = "Timed out"
+    finally:
+        # Don't wait for a tenant that is still running past the deadline
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results, failures
+
+
+def build_platform_report():
+    """Platform-wide totals over every ready tenant, with a per-tenant breakdown."""
+    started = time.monotonic()
+    tenants = list(
+        Tenant.objects.using("default")
+        .filter(status="ready", is_active=True, db_name__isnull=False)
+        .only("id", "name", "db_name")
+        .order_by("id")
+    )
+    results, failures = fan_out(tenant_totals, tenants)
+
+    totals = {field: 0 for field in SUMMED_FIELDS}
+    breakdown = []
+    for tenant in tenants:
+        if tenant.id in results:
+            for field in SUMMED_FIELDS:
+                totals[field] += results[tenant.id][field]
+            breakdown.append({"tenant_id": tenant.id, "name": tenant.name, **results[tenant.id]})
+        else:
+            breakdown.append({"tenant_id": tenant.id, "name": tenant.name, "error": failures[tenant.id]})
+
+    return {
+        "totals": totals,
+        "tenants": breakdown,
+        "tenant_count": len(tenants),
+        "failed_tenants": len(failures),
+        "complete": not failures,
+        "generated_at": timezone.now(),
+        "duration_ms": round((time.monotonic() - started) * 1000),
+    }
+
+
+def refresh_platform_report():
+    report = build_platform_report()
+    report_cache().set(PLATFORM_REPORT_CACHE_KEY, report, getattr(settings, "REPORT_CACHE_TTL", 900))
+    return report
+
+
+def get_platform_report(refresh=False):
+    """
+    The cached platform report; Celery beat refreshes it every
+    REPORT_REFRESH_INTERVAL seconds, so it is only built here on a cold
+    cache or when ``refresh`` is asked for.
+    """
+    report = None if refresh else report_cache().get(PLATFORM_REPORT_CACHE_KEY)
+    if report is None:
+        report = refresh_platform_report()
+    return report
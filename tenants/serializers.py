@@ -5,3 +5,4 @@ class TenantSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tenant
         fields = '__all__'
+        read_only_fields = ["status", "provisioning_error", "failed_step"]
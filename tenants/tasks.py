@@ -0,0 +1,19 @@
+from celery import shared_task
+from django.db import OperationalError
+
+from . import reporting
+from .provisioning import provision_by_id
+
+
+@shared_task(autoretry_for=(OperationalError,), retry_backoff=True, max_retries=3)
+def provision_tenant(tenant_id):
+    """Create and migrate the database of a newly created tenant."""
+    tenant = provision_by_id(tenant_id)
+    return {"id": tenant.id, "status": tenant.status}
+
+
+@shared_task
+def refresh_platform_report():
+    """Rebuild the cached cross-tenant report (Celery beat, REPORT_REFRESH_INTERVAL)."""
+    report = reporting.refresh_platform_report()
+    return {key: report[key] for key in ("tenant_count", "failed_tenants", "duration_ms")}
@@ -1,3 +1,20 @@
+from django.db import connections
 from django.test import TestCase
 
-# Create your tests here.
+from .registry import TenantRegistry
+
+
+class TenantRegistryTests(TestCase):
+
+    def setUp(self):
+        self.registry = TenantRegistry()
+        self.addCleanup(self.registry.unregister, "registry_test_template")
+
+    def test_configured_databases_stay_out_of_the_registry(self):
+        self.registry.configure("registry_test_template")
+        self.registry.load()
+        self.registry.load()
+
+        self.assertIn("registry_test_template", connections.databases)
+        self.assertIsNone(self.registry.lookup("registry_test_template"))
+        self.assertEqual(self.registry.stats()["tenants"], 0)
@@ -4,7 +4,11 @@ from . import views
 urlpatterns = [
     path("create/", views.create_tenant, name="create-tenant"),
     path("list/", views.list_tenants, name="list-tenants"),
+    path("registry/", views.tenant_registry_stats, name="tenant-registry-stats"),
+    path("reports/", views.platform_report, name="platform-report"),
     path("<int:tenant_id>/", views.get_tenant, name="get-tenant"),
+    path("<int:tenant_id>/status/", views.tenant_status, name="tenant-status"),
+    path("<int:tenant_id>/provision/", views.retry_tenant_provisioning, name="retry-tenant-provisioning"),
     path("update/<int:tenant_id>/", views.update_tenant, name="update-tenant"),
     path("delete/<int:tenant_id>/", views.delete_tenant, name="delete-tenant"),
 ]
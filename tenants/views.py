@@ -1,18 +1,23 @@
 import traceback
-from copy import deepcopy
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from .cache import invalidate_tenant
+from .db_utils import unregister_tenant_db
 from .models import Tenant
+from .registry import tenant_registry
+from .reporting import get_platform_report
 from .serializers import TenantSerializer
+from .tasks import provision_tenant
+from common.pagination import InvalidCursor, KeysetPaginator
 from common.permissions import role_required
-from django.conf import settings
-from django.core.management import call_command
-from django.db import connections, connection
+from django.db import connection, transaction
 
 
 
 # Endpoint: Create Tenant (Admin only)
+# The tenant database is created and migrated by a Celery task; poll
+# the status endpoint until the tenant is "ready".
 @api_view(['POST'])
 @role_required(["admin"])
 def create_tenant(request):
@@ -20,22 +25,57 @@ def create_tenant(request):
     if serializer.is_valid():
         tenant = serializer.save()
 
-        # Copy default DB settings
-        new_db_config = deepcopy(settings.DATABASES["default"])
-        new_db_config["NAME"] = tenant.db_name
+        transaction.on_commit(lambda: provision_tenant.delay(tenant.id))
 
-        # Register new DB
-        settings.DATABASES[tenant.db_name] = new_db_config
+        return Response(
+            {
+                "success": f"Tenant {tenant.name} is being provisioned with DB {tenant.db_name}",
+                "data": {"id": tenant.id, "status": tenant.status},
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
 
-        # Run migrations for tenant DB
-        call_command("migrate", database=tenant.db_name, interactive=False)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+
+# Endpoint: Tenant Provisioning Status (Admin & Staff)
+@api_view(['GET'])
+@role_required(["admin", "staff"])
+def tenant_status(request, tenant_id):
+    try:
+        tenant = Tenant.objects.only("id", "status", "provisioning_error").get(id=tenant_id)
         return Response(
-            {"success": f"Tenant {tenant.name} created with DB {tenant.db_name}"},
-            status=status.HTTP_201_CREATED,
+            {"id": tenant.id, "status": tenant.status, "error": tenant.provisioning_error},
+            status=status.HTTP_200_OK,
         )
+    except Tenant.DoesNotExist:
+        return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+# Endpoint: Resume a failed Tenant Provisioning (Admin only)
+# Tenants that are still being provisioned are refused, so two workers
+# never run the same step on one database.
+@api_view(['POST'])
+@role_required(["admin"])
+def retry_tenant_provisioning(request, tenant_id):
+    try:
+        tenant = Tenant.objects.get(id=tenant_id)
+        if tenant.status == "ready":
+            return Response({"error": "Tenant is already provisioned"}, status=status.HTTP_400_BAD_REQUEST)
+        if tenant.status != "failed":
+            return Response({"error": "Tenant is still being provisioned"}, status=status.HTTP_409_CONFLICT)
+
+        provision_tenant.delay(tenant.id)
+        return Response(
+            {"success": "Tenant provisioning resumed", "data": {"id": tenant.id, "status": tenant.status}},
+            status=status.HTTP_202_ACCEPTED,
+        )
+    except Tenant.DoesNotExist:
+        return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
 
@@ -45,9 +85,12 @@ def create_tenant(request):
 @role_required(["admin", "staff"])
 def list_tenants(request):
     try:
-        tenants = Tenant.objects.all()
+        paginator = KeysetPaginator(request)
+        tenants = paginator.paginate(Tenant.objects.all())
         serializer = TenantSerializer(tenants, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return paginator.add_headers(Response(serializer.data, status=status.HTTP_200_OK))
+    except InvalidCursor as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
     except Exception as e:
         return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -84,6 +127,8 @@ def update_tenant(request, tenant_id):
             if action == "disable":
                 tenant.is_active = False
                 tenant.save()
+                invalidate_tenant(tenant.id)
+                tenant_registry.bump()
                 return Response(
                     {"success": "Tenant disabled successfully", "data": {"id": tenant.id, "is_active": tenant.is_active}},
                     status=status.HTTP_200_OK,
@@ -91,6 +136,8 @@ def update_tenant(request, tenant_id):
             elif action == "enable":
                 tenant.is_active = True
                 tenant.save()
+                invalidate_tenant(tenant.id)
+                tenant_registry.bump()
                 return Response(
                     {"success": "Tenant enabled successfully", "data": {"id": tenant.id, "is_active": tenant.is_active}},
                     status=status.HTTP_200_OK,
@@ -105,6 +152,8 @@ def update_tenant(request, tenant_id):
                 serializer.validated_data.pop("db_name")
 
             serializer.save()
+            invalidate_tenant(tenant.id)
+            tenant_registry.bump()
             return Response({"success": "Tenant updated successfully", "data": serializer.data}, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -124,12 +173,15 @@ def delete_tenant(request, tenant_id):
 
         db_name = tenant.db_name  # keep before deleting the object
 
-        # 1. Drop the tenant's database
+        # 1. Drop the tenant's database (closing pooled connections first)
+        unregister_tenant_db(db_name)
         with connection.cursor() as cursor:
             cursor.execute(f"DROP DATABASE IF EXISTS `{db_name}`")
 
         # 2. Delete tenant record
         tenant.delete()
+        invalidate_tenant(tenant_id)
+        tenant_registry.bump()
 
         return Response(
             {"success": f"Tenant '{tenant.name}' and database '{db_name}' deleted successfully"},
@@ -139,4 +191,23 @@ def delete_tenant(request, tenant_id):
     except Tenant.DoesNotExist:
         return Response({"error": "Tenant not found"}, status=status.HTTP_404_NOT_FOUND)
     except Exception as e:
-        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+# Endpoint: Tenant Registry metrics (Admin only)
+@api_view(['GET'])
+@role_required(["admin"])
+def tenant_registry_stats(request):
+    return Response(tenant_registry.stats(), status=status.HTTP_200_OK)
+
+
+# Endpoint: Platform-wide report across all tenants (Admin only)
+# Served from the report cache that Celery beat refreshes; ?refresh=1 rebuilds it now.
+@api_view(['GET'])
+@role_required(["admin"])
+def platform_report(request):
+    try:
+        refresh = request.query_params.get("refresh") in ("1", "true")
+        return Response(get_platform_report(refresh=refresh), status=status.HTTP_200_OK)
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,30 @@
+"""
+Entry points for worker processes (e.g. the migrate_tenants process pool).
+
+Kept free of model imports at module level: spawned workers import this
+module before Django is set up.
+"""
+import time
+import traceback
+
+
+def init_worker():
+    import django
+    django.setup()
+
+
+def migrate_tenant(db_name):
+    """Migrate one tenant database; returns (db_name, error or None, seconds)."""
+    from django.db import connections
+
+    from .db_utils import register_tenant_db
+    from .provisioning import migrate_database
+
+    started = time.perf_counter()
+    try:
+        db_alias = register_tenant_db(db_name)
+        migrate_database(db_alias)
+        connections[db_alias].close()
+        return db_name, None, time.perf_counter() - started
+    except Exception:
+        return db_name, traceback.format_exc(), time.perf_counter() - started
@@ -0,0 +1,120 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.utils.functional import SimpleLazyObject
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+
+def user_cache():
+    return caches[getattr(settings, "USER_CACHE_ALIAS", "default")]
+
+
+def user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def disabled_user_cache_key(user_id):
+    return f"auth-user-disabled:{user_id}"
+
+
+def check_active(user):
+    if not user.is_active:
+        raise AuthenticationFailed("User is inactive", code="user_inactive")
+    return user
+
+
+def get_cached_user(user_id):
+    """The full (active) User row, served from the user cache for USER_CACHE_TTL seconds."""
+    cache = user_cache()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        User = get_user_model()
+        try:
+            user = User.objects.get(pk=user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        cache.set(key, user, getattr(settings, "USER_CACHE_TTL", 60))
+    return check_active(user)
+
+
+def invalidate_cached_user(user, deleted=False):
+    """Drop the cached row of ``user``; disabled or deleted users also lose their live tokens."""
+    cache = user_cache()
+    cache.delete(user_cache_key(user.pk))
+    if deleted or not user.is_active:
+        # Outstanding access tokens stay signed until they expire
+        ttl = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        cache.set(disabled_user_cache_key(user.pk), True, ttl)
+    else:
+        cache.delete(disabled_user_cache_key(user.pk))
+
+
+def update_users(queryset, **fields):
+    """
+    ``queryset.update(**fields)`` for users. update() sends no post_save, so
+    the cached rows are dropped here; returns the number of users updated.
+    """
+    user_ids = list(queryset.values_list("pk", flat=True))
+    if not user_ids:
+        return 0
+    updated = queryset.model.objects.filter(pk__in=user_ids).update(**fields)
+    cache = user_cache()
+    cache.delete_many([user_cache_key(user_id) for user_id in user_ids])
+    if fields.get("is_active") is False:
+        ttl = int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds())
+        cache.set_many({disabled_user_cache_key(user_id): True for user_id in user_ids}, ttl)
+    return updated
+
+
+class TokenUser(SimpleLazyObject):
+    """
+    The authenticated user as seen by the API views.
+
+    ``id``/``pk``, ``role`` and ``tenant_id`` come straight from the signed
+    token claims, so permission checks don't touch the users table. Any
+    other attribute (or passing the object to the ORM) loads the full User
+    through get_cached_user.
+    """
+
+    is_authenticated = True
+    is_anonymous = False
+
+    def __init__(self, user_id, claims, user=None):
+        super().__init__(lambda: get_cached_user(user_id))
+        if user is not None:
+            self._wrapped = user
+        self.__dict__["id"] = user_id
+        self.__dict__["pk"] = user_id
+        # Tokens issued before these claims existed fall back to the row
+        for claim in ("role", "tenant_id"):
+            if claim in claims:
+                self.__dict__[claim] = claims[claim]
+
+    def __bool__(self):
+        return True
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that builds request.user from the token claims
+    instead of loading the User row on every request.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        # One cache round trip: the disabled marker, and the row if it is cached
+        cached = user_cache().get_many([disabled_user_cache_key(user_id), user_cache_key(user_id)])
+        if cached.get(disabled_user_cache_key(user_id)):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        user = cached.get(user_cache_key(user_id))
+        if user is not None:
+            check_active(user)
+
+        return TokenUser(user_id, validated_token, user)
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.5 on 2026-10-18 16:48
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0006_user_user_email_idx'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='user',
+            name='email_otp_code',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='email_otp_expiry',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='sms_otp_code',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='sms_otp_expiry',
+        ),
+    ]
@@ -1,8 +1,6 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 from adinvoice import settings
-from django.utils import timezone
-from datetime import timedelta
 
 
 class User(AbstractUser):
@@ -55,46 +53,15 @@ class User(AbstractUser):
     # Application Status (pending / approved / rejected)
     application_status = models.CharField(max_length=20, choices=APPLICATION_STATUS, default="pending")
 
-    # 🔹 SMS OTP fields
-    sms_otp_code = models.CharField(max_length=6, blank=True, null=True)
-    sms_otp_expiry = models.DateTimeField(blank=True, null=True)
+    # Phone/email verification (the OTP codes themselves live in users.otp)
     sms_verified = models.BooleanField(default=False)
-
-    # 🔹 Email OTP fields
-    email_otp_code = models.CharField(max_length=6, blank=True, null=True)
-    email_otp_expiry = models.DateTimeField(blank=True, null=True)
     email_verified = models.BooleanField(default=False)
 
-    # ---------------------------
-    # ✅ Helper Methods
-    # ---------------------------
-    def set_sms_otp(self, code, expiry_minutes=10):
-        self.sms_otp_code = code
-        self.sms_otp_expiry = timezone.now() + timedelta(minutes=expiry_minutes)
-        self.sms_verified = False
-        self.save()
-
-    def verify_sms_otp(self, code):
-        if self.sms_otp_code == code and self.sms_otp_expiry and timezone.now() <= self.sms_otp_expiry:
-            self.sms_verified = True
-            self.sms_otp_code = None  # clear OTP
-            self.save()
-            return True
-        return False
-
-    def set_email_otp(self, code, expiry_minutes=10):
-        self.email_otp_code = code
-        self.email_otp_expiry = timezone.now() + timedelta(minutes=expiry_minutes)
-        self.email_verified = False
-        self.save()
-
-    def verify_email_otp(self, code):
-        if self.email_otp_code == code and self.email_otp_expiry and timezone.now() <= self.email_otp_expiry:
-            self.email_verified = True
-            self.email_otp_code = None  # clear OTP
-            self.save()
-            return True
-        return False
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Sign-in / OTP lookups by email (phone is already unique)
+            models.Index(fields=["email"], name="user_email_idx"),
+        ]
 
     def __str__(self):
         return f"{self.username} ({self.role}) - {self.application_status}"
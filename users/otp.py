@@ -0,0 +1,91 @@
+import secrets
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+
+class OTPRateLimited(Exception):
+    """Too many OTPs sent to, or codes tried for, one identifier."""
+
+
+def otp_cache():
+    return caches[getattr(settings, "OTP_CACHE_ALIAS", "default")]
+
+
+class OTPStore:
+    """
+    One-time codes for ``purpose`` (e.g. "email", "sms"), kept in the OTP
+    cache under the identifier they were sent to (an email or a phone).
+
+    Codes expire with their cache entry after OTP_TTL seconds and only an
+    HMAC of the code is stored. Each identifier may be sent OTP_MAX_SENDS
+    codes per OTP_SEND_WINDOW seconds and gets OTP_MAX_ATTEMPTS tries per
+    code, after which the code is burnt. Counters are cache increments, so
+    brute-force traffic never writes to the users table.
+    """
+
+    def __init__(self, purpose):
+        self.purpose = purpose
+
+    @property
+    def ttl(self):
+        return getattr(settings, "OTP_TTL", 600)
+
+    def key(self, kind, identifier):
+        return f"otp:{self.purpose}:{kind}:{identifier.strip().lower()}"
+
+    def digest(self, identifier, code):
+        return salted_hmac(self.key("code", identifier), str(code).strip()).hexdigest()
+
+    def hit(self, key, timeout):
+        """Increment a counter that starts when first hit and expires after ``timeout``."""
+        cache = otp_cache()
+        if cache.add(key, 1, timeout):
+            return 1
+        try:
+            return cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.set(key, 1, timeout)
+            return 1
+
+    def issue(self, identifier):
+        """Create a new code for ``identifier``, replacing any previous one, and return it."""
+        sends = self.hit(self.key("sends", identifier), getattr(settings, "OTP_SEND_WINDOW", 3600))
+        if sends > getattr(settings, "OTP_MAX_SENDS", 5):
+            raise OTPRateLimited("Too many OTP requests. Please try again later.")
+
+        length = getattr(settings, "OTP_LENGTH", 6)
+        code = f"{secrets.randbelow(10 ** length):0{length}d}"
+        cache = otp_cache()
+        cache.set(self.key("code", identifier), self.digest(identifier, code), self.ttl)
+        cache.delete(self.key("attempts", identifier))
+        return code
+
+    def verify(self, identifier, code):
+        """
+        True if ``code`` is the live code of ``identifier``; a matching code
+        can only be used once. Raises OTPRateLimited once the code has been
+        tried OTP_MAX_ATTEMPTS times.
+        """
+        cache = otp_cache()
+        code_key = self.key("code", identifier)
+        expected = cache.get(code_key)
+        if expected is None:
+            return False
+
+        attempts_key = self.key("attempts", identifier)
+        if self.hit(attempts_key, self.ttl) > getattr(settings, "OTP_MAX_ATTEMPTS", 5):
+            cache.delete(code_key)
+            raise OTPRateLimited("Too many invalid attempts. Please request a new OTP.")
+
+        if not constant_time_compare(expected, self.digest(identifier, code)):
+            return False
+
+        cache.delete_many([code_key, attempts_key])
+        return True
+
+
+email_otps = OTPStore("email")
+sms_otps = OTPStore("sms")
@@ -0,0 +1,23 @@
+from celery import shared_task
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+
+
+# smtplib.SMTPException and connection errors are OSErrors
+@shared_task(autoretry_for=(OSError,), retry_backoff=True, max_retries=3)
+def send_otp_email(email, code):
+    """
+    Mail an email OTP if ``email`` belongs to a user. Runs in the worker so
+    that send_email_otp answers every caller the same way, in the same time.
+    """
+    if not get_user_model().objects.filter(email=email).exists():
+        return {"sent": False}
+    minutes = settings.OTP_TTL // 60
+    send_mail(
+        "Your Adinvoice verification code",
+        f"Your verification code is {code}. It expires in {minutes} minutes.",
+        None,
+        [email],
+    )
+    return {"sent": True}
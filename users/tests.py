@@ -1,3 +1,151 @@
-from django.test import TestCase
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.core import mail
+from django.core.cache import caches
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+
+from common.testing import IndexUsageMixin
+from .authentication import CachedJWTAuthentication, get_cached_user, update_users, user_cache_key
+from .models import User
+from .otp import OTPRateLimited, OTPStore
+from .tasks import send_otp_email
+from .views import send_email_otp
+
+
+@skipUnless(connection.vendor == "mysql", "EXPLAIN plans are checked on MySQL only")
+class UserIndexTests(IndexUsageMixin, TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.bulk_create([
+            User(username=f"user{i}", email=f"user{i}@example.com", phone=f"90000{i:05d}")
+            for i in range(300)
+        ])
+
+    def test_email_lookup_uses_email_index(self):
+        self.assertUsesIndex(User.objects.filter(email="user7@example.com"), "user_email_idx")
+
+    def test_phone_lookup_uses_unique_index(self):
+        self.assertUsesIndex(User.objects.filter(phone="9000000007"))
+
+
+# A local-memory cache stands in for the Redis "otp" cache
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    OTP_CACHE_ALIAS="default",
+    OTP_MAX_ATTEMPTS=3,
+    OTP_MAX_SENDS=2,
+)
+class OTPStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        caches["default"].clear()
+        self.otps = OTPStore("email")
+
+    def test_code_is_single_use(self):
+        code = self.otps.issue("User@Example.com")
+        self.assertTrue(self.otps.verify("user@example.com", code))
+        self.assertFalse(self.otps.verify("user@example.com", code))
+
+    def test_new_code_replaces_the_old_one(self):
+        first = self.otps.issue("user@example.com")
+        second = self.otps.issue("user@example.com")
+        if first != second:
+            self.assertFalse(self.otps.verify("user@example.com", first))
+        self.assertTrue(self.otps.verify("user@example.com", second))
+
+    def test_code_is_burnt_after_max_attempts(self):
+        code = self.otps.issue("user@example.com")
+        wrong = "x" * len(code)
+        for _ in range(3):
+            self.assertFalse(self.otps.verify("user@example.com", wrong))
+        with self.assertRaises(OTPRateLimited):
+            self.otps.verify("user@example.com", code)
+        self.assertFalse(self.otps.verify("user@example.com", code))
+
+    def test_sends_are_rate_limited_per_identifier(self):
+        self.otps.issue("user@example.com")
+        self.otps.issue("user@example.com")
+        with self.assertRaises(OTPRateLimited):
+            self.otps.issue("user@example.com")
+        self.otps.issue("other@example.com")
+
+    def test_expired_code_is_rejected(self):
+        with override_settings(OTP_TTL=-1):
+            code = self.otps.issue("user@example.com")
+        self.assertFalse(self.otps.verify("user@example.com", code))
+
+
+# A local-memory cache stands in for the Redis "users" cache
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    USER_CACHE_ALIAS="default",
+)
+class CachedJWTAuthenticationTests(TestCase):
+
+    def setUp(self):
+        caches["default"].clear()
+        self.user = User.objects.create(username="ann", email="ann@example.com")
+        self.auth = CachedJWTAuthentication()
+
+    def authenticate(self):
+        return self.auth.get_user({"user_id": self.user.pk})
+
+    def test_inactive_user_is_rejected_when_the_row_loads(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        user = self.authenticate()
+        with self.assertRaises(AuthenticationFailed):
+            user.email
+
+    def test_cached_inactive_row_is_rejected(self):
+        self.user.is_active = False
+        caches["default"].set(user_cache_key(self.user.pk), self.user)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+    def test_update_users_invalidates_cached_rows(self):
+        self.assertFalse(get_cached_user(self.user.pk).email_verified)
+        update_users(User.objects.filter(email="ann@example.com"), email_verified=True)
+        self.assertTrue(self.authenticate().email_verified)
+
+        update_users(User.objects.filter(pk=self.user.pk), is_active=False)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate()
+
+
+@override_settings(
+    CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+    USER_CACHE_ALIAS="default",
+    OTP_CACHE_ALIAS="default",
+)
+class SendEmailOTPTests(TestCase):
+
+    def setUp(self):
+        caches["default"].clear()
+        User.objects.create(username="ann", email="ann@example.com")
+
+    def request_otp(self, email):
+        request = APIRequestFactory().post("/send-email-otp/", {"email": email}, format="json")
+        return send_email_otp(request)
+
+    @mock.patch("users.views.send_otp_email")
+    def test_same_answer_for_registered_and_unknown_emails(self, task):
+        registered = self.request_otp("ann@example.com")
+        unknown = self.request_otp("nobody@example.com")
+
+        self.assertEqual(registered.status_code, 200)
+        self.assertEqual((registered.status_code, registered.data), (unknown.status_code, unknown.data))
+        self.assertEqual(
+            [call.args[0] for call in task.delay.call_args_list],
+            ["ann@example.com", "nobody@example.com"],
+        )
+
+    def test_task_mails_registered_users_only(self):
+        self.assertEqual(send_otp_email("nobody@example.com", "123456"), {"sent": False})
+        self.assertEqual(send_otp_email("ann@example.com", "123456"), {"sent": True})
+        self.assertEqual([message.to for message in mail.outbox], [["ann@example.com"]])
+        self.assertIn("123456", mail.outbox[0].body)
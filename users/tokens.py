@@ -0,0 +1,28 @@
+from django.conf import settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def user_tenant(user):
+    """The tenant a user works in: its own tenant, or the first one it owns."""
+    if user.tenant_id:
+        return user.tenant
+    return user.owned_tenants.order_by("id").first()
+
+
+class TenantRefreshToken(RefreshToken):
+    """
+    RefreshToken carrying the ``role``, ``tenant_id`` and ``db_alias`` claims.
+
+    The claims are copied into every access token minted from it, so the
+    permission decorators and TenantMiddleware can authorize and route a
+    request from the signed token alone.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        tenant = user_tenant(user)
+        token["role"] = user.role
+        token[getattr(settings, "TENANT_JWT_CLAIM", "tenant_id")] = tenant.id if tenant else None
+        token["db_alias"] = tenant.db_name if tenant else None
+        return token
@@ -6,10 +6,12 @@ from rest_framework import status
 from django.contrib.auth import authenticate
 from django.contrib.auth.hashers import make_password
 from django.contrib.auth import get_user_model
+from django.conf import settings
 from common.decorators import role_required
-from rest_framework_simplejwt.tokens import RefreshToken
-from datetime import timedelta
-from django.utils import timezone
+from .authentication import update_users
+from .otp import OTPRateLimited, email_otps, sms_otps
+from .tasks import send_otp_email
+from .tokens import TenantRefreshToken
 import secrets
 import string
 
@@ -18,6 +20,33 @@ User = get_user_model()
 
 
 
+# Endpoint: Send email OTP
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def send_email_otp(request):
+    try:
+        email = request.data.get("email")
+
+        if not email:
+            return Response({"error": "Email is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Rate-limited whether or not the email is registered, and the same
+        # response either way, so the endpoint doesn't reveal who has an account.
+        # The lookup and the mail happen in the worker: mail failures and SMTP
+        # latency only ever affect registered addresses.
+        try:
+            code = email_otps.issue(email)
+        except OTPRateLimited as e:
+            return Response({"error": str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+
+        send_otp_email.delay(email, code)
+
+        return Response({"success": "If the email is registered, an OTP has been sent to it"}, status=status.HTTP_200_OK)
+
+    except Exception as e:
+        return Response({"error": str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
 # Endpoint: Email OTP verification
 @api_view(['POST'])
 @permission_classes([AllowAny])
@@ -29,23 +58,16 @@ def verify_email_otp(request):
         if not email or not otp:
             return Response({"error": "Email and OTP are required"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Validate OTP (cache only, wrong codes never touch the users table)
         try:
-            user = User.objects.get(email=email)
-        except User.DoesNotExist:
-            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
-
-        # Validate OTP
-        if user.email_otp != otp:
-            return Response({"error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Expiry check
-        if user.email_otp_created_at < timezone.now() - timedelta(minutes=10):
-            return Response({"error": "OTP expired"}, status=status.HTTP_400_BAD_REQUEST)
+            if not email_otps.verify(email, otp):
+                return Response({"error": "Invalid or expired OTP"}, status=status.HTTP_400_BAD_REQUEST)
+        except OTPRateLimited as e:
+            return Response({"error": str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
 
         # Mark email as verified
-        user.email_verified = True
-        user.email_otp = None  # clear OTP after success
-        user.save()
+        if not update_users(User.objects.filter(email=email), email_verified=True):
+            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
         return Response({"success": "Email verified successfully"}, status=status.HTTP_200_OK)
 
@@ -57,7 +79,7 @@ def verify_email_otp(request):
 
 
 
-# Endpoint: SMS OTP verification
+# Endpoint: SMS OTP verification (codes are issued with users.otp.sms_otps)
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def verify_sms_otp(request):
@@ -68,23 +90,16 @@ def verify_sms_otp(request):
         if not phone or not otp:
             return Response({"error": "Phone and OTP are required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            user = User.objects.get(phone=phone)
-        except User.DoesNotExist:
-            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
-
         # Validate OTP
-        if user.sms_otp != otp:
-            return Response({"error": "Invalid OTP"}, status=status.HTTP_400_BAD_REQUEST)
-
-        # Expiry check
-        if user.sms_otp_created_at < timezone.now() - timedelta(minutes=10):
-            return Response({"error": "OTP expired"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            if not sms_otps.verify(phone, otp):
+                return Response({"error": "Invalid or expired OTP"}, status=status.HTTP_400_BAD_REQUEST)
+        except OTPRateLimited as e:
+            return Response({"error": str(e)}, status=status.HTTP_429_TOO_MANY_REQUESTS)
 
         # Mark phone as verified
-        user.sms_verified = True
-        user.sms_otp = None
-        user.save()
+        if not update_users(User.objects.filter(phone=phone), sms_verified=True):
+            return Response({"error": "User not found"}, status=status.HTTP_404_NOT_FOUND)
 
         return Response({"success": "Phone verified successfully"}, status=status.HTTP_200_OK)
 
@@ -190,15 +205,16 @@ def signin(request):
         if user.role == "admin" and user.application_status != "approved":
             return Response({"error": f"Application {user.application_status}. Please wait for approval."}, status=status.HTTP_403_FORBIDDEN)
 
-        # Generate JWT tokens
-        refresh = RefreshToken.for_user(user)
+        # Generate JWT tokens (with role/tenant claims, see users.tokens)
+        refresh = TenantRefreshToken.for_user(user)
 
         return Response({
             "success": "Login successful",
             "access": str(refresh.access_token),
             "refresh": str(refresh),
             "role": user.role,
-            "user_id": user.id
+            "user_id": user.id,
+            "tenant_id": refresh.get(getattr(settings, "TENANT_JWT_CLAIM", "tenant_id")),
         }, status=status.HTTP_200_OK)
 
     except Exception as e:
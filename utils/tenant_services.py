@@ -1,24 +1,18 @@
-from django.conf import settings
 from django.db import connections, DEFAULT_DB_ALIAS
-from django.core.management import call_command
+from tenants.db_utils import register_tenant_db, unregister_tenant_db
+from tenants.provisioning import create_database as provision_database, migrate_database
 
 def create_database(db_name):
     """Create a new database for tenant"""
-    with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
-        cursor.execute(f"CREATE DATABASE IF NOT EXISTS {db_name}")
+    # Creates the DB and clones the golden template schema
+    # (TENANT_PROVISIONING_STRATEGY="clone") instead of replaying every migration
+    provision_database(db_name)
 
     # Dynamically add tenant DB to settings
-    settings.DATABASES[db_name] = {
-        'ENGINE': 'django.db.backends.mysql',
-        'NAME': db_name,
-        'USER': settings.DATABASES['default']['USER'],
-        'PASSWORD': settings.DATABASES['default']['PASSWORD'],
-        'HOST': settings.DATABASES['default']['HOST'],
-        'PORT': settings.DATABASES['default']['PORT'],
-    }
+    db_alias = register_tenant_db(db_name)
 
-    # Run migrations on the new DB
-    call_command("migrate", database=db_name, interactive=False, run_syncdb=True)
+    # Apply whatever migrations the template does not have yet
+    migrate_database(db_alias)
 
 
 def drop_database(db_name):
@@ -26,6 +20,5 @@ def drop_database(db_name):
     with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
         cursor.execute(f"DROP DATABASE IF EXISTS {db_name}")
 
-    # Remove from settings to avoid dangling DB config
-    if db_name in settings.DATABASES:
-        del settings.DATABASES[db_name]
+    # Remove from settings (and the connection pool) to avoid dangling DB config
+    unregister_tenant_db(db_name)